@@ -41,11 +41,82 @@ class Settings(BaseSettings):
     LOG_PLUGINS_TO_FILE: bool = True
     PLUGINS_LOG_FILE: Path = Path("logs/plugins.log")
 
+    LOG_TIMINGS: bool = False  # one "request_timing" record per request (logger app.timing)
+
+    # ================================
+    # Metrics (/metrics, Prometheus text format)
+    # ================================
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: Optional[Path] = None  # shared by all Uvicorn workers; clear it on deploy
+    METRICS_FLUSH_SEC: float = 5.0  # how often each worker writes its snapshot to METRICS_DIR
+
     # ================================
     # Device configuration
     # ================================
     DEVICE: str = Field(default="cuda:0", description="e.g., 'cuda:0', 'cpu', 'mps' (macOS), 'cuda:1', etc.")
 
+    # ================================
+    # CPU threading (applied per Uvicorn worker at startup)
+    # ================================
+    CPU_TUNING: bool = True  # False leaves torch's thread defaults untouched
+    WORKERS: Optional[int] = None  # workers sharing the host; None = $WEB_CONCURRENCY or 1
+    TORCH_THREADS: Optional[int] = None  # intra-op threads per worker; None = available cores / workers
+    TORCH_INTEROP_THREADS: Optional[int] = None  # None = min(2, intra-op threads)
+    CPU_AFFINITY: bool = False  # pin each worker to its own slice of cores (Linux only)
+    WORKER_INDEX: Optional[int] = None  # this worker's core slice; None = claim a free slot via a lock file
+
+    # Plugin calls run under torch.inference_mode(); manifest "inference_mode"/"autocast" override
+    INFERENCE_MODE: bool = True
+    AUTOCAST: bool = False  # autocast plugin calls to pick_dtype() (float16/bfloat16 on GPU)
+
+    # Load-time model optimization passes (app/utils/optimize.py); manifest "optimize" overrides
+    MODEL_OPTIMIZE: List[str] = []  # e.g. ["quantize_dynamic", "torchscript"]
+
+    # ================================
+    # Plugin execution (per-plugin worker pool; manifest may override)
+    # ================================
+    PLUGIN_MAX_WORKERS: int = 4
+    PLUGIN_MAX_QUEUE: int = 64  # calls allowed to wait beyond the workers before 503
+    PLUGIN_ISOLATION: str = Field("thread", description="thread | process (manifest 'isolation' overrides)")
+    PLUGIN_PROCESS_WORKERS: int = 2  # worker processes per plugin in process mode
+    PLUGIN_PROCESS_TIMEOUT_SEC: Optional[float] = 120.0  # restart a worker that does not reply in time
+    PLUGIN_PROCESS_LOAD_TIMEOUT_SEC: Optional[float] = 300.0  # each worker must load the plugin within this
+    PLUGIN_PROCESS_START_METHOD: str = "spawn"  # spawn | forkserver | fork (opt-in; manifest "start_method")
+
+    # ================================
+    # Plugin residency (lazy loading + LRU eviction)
+    # ================================
+    PLUGINS_LAZY_LOAD: bool = True  # load plugins on first use instead of at discovery
+    PLUGINS_WARM: List[str] = Field(default_factory=lambda: ["*"])  # loaded in background at startup
+    PLUGINS_WARM_WORKERS: int = 4  # plugins loaded in parallel during warm-up
+    PLUGIN_RAM_BUDGET_MB: Optional[float] = None  # evict idle LRU plugins above this host footprint
+    PLUGIN_DEVICE_BUDGET_MB: Optional[float] = None  # same for accelerator memory
+
+    # ================================
+    # Micro-batching (plugins implementing infer_batch)
+    # ================================
+    BATCHING_ENABLED: bool = True
+    BATCH_MAX_SIZE: int = 32
+    BATCH_MAX_WAIT_MS: float = 5.0
+
+    # ================================
+    # Inference result cache (tasks declared cacheable in manifest "cache")
+    # ================================
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 4096
+    RESULT_CACHE_MAX_MB: float = 128.0
+    RESULT_CACHE_TTL_SEC: float = 300.0
+    RESULT_CACHE_DISK: bool = False  # also persist results under MODEL_CACHE_ROOT/results
+    SINGLEFLIGHT_ENABLED: bool = True  # identical concurrent calls to cacheable tasks share one computation
+    SINGLEFLIGHT_TIMEOUT_SEC: Optional[float] = None  # max wait per caller (504 when exceeded)
+
+    # ================================
+    # Streaming responses (plugins implementing stream)
+    # ================================
+    STREAM_BUFFER: int = 8  # chunks produced ahead of a slow client before the plugin is paused
+    BULK_BATCH_SIZE: int = 64  # items per plugin call on the bulk endpoint
+    BULK_CONCURRENCY: int = 2  # bulk batches in flight per request
+
     # ================================
     # Model cache paths
     # ================================
@@ -53,6 +124,12 @@ class Settings(BaseSettings):
     HF_HOME: Optional[Path] = None
     TORCH_HOME: Optional[Path] = None
     TRANSFORMERS_CACHE: Optional[Path] = None
+    PREFETCH_MIRROR: Optional[Path] = None  # local mirror (<dir>/<model id>/...) tried before the network
+    PREFETCH_WORKERS: int = 4  # files downloaded in parallel by the prefetcher
+    MODEL_CACHE_BUDGET_GB: Optional[float] = None  # evict least-recently-used models above this size
+    MODEL_CACHE_MIN_FREE_GB: Optional[float] = None  # ...or while the disk has less free space than this
+    WARM_STATE_ENABLED: bool = False  # opt in: restore plugins from MODEL_CACHE_ROOT/warm_state instead of load()
+    MODEL_CACHE_CHECK_SEC: float = 300.0  # background budget check interval (0 disables it)
 
     # ================================
     # Static, templates, and upload directories
@@ -144,6 +221,8 @@ class Settings(BaseSettings):
         os.environ.setdefault("HF_HOME", str(self.HF_HOME))
         os.environ.setdefault("TORCH_HOME", str(self.TORCH_HOME))
         os.environ.setdefault("TRANSFORMERS_CACHE", str(self.TRANSFORMERS_CACHE))
+        # torch.compile kernels; the default under /tmp does not survive a container restart
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(self.MODEL_CACHE_ROOT / "inductor"))
         os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
 
     def summary(self) -> dict:
@@ -159,19 +238,66 @@ class Settings(BaseSettings):
             "host": self.HOST,
             "port": self.PORT,
             "device": self.DEVICE,
+            "cpu_tuning": {
+                "enabled": self.CPU_TUNING,
+                "workers": self.WORKERS,
+                "threads": self.TORCH_THREADS,
+                "interop_threads": self.TORCH_INTEROP_THREADS,
+                "affinity": self.CPU_AFFINITY,
+                "worker_index": self.WORKER_INDEX,
+            },
+            "inference_mode": self.INFERENCE_MODE,
+            "autocast": self.AUTOCAST,
+            "model_optimize": self.MODEL_OPTIMIZE,
             "model_cache_root": str(self.MODEL_CACHE_ROOT),
             "hf_home": str(self.HF_HOME),
             "torch_home": str(self.TORCH_HOME),
             "transformers_cache": str(self.TRANSFORMERS_CACHE),
+            "model_cache_budget_gb": self.MODEL_CACHE_BUDGET_GB,
+            "model_cache_min_free_gb": self.MODEL_CACHE_MIN_FREE_GB,
+            "warm_state": self.WARM_STATE_ENABLED,
             "static_dir": str(self.STATIC_DIR),
             "templates_dir": str(self.TEMPLATES_DIR),
             "upload_dir": str(self.UPLOAD_DIR),
             "db_url": bool(self.DB_URL),
             "jwt_enabled": bool(self.JWT_SECRET),
+            "plugin_executor": {
+                "max_workers": self.PLUGIN_MAX_WORKERS,
+                "max_queue": self.PLUGIN_MAX_QUEUE,
+                "isolation": self.PLUGIN_ISOLATION,
+                "process_workers": self.PLUGIN_PROCESS_WORKERS,
+                "process_start_method": self.PLUGIN_PROCESS_START_METHOD,
+            },
+            "plugin_residency": {
+                "lazy_load": self.PLUGINS_LAZY_LOAD,
+                "warm": self.PLUGINS_WARM,
+                "ram_budget_mb": self.PLUGIN_RAM_BUDGET_MB,
+                "device_budget_mb": self.PLUGIN_DEVICE_BUDGET_MB,
+            },
+            "result_cache": {
+                "enabled": self.RESULT_CACHE_ENABLED,
+                "max_entries": self.RESULT_CACHE_MAX_ENTRIES,
+                "max_mb": self.RESULT_CACHE_MAX_MB,
+                "ttl_sec": self.RESULT_CACHE_TTL_SEC,
+                "disk": self.RESULT_CACHE_DISK,
+                "singleflight": self.SINGLEFLIGHT_ENABLED,
+            },
+            "batching": {
+                "enabled": self.BATCHING_ENABLED,
+                "max_size": self.BATCH_MAX_SIZE,
+                "max_wait_ms": self.BATCH_MAX_WAIT_MS,
+            },
+            "stream_buffer": self.STREAM_BUFFER,
+            "bulk": {"batch_size": self.BULK_BATCH_SIZE, "concurrency": self.BULK_CONCURRENCY},
+            "metrics": {
+                "enabled": self.METRICS_ENABLED,
+                "dir": str(self.METRICS_DIR) if self.METRICS_DIR else None,
+            },
             "logs": {
                 "console": self.LOG_LEVEL,
                 "errors_file": str(self.ERROR_LOG_FILE) if self.LOG_ERRORS_TO_FILE else None,
                 "plugins_file": str(self.PLUGINS_LOG_FILE) if self.LOG_PLUGINS_TO_FILE else None,
+                "timings": self.LOG_TIMINGS,
             },
         }
 
@@ -6,7 +6,7 @@ from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from jinja2 import TemplateNotFound
 from pydantic import ValidationError
@@ -27,7 +27,9 @@ from starlette.status import (
     HTTP_503_SERVICE_UNAVAILABLE,
 )
 
+from app.core import metrics
 from app.core.config import get_settings
+from app.core.responses import FastJSONResponse
 
 log = logging.getLogger("errors")
 
@@ -70,7 +72,7 @@ def _render(
     code: Optional[int] = None,
     details: Any = None,
     template_name: str = "error.html",
-) -> HTMLResponse | JSONResponse:
+) -> HTMLResponse | FastJSONResponse:
     """
     Return an HTML or JSON response based on client preference.
 
@@ -83,8 +85,9 @@ def _render(
         template_name (str, optional): Template to use for HTML. Defaults to "error.html".
 
     Returns:
-        HTMLResponse | JSONResponse: Rendered error response.
+        HTMLResponse | FastJSONResponse: Rendered error response.
     """
+    metrics.observe_error(status_code)
     settings = get_settings()
     payload: Dict[str, Any] = {
         "code": code or status_code,
@@ -118,7 +121,7 @@ def _render(
             )
             return HTMLResponse(content=html, status_code=status_code)
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "code": payload["code"],
@@ -221,7 +224,7 @@ def register_exception_handlers(app: FastAPI) -> None:
             exc (Exception): The raised exception.
 
         Returns:
-            HTMLResponse | JSONResponse: Rendered error response.
+            HTMLResponse | FastJSONResponse: Rendered error response.
         """
         settings = get_settings()
         details = str(exc) if settings.ENV.lower() == "development" else None
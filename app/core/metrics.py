@@ -0,0 +1,312 @@
+# app/core/metrics.py
+"""
+Prometheus text-format metrics without external dependencies.
+
+Recording is lock-free on the hot path: every thread updates its own shard
+of each metric (a plain dict) and shards are only merged when scraped.
+
+With several Uvicorn workers, each worker periodically writes a snapshot to
+`APP_METRICS_DIR` and `/metrics` merges the snapshots of all workers:
+counters and histograms are summed over every snapshot (including workers
+that have exited), gauges only over live workers.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+PREFIX = "neuroserve_"
+MAX_SERIES = 1000  # label combinations per metric and thread; further ones collapse to "other"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[str, ...]
+
+_STARTED = time.time()  # distinguishes snapshot files of a reused pid
+
+
+class _Metric:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        self._other = ("other",) * len(self.labels)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, Any]] = []
+        self._lock = threading.Lock()  # taken once per thread, when its shard is created
+        _registry.append(self)
+
+    def _shard(self) -> Dict[Labels, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[Labels, Any] = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _key(self, shard: Dict[Labels, Any], labels: Labels) -> Labels:
+        return labels if labels in shard or len(shard) < MAX_SERIES else self._other
+
+    def inc(self, labels: Labels = (), value: float = 1.0) -> None:
+        shard = self._shard()
+        key = self._key(shard, labels)
+        shard[key] = shard.get(key, 0.0) + value
+
+    def samples(self) -> Dict[Labels, Any]:
+        out: Dict[Labels, Any] = {}
+        for shard in list(self._shards):
+            for k, v in shard.copy().items():
+                out[k] = out.get(k, 0.0) + v
+        return out
+
+    def family(self) -> Dict[str, Any]:
+        return _family(self.name, self.kind, self.help, self.labels, self.samples())
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter.
+    """
+
+
+class Gauge(_Metric):
+    """
+    Gauge moved up and down with `inc` / `dec` (e.g. in-flight requests).
+    """
+
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), value: float = 1.0) -> None:
+        self.inc(labels, -value)
+
+
+class Histogram(_Metric):
+    """
+    Histogram with fixed buckets; a series is [count per bucket..., +Inf count, sum].
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        shard = self._shard()
+        key = self._key(shard, labels)
+        row = shard.get(key)
+        if row is None:
+            row = shard[key] = [0.0] * (len(self.buckets) + 2)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def samples(self) -> Dict[Labels, Any]:
+        out: Dict[Labels, List[float]] = {}
+        for shard in list(self._shards):
+            for k, row in shard.copy().items():
+                acc = out.setdefault(k, [0.0] * len(row))
+                for i, v in enumerate(list(row)):
+                    acc[i] += v
+        return out
+
+    def family(self) -> Dict[str, Any]:
+        fam = super().family()
+        fam["buckets"] = list(self.buckets)
+        return fam
+
+
+_registry: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[Dict[str, Any]]]] = []
+
+
+def _family(name: str, kind: str, help: str, labels: Labels, samples: Dict[Labels, Any]) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "kind": kind,
+        "help": help,
+        "labels": list(labels),
+        "samples": [[list(k), v] for k, v in samples.items()],
+    }
+
+
+def gauge_family(name: str, help: str, labels: Iterable[str], samples: Dict[Labels, float]) -> Dict[str, Any]:
+    """
+    Build a gauge family for a collector (values computed at scrape time).
+    """
+    return _family(PREFIX + name, "gauge", help, tuple(labels), samples)
+
+
+def register_collector(fn: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+    """
+    Register a callable returning metric families (see `gauge_family`) evaluated on every scrape.
+    """
+    _collectors.append(fn)
+
+
+# ----------------------------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------------------------
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status")
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route, plugin and task.", ("route", "plugin", "task")
+)
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled.")
+http_errors = Counter("http_errors_total", "Error responses rendered by the exception handlers.", ("status",))
+plugin_load = Histogram("plugin_load_seconds", "Plugin (model) load time.", ("plugin",), buckets=LOAD_BUCKETS)
+cache_evictions = Counter("model_cache_evictions_total", "Model snapshots evicted from the disk cache.")
+cache_evicted_bytes = Counter("model_cache_evicted_bytes_total", "Bytes evicted from the model disk cache.")
+
+
+def observe_error(status: int) -> None:
+    http_errors.inc((str(status),))
+
+
+def observe_load(plugin: str, seconds: float) -> None:
+    plugin_load.observe((plugin,), seconds)
+
+
+def observe_cache_eviction(nbytes: int) -> None:
+    cache_evictions.inc()
+    cache_evicted_bytes.inc(value=nbytes)
+
+
+# ----------------------------------------------------------------------------
+# Snapshots, multi-worker merge and text exposition
+# ----------------------------------------------------------------------------
+def snapshot() -> Dict[str, Any]:
+    """
+    Return this process's metric families, including collector output.
+    """
+    families = [m.family() for m in _registry]
+    for fn in list(_collectors):
+        try:
+            families.extend(fn())
+        except Exception:
+            pass
+    return {"pid": os.getpid(), "at": time.time(), "families": families}
+
+
+def _snapshot_path(directory: Path) -> Path:
+    return directory / f"metrics-{os.getpid()}-{int(_STARTED)}.json"
+
+
+def write_snapshot(directory: Path) -> None:
+    """
+    Write this worker's snapshot to `directory` (atomically replaced).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = _snapshot_path(directory)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot()), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def merge(snapshots: Iterable[Dict[str, Any]], live: Callable[[int], bool]) -> List[Dict[str, Any]]:
+    """
+    Merge worker snapshots: counters/histograms summed over all, gauges over live workers only.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snap in snapshots:
+        alive = live(snap["pid"])
+        for fam in snap["families"]:
+            if fam["kind"] == "gauge" and not alive:
+                continue
+            acc = merged.setdefault(fam["name"], {**fam, "samples": {}})
+            for labels, value in fam["samples"]:
+                key = tuple(labels)
+                prev = acc["samples"].get(key)
+                if prev is None:
+                    acc["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    acc["samples"][key] = [a + b for a, b in zip(prev, value)]
+                else:
+                    acc["samples"][key] = prev + value
+    for fam in merged.values():
+        fam["samples"] = [[list(k), v] for k, v in fam["samples"].items()]
+    return list(merged.values())
+
+
+def collect(directory: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    Return metric families for this process, or for every worker sharing `directory`.
+    """
+    if directory is None:
+        return snapshot()["families"]
+    write_snapshot(directory)
+    snaps = []
+    for path in directory.glob("metrics-*.json"):
+        try:
+            snaps.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue  # being replaced or removed
+    return merge(snaps, lambda pid: pid == os.getpid() or psutil.pid_exists(pid))
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: List[str], values: List[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def render(families: Iterable[Dict[str, Any]]) -> str:
+    """
+    Render metric families in the Prometheus text exposition format (version 0.0.4).
+    """
+    lines: List[str] = []
+    for fam in sorted(families, key=lambda f: f["name"]):
+        name, names = fam["name"], fam["labels"]
+        lines.append(f"# HELP {name} {fam['help']}")
+        lines.append(f"# TYPE {name} {fam['kind']}")
+        for values, v in sorted(fam["samples"], key=lambda s: s[0]):
+            if fam["kind"] != "histogram":
+                lines.append(f"{name}{_labels(names, values)} {_num(v)}")
+                continue
+            cumulative = 0.0
+            for le, n in zip([*fam["buckets"], "+Inf"], v[:-1]):
+                cumulative += n
+                bucket = _labels(names, values, 'le="%s"' % le)
+                lines.append(f"{name}_bucket{bucket} {_num(cumulative)}")
+            lines.append(f"{name}_sum{_labels(names, values)} {_num(v[-1])}")
+            lines.append(f"{name}_count{_labels(names, values)} {_num(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+def start_flusher(directory: Path, interval: float) -> threading.Event:
+    """
+    Write this worker's snapshot every `interval` seconds until the returned event is set.
+    """
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval):
+            try:
+                write_snapshot(directory)
+            except OSError:
+                pass
+
+    threading.Thread(target=loop, name="metrics-flush", daemon=True).start()
+    return stop
@@ -0,0 +1,156 @@
+# app/core/middleware.py
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from typing import Any, Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.responses import dumps
+from app.core.timing import RequestTimings, start_timings
+
+_log = logging.getLogger("app.timing")
+
+
+class RequestIDMiddleware:
+    """
+    Pure-ASGI middleware that tags every HTTP request with an ID.
+
+    The incoming `X-Request-ID` header is reused when present, otherwise a new
+    one is generated. It is stored in `scope["state"]` (`request.state.request_id`)
+    and echoed on the response. Only the `http.response.start` message is
+    touched, so bodies, streaming responses and disconnect handling pass
+    through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = None
+        for k, v in scope["headers"]:
+            if k == b"x-request-id":
+                rid = v.decode("latin-1")
+                break
+        rid = rid or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = rid
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = rid
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure-ASGI middleware that reports per-request phase timings.
+
+    Phases recorded through `app.core.timing` while the request is handled
+    (parse, queue, infer, serialize, plus any a plugin adds) are sent in
+    `Server-Timing` together with `app;dur=<ms>`, the time until the response
+    headers are sent; for streaming responses that is the time to the first
+    byte, not the full stream.
+
+    With `log=True`, a structured "request_timing" record (JSON) carrying the
+    request ID, status, phases and total duration is logged to `app.timing`
+    once the response body is complete.
+
+    Args:
+        app (ASGIApp): Wrapped application.
+        log (bool): Emit one timing log record per request.
+    """
+
+    def __init__(self, app: ASGIApp, log: bool = False) -> None:
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_timings()
+        status = 0
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing(timings.elapsed()))
+            elif self.log and message["type"] == "http.response.body" and not message.get("more_body", False):
+                _log_timing(scope, status, timings)
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+def _log_timing(scope: Scope, status: int, timings: RequestTimings) -> None:
+    record = {
+        "request_id": scope.get("state", {}).get("request_id"),
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status,
+        "total_ms": round(timings.elapsed() * 1000, 3),
+        "phases_ms": timings.as_ms(),
+    }
+    _log.info("request_timing %s", dumps(record).decode())
+
+
+class MetricsMiddleware:
+    """
+    Pure-ASGI middleware that feeds request counts, latency and in-flight gauges to `app.core.metrics`.
+
+    Requests are labelled with their route template (not the raw path) and,
+    for successful plugin calls, the plugin and task, so label cardinality
+    stays bounded. Latency is measured until the response body is complete.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._templates: Dict[Any, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            template = next((r.path for r in routes if getattr(r, "endpoint", None) is endpoint), "other")
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        metrics.http_in_flight.inc()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_in_flight.dec()
+            route = self._route(scope)
+            params = scope.get("path_params") or {}
+            plugin, task = (params.get("name", ""), params.get("task", "")) if status < 400 else ("", "")
+            metrics.http_requests.inc((scope["method"], route, str(status)))
+            metrics.http_latency.observe((route, plugin, task), time.perf_counter() - start)
@@ -0,0 +1,73 @@
+# app/core/responses.py
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import json
+from typing import Any
+
+import numpy as np
+import torch
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+_ORJSON_OPTS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _default(o: Any) -> Any:
+    """
+    Encode types the JSON backend does not handle natively.
+
+    orjson already covers datetimes, dataclasses and C-contiguous NumPy arrays
+    of the common dtypes; everything else (and every one of these under the
+    stdlib backend) ends up here.
+    """
+    if isinstance(o, torch.Tensor):
+        t = o.detach().cpu()
+        return t.numpy() if orjson is not None and t.dtype != torch.bfloat16 else t.tolist()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, (dt.datetime, dt.date, dt.time)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return {f.name: getattr(o, f.name) for f in dataclasses.fields(o)}
+    if hasattr(o, "model_dump"):
+        return o.model_dump()
+    return str(o)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON in one pass, NumPy arrays and torch tensors included.
+
+    Uses orjson when installed, the stdlib `json` module otherwise.
+
+    Args:
+        obj (Any): Value to serialize.
+
+    Returns:
+        bytes: JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response that serializes plugin results directly.
+
+    Return an instance from a route to skip FastAPI's `jsonable_encoder` pass;
+    as a `default_response_class` it only replaces the final `json.dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
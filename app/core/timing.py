@@ -0,0 +1,99 @@
+# app/core/timing.py
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class RequestTimings:
+    """
+    Phase durations collected while one request is handled.
+
+    Durations for a phase recorded more than once (e.g. per batch) are summed.
+    Phases are reported in the order they were first recorded.
+    """
+
+    __slots__ = ("start", "phases")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def as_ms(self) -> Dict[str, float]:
+        return {k: round(v * 1000, 3) for k, v in list(self.phases.items())}
+
+    def server_timing(self, total: float) -> str:
+        """
+        Render the phases and `total` (seconds) as a `Server-Timing` header value.
+        """
+        parts = [f"{k};dur={v * 1000:.3f}" for k, v in list(self.phases.items())]
+        parts.append(f"app;dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """
+    Return the timings of the request being handled, or None outside a request.
+    """
+    return _current.get()
+
+
+def start_timings() -> RequestTimings:
+    """
+    Begin collecting timings for the current request (called by `ServerTimingMiddleware`).
+    """
+    t = RequestTimings()
+    _current.set(t)
+    return t
+
+
+def add_phase(name: str, seconds: float) -> None:
+    """
+    Add `seconds` to phase `name` of the current request; a no-op outside a request.
+
+    Args:
+        name (str): Phase name (a Server-Timing metric name: no spaces, commas or semicolons).
+        seconds (float): Duration to add.
+    """
+    t = _current.get()
+    if t is not None:
+        t.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a block as phase `name` of the current request.
+
+    Usable from routes and from plugin code running on the plugin's worker
+    threads (the request context is carried over), e.g.:
+
+        with phase("tokenize"):
+            ids = tokenizer(text)
+
+    Calls served by the micro-batcher run on a shared thread and are not
+    attributed to a single request.
+
+    Args:
+        name (str): Phase name.
+    """
+    t = _current.get()
+    if t is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        t.add(name, time.perf_counter() - start)
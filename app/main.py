@@ -1,26 +1,80 @@
-import uuid
+from contextlib import asynccontextmanager
 
+import psutil
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core import metrics
 from app.core.config import get_settings
 from app.core.errors import register_exception_handlers
 from app.core.logging_ import setup_logging
+from app.core.middleware import MetricsMiddleware, RequestIDMiddleware, ServerTimingMiddleware
+from app.plugins import loader
+from app.plugins.batching import drop_batchers
+from app.plugins.executor import drop_executors, executor_stats
 from app.routes import plugins as plugins_routes
+from app.runtime import configure_cpu, cpu_layout, device_memory
+from app.utils.cache_budget import get_cache_budget, start_cache_manager
+from app.utils.model_cache import get_model_cache_index, missing_models
 
 # Initialize settings and logging
 settings = get_settings()
 setup_logging()
 
+# Size torch thread pools for this worker before any model runs
+if settings.CPU_TUNING:
+    configure_cpu(
+        settings.TORCH_THREADS,
+        settings.TORCH_INTEROP_THREADS,
+        settings.WORKERS,
+        settings.CPU_AFFINITY,
+        settings.WORKER_INDEX,
+    )
+
 # Use settings paths (recommended)
 templates = Jinja2Templates(directory=str(settings.TEMPLATES_DIR))
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Register plugins and start loading the warm set in the background
+    registry, meta = loader.discover(reload=False)
+    app.state.plugin_registry = registry
+    app.state.plugin_meta = meta
+    app.state.models_missing = missing_models(meta)
+    warm_pool = loader.warm(loader.warm_targets(settings.PLUGINS_WARM), settings.PLUGINS_WARM_WORKERS)
+    flusher = None
+    if settings.METRICS_ENABLED and settings.METRICS_DIR:
+        flusher = metrics.start_flusher(settings.METRICS_DIR, settings.METRICS_FLUSH_SEC)
+    # The first budget check runs one interval in, once the warm set has loaded and pinned its models
+    cache_manager = None
+    budget = get_cache_budget()
+    if (budget.budget_bytes or budget.min_free_bytes) and settings.MODEL_CACHE_CHECK_SEC > 0:
+        cache_manager = start_cache_manager(budget, settings.MODEL_CACHE_CHECK_SEC)
+
+    yield
+
+    if flusher is not None:
+        flusher.set()
+    if cache_manager is not None:
+        cache_manager.set()
+
+    # Stop warm-up, batcher threads, plugin worker pools and worker processes on shutdown
+    if warm_pool is not None:
+        warm_pool.shutdown(wait=True, cancel_futures=True)
+    drop_batchers()
+    drop_executors()
+    loader.shutdown()
+    for attr in ("plugin_registry", "plugin_meta", "models_missing"):
+        if hasattr(app.state, attr):
+            delattr(app.state, attr)
+
+
 # Create FastAPI application instance
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 # Mount static files directory (from settings)
 app.mount("/static", StaticFiles(directory=str(settings.STATIC_DIR)), name="static")
@@ -34,17 +88,10 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
 )
 
-
-# Middleware: unique request ID
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        rid = request.headers.get("x-request-id") or uuid.uuid4().hex
-        request.state.request_id = rid
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = rid
-        return response
-
-
+# Middleware: metrics, timing and unique request ID (pure ASGI, added last = outermost)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware, log=settings.LOG_TIMINGS)
 app.add_middleware(RequestIDMiddleware)
 
 # Register exception handlers
@@ -58,12 +105,80 @@ def index(request: Request):
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    """
+    Liveness and readiness. Returns 503 while the startup warm set is still
+    loading so load balancers can hold traffic until the node is warm. Later
+    on-demand loads and reloads after eviction are reported per plugin but
+    keep the node ready.
+    """
+    plugins = loader.status()
+    warming = loader.warming()
+    failed = any(p["state"] == "failed" for p in plugins.values())
+    body = {
+        "status": "loading" if warming else "degraded" if failed else "ok",
+        "ready": not warming,
+        "warming": warming,
+        "plugins": plugins,
+    }
+    return JSONResponse(body, status_code=503 if warming else 200)
 
 
 @app.get("/env")
-def env():
-    return settings.summary()
+def env(request: Request):
+    model_cache = {**get_model_cache_index().summary(), "missing": getattr(request.app.state, "models_missing", {})}
+    return {**settings.summary(), "cpu": cpu_layout(), "model_cache": model_cache}
+
+
+def _runtime_metrics():
+    execs = executor_stats()
+    devices = device_memory()
+    cache = get_cache_budget().recent_usage()
+    return [
+        metrics.gauge_family(
+            "plugin_in_flight",
+            "Plugin calls running on a worker.",
+            ("plugin",),
+            {(n,): s["in_flight"] for n, s in execs.items()},
+        ),
+        metrics.gauge_family(
+            "plugin_queued",
+            "Plugin calls waiting for a worker.",
+            ("plugin",),
+            {(n,): s["queued"] for n, s in execs.items()},
+        ),
+        metrics.gauge_family(
+            "device_memory_bytes",
+            "Accelerator memory held by the server.",
+            ("device", "kind"),
+            {(d, k): v for d, m in devices.items() for k, v in m.items()},
+        ),
+        metrics.gauge_family(
+            "process_resident_memory_bytes",
+            "Resident memory of the server.",
+            (),
+            {(): psutil.Process().memory_info().rss},
+        ),
+        metrics.gauge_family(
+            "model_cache_bytes",
+            "Model cache size and free disk space.",
+            ("kind",),
+            {("used",): cache["bytes"], ("free",): cache["free_bytes"]},
+        ),
+    ]
+
+
+metrics.register_collector(_runtime_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """
+    Prometheus metrics in text exposition format, merged across workers when APP_METRICS_DIR is set.
+    """
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    body = metrics.render(metrics.collect(settings.METRICS_DIR))
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/favicon.ico", include_in_schema=False)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
 
 
 class AIPlugin(ABC):
@@ -11,10 +13,14 @@ class AIPlugin(ABC):
     Attributes:
         name (str): Name of the provider (usually matches the folder name).
         tasks (List[str]): List of supported tasks such as "infer", "embed", "classify-image".
+        manifest (Dict[str, Any]): Contents of the plugin's manifest.json, set before `load()`.
+        warm_state (bool): Set to True by plugins that implement `save_state`/`load_state`.
     """
 
     name: str = "unknown"
     tasks: List[str] = []
+    manifest: Dict[str, Any] = {}
+    warm_state: bool = False
 
     @abstractmethod
     def load(self) -> None:
@@ -23,6 +29,16 @@ class AIPlugin(ABC):
         """
         ...
 
+    def unload(self) -> None:
+        """
+        Release the model and other resources held by `load()`.
+
+        Called before the plugin is evicted from memory or the server shuts
+        down. The instance is discarded afterwards; the plugin is built and
+        loaded again on its next use.
+        """
+        ...
+
     @abstractmethod
     def infer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -35,3 +51,142 @@ class AIPlugin(ABC):
             Dict[str, Any]: Inference result.
         """
         ...
+
+    def infer_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Optional batched inference entry point used by the micro-batching scheduler.
+
+        Plugins opt in to batching by overriding this method. All payloads in a
+        batch target the same task. The returned list must have one entry per
+        payload, in the same order; an entry may be an ``Exception`` instance to
+        fail only that request. The default calls `infer` once per payload.
+
+        Args:
+            payloads (List[Dict[str, Any]]): Input payloads collected from concurrent requests.
+
+        Returns:
+            List[Dict[str, Any]]: One inference result per payload.
+        """
+        results: List[Any] = []
+        for payload in payloads:
+            try:
+                results.append(self.infer(payload))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stream(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Optional incremental inference entry point for generative models.
+
+        Implement as a generator (or async generator) yielding one chunk per
+        step, e.g. ``{"token": "Hello"}``. The server pulls chunks only as fast
+        as the client reads them, and closes the generator when the client
+        disconnects, so cleanup belongs in a ``finally`` block. The default
+        yields the whole `infer` result as a single chunk.
+
+        Args:
+            payload (Dict[str, Any]): Input data for inference.
+
+        Yields:
+            Dict[str, Any]: Partial results.
+        """
+        yield self.infer(payload)
+
+    def save_state(self, path: Path) -> None:
+        """
+        Optional: write the state prepared by `load()` to `path` for a fast restart.
+
+        Save whatever is expensive to rebuild: optimized or compiled models,
+        tokenizer caches, precomputed buffers. Prefer data formats (tensors,
+        JSON, TorchScript) over pickled objects: `load_state` should not
+        execute code from the cache directory. The directory is versioned by
+        the loader (see `app/plugins/warm_state.py`). Only used when the class
+        sets `warm_state = True` and implements `load_state` alongside; the
+        default saves nothing.
+
+        Args:
+            path (Path): Empty directory to write into.
+        """
+        ...
+
+    def load_state(self, path: Path) -> None:
+        """
+        Optional: restore the state written by `save_state`, called instead of `load()`.
+
+        Raise on any problem; the snapshot is then discarded and `load()` runs.
+        The default ignores the snapshot and calls `load()`.
+
+        Args:
+            path (Path): Directory previously filled by `save_state`.
+        """
+        self.load()
+
+    async def ainfer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Optional async inference entry point.
+
+        Plugins whose work is naturally async (remote calls, async clients)
+        override this; the executor then awaits it directly on the event loop
+        instead of occupying a worker thread. The default runs `infer` in a
+        thread.
+
+        Args:
+            payload (Dict[str, Any]): Input data for inference.
+
+        Returns:
+            Dict[str, Any]: Inference result.
+        """
+        return await asyncio.to_thread(self.infer, payload)
+
+
+def supports_streaming(plugin: AIPlugin) -> bool:
+    """
+    Check whether a plugin overrides `stream`.
+
+    Args:
+        plugin (AIPlugin): Plugin instance.
+
+    Returns:
+        bool: True if the plugin can produce incremental results.
+    """
+    return getattr(type(plugin), "stream", None) is not AIPlugin.stream
+
+
+def supports_async(plugin: AIPlugin) -> bool:
+    """
+    Check whether a plugin overrides `ainfer`.
+
+    Args:
+        plugin (AIPlugin): Plugin instance.
+
+    Returns:
+        bool: True if the plugin provides a native async entry point.
+    """
+    return getattr(type(plugin), "ainfer", None) is not AIPlugin.ainfer
+
+
+def supports_batching(plugin: AIPlugin) -> bool:
+    """
+    Check whether a plugin overrides `infer_batch`.
+
+    Args:
+        plugin (AIPlugin): Plugin instance.
+
+    Returns:
+        bool: True if the plugin provides its own batched entry point.
+    """
+    return getattr(type(plugin), "infer_batch", None) is not AIPlugin.infer_batch
+
+
+def supports_warm_state(plugin: AIPlugin) -> bool:
+    """
+    Check whether a plugin declares `warm_state = True`.
+
+    Args:
+        plugin (AIPlugin): Plugin instance.
+
+    Returns:
+        bool: True if the plugin's loaded state can be persisted and restored.
+    """
+    return bool(getattr(plugin, "warm_state", False))
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+log = logging.getLogger("plugins.batching")
+
+BatchFn = Callable[[List[Dict[str, Any]]], List[Any]]
+
+_STOP = object()
+
+
+class _Item:
+    __slots__ = ("payload", "future")
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Collect concurrent requests for one plugin/task and run them as a single batch.
+
+    A background thread takes the first queued request, then keeps collecting
+    until either `max_batch_size` requests are pending or `max_wait_ms` has
+    elapsed since the first one arrived. The batch is passed to `fn` and each
+    caller's future receives its own slice of the result.
+
+    Args:
+        fn (BatchFn): Batched inference callable (usually `plugin.infer_batch`).
+        max_batch_size (int): Flush as soon as this many requests are pending.
+        max_wait_ms (float): Maximum time the first request of a batch waits for company.
+        name (str): Label used in logs and stats.
+    """
+
+    def __init__(self, fn: BatchFn, max_batch_size: int = 32, max_wait_ms: float = 5.0, name: str = "") -> None:
+        self.fn = fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload: Dict[str, Any]) -> Future:
+        """
+        Queue a payload for the next batch.
+
+        Args:
+            payload (Dict[str, Any]): Inference payload.
+
+        Returns:
+            Future: Resolves to this payload's result (or raises its error).
+        """
+        if self._closed:
+            raise RuntimeError(f"batcher '{self.name}' is closed")
+        item = _Item(payload)
+        self._queue.put(item)
+        return item.future
+
+    def close(self) -> None:
+        """
+        Stop the background thread after the queued requests are flushed.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return counters describing batching efficiency.
+
+        Returns:
+            Dict[str, Any]: Number of batches and items, average and max batch size.
+        """
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size_seen": self._max_seen,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[_Item]) -> None:
+        self._batches += 1
+        self._items += len(batch)
+        self._max_seen = max(self._max_seen, len(batch))
+        try:
+            results = self.fn([it.payload for it in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"infer_batch returned {len(results)} results for {len(batch)} payloads")
+        except Exception as e:
+            log.exception("batch of %d failed in '%s'", len(batch), self.name)
+            for it in batch:
+                it.future.set_exception(e)
+            return
+        for it, res in zip(batch, results):
+            if isinstance(res, Exception):
+                it.future.set_exception(res)
+            else:
+                it.future.set_result(res)
+
+
+_batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+_lock = threading.Lock()
+
+
+def get_batcher(name: str, task: str, fn: BatchFn, max_batch_size: int, max_wait_ms: float) -> MicroBatcher:
+    """
+    Return the batcher for a plugin/task pair, creating it on first use.
+
+    Args:
+        name (str): Plugin name.
+        task (str): Task name.
+        fn (BatchFn): Batched inference callable.
+        max_batch_size (int): Maximum batch size.
+        max_wait_ms (float): Maximum wait before flushing a partial batch.
+
+    Returns:
+        MicroBatcher: Shared batcher instance.
+    """
+    key = (name, task)
+    b = _batchers.get(key)
+    if b is None:
+        with _lock:
+            b = _batchers.get(key)
+            if b is None:
+                b = MicroBatcher(fn, max_batch_size, max_wait_ms, name=f"{name}/{task}")
+                _batchers[key] = b
+    return b
+
+
+def drop_batchers(name: str | None = None) -> None:
+    """
+    Close batchers for one plugin, or all of them.
+
+    Args:
+        name (str | None): Plugin name, or None for every plugin.
+    """
+    with _lock:
+        keys = [k for k in _batchers if name is None or k[0] == name]
+        items = [_batchers.pop(k) for k in keys]
+    for b in items:
+        b.close()
+
+
+def batch_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return stats for every active batcher, keyed by "plugin/task".
+    """
+    return {f"{n}/{t}": b.stats() for (n, t), b in list(_batchers.items())}
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.responses import dumps
+
+_WHITESPACE = " \t\r\n"
+
+
+async def iter_json_items(chunks: AsyncIterator[bytes], max_item_bytes: int = 16 * 1024 * 1024) -> AsyncIterator[Any]:
+    """
+    Parse JSON objects from a byte stream as they arrive.
+
+    Accepts NDJSON (one value per line) or a single top-level JSON array whose
+    elements are the items; only the current, incomplete item is buffered.
+    A body that starts with `[` is the array form: elements must be separated
+    by commas and nothing may follow the closing bracket. Nested arrays are
+    single items, not flattened.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Request body chunks.
+        max_item_bytes (int): Largest single item accepted.
+
+    Yields:
+        Any: Decoded items, in input order.
+
+    Raises:
+        ValueError: On invalid or truncated JSON, or an oversized item.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    offset = 0  # characters consumed before `buf`
+    array: Optional[bool] = None  # None until the first non-whitespace character
+    expect = "item"  # array form: "first" item or "]", "item", or "sep" (',' or ']')
+    closed = False
+
+    def drain(final: bool):
+        nonlocal buf, offset, array, expect, closed
+        pos, n = 0, len(buf)
+        while True:
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos == n:
+                break
+            c = buf[pos]
+            if closed:
+                raise ValueError(f"Unexpected data after the JSON array at offset {offset + pos}")
+            if array is None:
+                array = c == "["
+                if array:
+                    expect = "first"
+                    pos += 1
+                    continue
+            if array and expect in ("first", "sep") and c == "]":
+                closed = True
+                pos += 1
+                continue
+            if array and expect == "sep":
+                if c != ",":
+                    raise ValueError(f"Expected ',' or ']' at offset {offset + pos}")
+                expect = "item"
+                pos += 1
+                continue
+            if c in ",]":
+                raise ValueError(f"Unexpected {c!r} at offset {offset + pos}")
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise ValueError(f"Invalid JSON item at offset {offset + pos}: {e.msg}") from None
+                if n - pos > max_item_bytes:
+                    raise ValueError(f"Item exceeds {max_item_bytes} bytes") from None
+                break
+            yield obj
+            pos = end
+            expect = "sep"
+        buf = buf[pos:]
+        offset += pos
+
+    async for chunk in chunks:
+        buf += utf8.decode(chunk)
+        for obj in drain(final=False):
+            yield obj
+    buf += utf8.decode(b"", final=True)
+    for obj in drain(final=True):
+        yield obj
+    if array and not closed:
+        raise ValueError("Unterminated JSON array")
+
+
+async def run_bulk(
+    items: AsyncIterator[Any],
+    call_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+    batch_size: int = 64,
+    concurrency: int = 2,
+    ordered: bool = True,
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Feed a stream of items through `call_batch` and yield results as they complete.
+
+    Items are grouped into batches of `batch_size`; up to `concurrency`
+    batches run at once while the next one is read. Input is not read ahead
+    of that window and results are yielded as soon as they are ready, so
+    memory stays bounded regardless of the number of items.
+
+    Args:
+        items (AsyncIterator[Any]): Input items.
+        call_batch (Callable[[List[Any]], Awaitable[List[Any]]]): Returns one result per item;
+            an entry may be an Exception to fail just that item.
+        batch_size (int): Items per batch.
+        concurrency (int): Batches in flight.
+        ordered (bool): Yield results in input order; otherwise in completion order.
+
+    Yields:
+        Tuple[int, Any]: (item index, result or Exception).
+    """
+    batch_size = max(1, int(batch_size))
+    concurrency = max(1, int(concurrency))
+    pending: Deque[Tuple[int, asyncio.Task]] = deque()
+
+    async def call(batch: List[Any]) -> List[Any]:
+        try:
+            results = await call_batch(batch)
+        except Exception as e:
+            return [e] * len(batch)
+        if len(results) != len(batch):
+            err = RuntimeError(f"call_batch returned {len(results)} results for {len(batch)} items")
+            return [err] * len(batch)
+        return results
+
+    def submit(start: int, batch: List[Any]) -> None:
+        pending.append((start, asyncio.ensure_future(call(batch))))
+
+    async def collect() -> List[Tuple[int, Any]]:
+        if ordered:
+            start, task = pending.popleft()
+        else:
+            done, _ = await asyncio.wait([t for _, t in pending], return_when=asyncio.FIRST_COMPLETED)
+            start, task = next((s, t) for s, t in pending if t in done)
+            pending.remove((start, task))
+        results = await task
+        return [(start + i, r) for i, r in enumerate(results)]
+
+    try:
+        batch: List[Any] = []
+        index = 0
+        async for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                submit(index, batch)
+                index += len(batch)
+                batch = []
+                while len(pending) >= concurrency:
+                    for out in await collect():
+                        yield out
+        if batch:
+            submit(index, batch)
+        while pending:
+            for out in await collect():
+                yield out
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def infer_each(plugin: Any, payloads: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Run `plugin.infer` over payloads in one call, capturing per-item errors.
+    """
+    results: List[Any] = []
+    for p in payloads:
+        try:
+            results.append(plugin.infer(p))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def bulk_line(index: int, result: Any) -> bytes:
+    """
+    Encode one bulk result as an NDJSON line: {"index": i, "result": ...} or {"index": i, "error": "..."}.
+    """
+    if isinstance(result, Exception):
+        body: Dict[str, Any] = {"index": index, "error": f"{type(result).__name__}: {result!s}"}
+    else:
+        body = {"index": index, "result": result}
+    return dumps(body) + b"\n"
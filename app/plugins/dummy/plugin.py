@@ -1,3 +1,5 @@
+import time
+
 from app.plugins.base import AIPlugin
 
 
@@ -9,3 +11,11 @@ class Plugin(AIPlugin):
 
     def infer(self, payload: dict) -> dict:
         return {"task": "ping", "message": "✅ Dummy service is working", "payload_received": payload}
+
+    def stream(self, payload: dict):
+        # Emits the message word by word; "delay_ms" simulates generation time per token.
+        delay = float(payload.get("delay_ms", 0)) / 1000
+        for i, word in enumerate("✅ Dummy service is working".split()):
+            if delay:
+                time.sleep(delay)
+            yield {"index": i, "token": word}
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from app.core.timing import add_phase, phase
+
+
+class ExecutorBusy(RuntimeError):
+    """
+    Raised when a plugin's queue is full and the call is rejected without waiting.
+    """
+
+
+class PluginExecutor:
+    """
+    Dedicated, size-limited execution engine for a single plugin.
+
+    Sync calls run on a private thread pool so slow models never occupy
+    Starlette's shared threadpool. Async calls run directly on the event loop.
+    Both share one admission limit: at most `max_workers + max_queue` calls may
+    be pending, further calls fail fast with `ExecutorBusy`.
+
+    Args:
+        name (str): Plugin name (used for thread names and stats).
+        max_workers (int): Number of worker threads.
+        max_queue (int): Number of calls allowed to wait for a free worker.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 64) -> None:
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"plugin-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise ExecutorBusy(f"Plugin '{self.name}' is busy ({self._pending} calls pending)")
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking callable on the plugin's worker pool.
+
+        The callable runs in a copy of the caller's context, so request-scoped
+        state (e.g. `app.core.timing.phase`) is available to plugin code. Time
+        spent waiting for a worker and running are recorded as the request's
+        "queue" and "infer" phases.
+
+        Args:
+            fn (Callable[..., Any]): Callable to execute.
+            *args (Any): Positional arguments for `fn`.
+
+        Returns:
+            Any: The callable's result.
+
+        Raises:
+            ExecutorBusy: If the queue-depth limit is reached.
+        """
+        self._admit()
+        submitted = time.perf_counter()
+
+        def call() -> Any:
+            self._enter()
+            started = time.perf_counter()
+            add_phase("queue", started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                add_phase("infer", time.perf_counter() - started)
+                self._exit()
+                # Released by the worker, so a cancelled request keeps its slot until the call ends
+                self._release()
+
+        ctx = contextvars.copy_context()
+        try:
+            future = self._pool.submit(ctx.run, call)
+        except BaseException:
+            self._release()
+            raise
+        # A call cancelled before a worker picked it up never runs `call`
+        future.add_done_callback(lambda f: f.cancelled() and self._release())
+        return await asyncio.wrap_future(future)
+
+    async def run_async(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Await a coroutine function on the event loop under the same admission limit.
+
+        Args:
+            fn (Callable[..., Awaitable[Any]]): Coroutine function to execute.
+            *args (Any): Positional arguments for `fn`.
+
+        Returns:
+            Any: The awaited result.
+
+        Raises:
+            ExecutorBusy: If the queue-depth limit is reached.
+        """
+        async with self.slot():
+            with phase("infer"):
+                return await fn(*args)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one admission slot while running work on the event loop (e.g. an async stream).
+
+        Raises:
+            ExecutorBusy: If the queue-depth limit is reached.
+        """
+        self._admit()
+        self._enter()
+        try:
+            yield
+        finally:
+            self._exit()
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return live counters for this executor.
+
+        Returns:
+            Dict[str, Any]: Worker/queue limits, in-flight and queued calls, totals.
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._pending - self._in_flight),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[str, PluginExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_executor(name: str, max_workers: int, max_queue: int) -> PluginExecutor:
+    """
+    Return the executor for a plugin, creating it on first use.
+
+    Args:
+        name (str): Plugin name.
+        max_workers (int): Worker threads for a newly created executor.
+        max_queue (int): Queue-depth limit for a newly created executor.
+
+    Returns:
+        PluginExecutor: Shared executor instance.
+    """
+    ex = _executors.get(name)
+    if ex is None:
+        with _lock:
+            ex = _executors.get(name)
+            if ex is None:
+                ex = PluginExecutor(name, max_workers, max_queue)
+                _executors[name] = ex
+    return ex
+
+
+def drop_executors(name: str | None = None) -> None:
+    """
+    Shut down executors for one plugin, or all of them.
+
+    Args:
+        name (str | None): Plugin name, or None for every plugin.
+    """
+    with _lock:
+        keys = [k for k in _executors if name is None or k == name]
+        items = [_executors.pop(k) for k in keys]
+    for ex in items:
+        ex.shutdown()
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return stats for every active executor, keyed by plugin name.
+    """
+    return {n: ex.stats() for n, ex in list(_executors.items())}
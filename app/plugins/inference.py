@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import functools
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import torch
+
+from app.core.config import get_settings
+from app.runtime import pick_device, pick_dtype
+
+from .base import AIPlugin
+
+
+@functools.lru_cache(maxsize=None)
+def _default_cast() -> Tuple[str, torch.dtype]:
+    dev = pick_device()
+    return dev.type, pick_dtype(str(dev))
+
+
+def inference_policy(plugin: AIPlugin) -> Tuple[bool, Optional[Tuple[str, torch.dtype]]]:
+    """
+    Decide how a plugin's calls are wrapped, from its manifest and `Settings`.
+
+    Manifest keys (both optional):
+        "inference_mode": false opts out of `torch.inference_mode()`, e.g. for plugins that
+            need autograd (saliency maps, test-time adaptation).
+        "autocast": true to autocast to `pick_dtype()`, a dtype name such as "bfloat16",
+            or false; defaults to `APP_AUTOCAST`.
+
+    Returns:
+        Tuple[bool, Optional[Tuple[str, torch.dtype]]]: Whether to use inference mode, and the
+            (device type, dtype) to autocast to, or None.
+    """
+    settings = get_settings()
+    manifest = getattr(plugin, "manifest", None) or {}
+    enabled = bool(manifest.get("inference_mode", settings.INFERENCE_MODE))
+
+    cast = manifest.get("autocast", settings.AUTOCAST)
+    if not cast:
+        return enabled, None
+    device_type, dtype = _default_cast()
+    if isinstance(cast, str):
+        dtype = getattr(torch, cast)
+    if dtype == torch.float32 or device_type not in ("cuda", "cpu", "mps"):
+        return enabled, None  # nothing to cast to
+    return enabled, (device_type, dtype)
+
+
+@contextmanager
+def inference_context(plugin: AIPlugin) -> Iterator[None]:
+    """
+    Run a block of plugin code under `torch.inference_mode()` and optional autocast.
+
+    Grad mode and autocast are thread-local, so this is entered on the
+    thread that runs the plugin (worker thread, batcher thread or worker
+    process), never around an `await`.
+    """
+    enabled, cast = inference_policy(plugin)
+    with ExitStack() as stack:
+        if enabled:
+            stack.enter_context(torch.inference_mode())
+        if cast is not None:
+            stack.enter_context(torch.autocast(device_type=cast[0], dtype=cast[1]))
+        yield
+
+
+def guarded(plugin: AIPlugin, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a blocking plugin entry point (`infer`, `infer_batch`, ...) in `inference_context`.
+    """
+
+    @functools.wraps(fn)
+    def call(*args: Any, **kwargs: Any) -> Any:
+        with inference_context(plugin):
+            return fn(*args, **kwargs)
+
+    return call
@@ -3,15 +3,26 @@ from __future__ import annotations
 import importlib.util
 import json
 import pathlib
+import threading
 import traceback
-from typing import Any, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
+from app.core.config import get_settings
+from app.utils.model_cache import release_models, touch_models
+
+from . import warm_state
 from .base import AIPlugin
+from .process_pool import make_process_plugin
+from .resident import ResidentSet
 
 PLUGIN_DIR = pathlib.Path(__file__).resolve().parent
 
-_registry: Dict[str, AIPlugin] = {}
+_folders: Dict[str, pathlib.Path] = {}
 _meta: Dict[str, Dict[str, Any]] = {}
+_resident: ResidentSet | None = None
+_warming: Set[str] = set()  # startup warm set still loading; readiness waits only for these
+_warming_lock = threading.Lock()
 
 
 def _load_manifest(folder: pathlib.Path) -> Dict[str, Any]:
@@ -36,14 +47,75 @@ def _load_module(folder: pathlib.Path):
     return module
 
 
+def _isolation(manifest: Dict[str, Any]) -> str:
+    return str(manifest.get("isolation") or get_settings().PLUGIN_ISOLATION).lower()
+
+
+def _wrap_process(plugin: AIPlugin, folder: pathlib.Path, name: str, manifest: Dict[str, Any]) -> AIPlugin:
+    """Host a plugin in worker processes (manifest "isolation": "process")."""
+    s = get_settings()
+    workers = int(manifest.get("workers") or s.PLUGIN_PROCESS_WORKERS)
+    start_method = str(manifest.get("start_method") or s.PLUGIN_PROCESS_START_METHOD)
+    return make_process_plugin(
+        plugin,
+        folder,
+        name,
+        workers=workers,
+        timeout=s.PLUGIN_PROCESS_TIMEOUT_SEC,
+        start_method=start_method,
+        load_timeout=s.PLUGIN_PROCESS_LOAD_TIMEOUT_SEC,
+    )
+
+
+def _build(name: str) -> AIPlugin:
+    """Import, instantiate and load one registered plug-in."""
+    folder = _folders[name]
+    module = _load_module(folder)
+    if not module or not hasattr(module, "Plugin"):
+        raise RuntimeError(f"Plugin '{name}' has no Plugin class in {folder / 'plugin.py'}")
+    plugin: AIPlugin = getattr(module, "Plugin")()
+    plugin.name = name
+    manifest = _meta.get(name, {})
+    plugin.manifest = manifest
+    if _isolation(manifest) == "process":
+        plugin = _wrap_process(plugin, folder, name, manifest)
+        plugin.load()
+    else:
+        warm_state.load_plugin(plugin, name)
+    touch_models(manifest)
+    return plugin
+
+
+def _resident_set() -> ResidentSet:
+    global _resident
+    if _resident is None:
+        s = get_settings()
+        _resident = ResidentSet(
+            _build,
+            ram_budget_mb=s.PLUGIN_RAM_BUDGET_MB,
+            device_budget_mb=s.PLUGIN_DEVICE_BUDGET_MB,
+            manifest_of=lambda n: _meta.get(n, {}),
+            on_unload=lambda n: release_models(_meta.get(n)),
+        )
+    return _resident
+
+
 def discover(reload: bool = False) -> Tuple[Dict[str, AIPlugin], Dict[str, Dict[str, Any]]]:
-    """Scan plugins/* and load each plug-in with its manifest."""
-    global _registry, _meta
+    """
+    Scan plugins/* and register each plug-in from its manifest.
+
+    Plug-ins are only imported and loaded on first use (see `acquire`), unless
+    lazy loading is disabled in settings.
+
+    Returns:
+        Tuple: (live view of resident plug-ins, manifest metadata of all registered plug-ins).
+    """
     if reload:
-        _registry, _meta = {}, {}
+        shutdown()
 
+    resident = _resident_set()
     if not PLUGIN_DIR.exists():
-        return _registry, _meta
+        return resident.plugins, _meta
 
     for folder in sorted(PLUGIN_DIR.iterdir()):
         if not folder.is_dir():
@@ -54,25 +126,134 @@ def discover(reload: bool = False) -> Tuple[Dict[str, AIPlugin], Dict[str, Dict[
         if name.startswith(".") or name == "__pycache__":
             continue
 
-        if name in _registry:
+        if name in _meta or not (folder / "plugin.py").exists():
             continue
-        try:
-            module = _load_module(folder)
-            if not module or not hasattr(module, "Plugin"):
-                continue
-            plugin_cls = getattr(module, "Plugin")
-            plugin: AIPlugin = plugin_cls()
-            plugin.name = name
-            plugin.load()
-            _registry[name] = plugin
-            _meta[name] = {"name": name, **_load_manifest(folder)}
-        except Exception:
-            print(f"[plugin] failed to load '{name}':\n{traceback.format_exc()}")
-    return _registry, _meta
+        _folders[name] = folder
+        _meta[name] = {"name": name, **_load_manifest(folder)}
+
+    if not get_settings().PLUGINS_LAZY_LOAD:
+        for name in list(_meta):
+            try:
+                acquire(name)
+                release(name)
+            except Exception:
+                print(f"[plugin] failed to load '{name}':\n{traceback.format_exc()}")
+    return resident.plugins, _meta
+
+
+def acquire(name: str) -> AIPlugin:
+    """
+    Return a loaded plug-in, loading it (and evicting idle ones) if needed.
+
+    Every call must be paired with `release(name)` once the plug-in is no longer in use.
+
+    Raises:
+        KeyError: If no plug-in with this name is registered.
+    """
+    if name not in _folders:
+        raise KeyError(name)
+    return _resident_set().acquire(name)
+
+
+def release(name: str) -> None:
+    _resident_set().release(name)
+
+
+def unload(name: str) -> bool:
+    """Unload an idle plug-in; it is loaded again on its next use."""
+    return _resident_set().unload(name)
+
+
+def warm_targets(patterns: Iterable[str]) -> List[str]:
+    """
+    Select registered plug-ins to load at startup.
+
+    "*" selects every plug-in whose manifest does not set "warm": false;
+    other entries are plug-in names.
+    """
+    patterns = list(patterns)
+    names = [n for n in _meta if n in patterns]
+    if "*" in patterns:
+        names += [n for n, m in _meta.items() if m.get("warm", True) and n not in names]
+    return names
+
+
+def _warm_one(name: str) -> None:
+    try:
+        acquire(name)
+        release(name)
+    except Exception:
+        print(f"[plugin] failed to load '{name}':\n{traceback.format_exc()}")
+    finally:
+        with _warming_lock:
+            _warming.discard(name)
+
+
+def warm(names: List[str], max_workers: int = 4) -> Optional[ThreadPoolExecutor]:
+    """
+    Load plug-ins concurrently in the background.
+
+    Each plug-in is marked "loading" right away and counted in `warming()`
+    until its load finishes, so readiness checks wait for it.
+
+    Args:
+        names (List[str]): Plug-ins to load.
+        max_workers (int): Number of plug-ins loaded in parallel.
+
+    Returns:
+        ThreadPoolExecutor | None: The pool running the loads (shut it down to cancel pending ones).
+    """
+    if not names:
+        return None
+    resident = _resident_set()
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plugin-warm")
+    for name in names:
+        if name not in resident.plugins:
+            resident.mark(name, "loading")
+        with _warming_lock:
+            _warming.add(name)
+        pool.submit(_warm_one, name)
+    pool.shutdown(wait=False)
+    return pool
+
+
+def warming() -> List[str]:
+    """
+    Plug-ins of the startup warm set that have not finished loading.
+
+    On-demand loads and reloads after eviction are not included: they show as
+    "loading" in `status()` but do not make the node unready.
+    """
+    with _warming_lock:
+        return sorted(_warming)
+
+
+def status() -> Dict[str, Dict[str, Any]]:
+    """
+    Lifecycle state of every registered plug-in: registered, loading, ready, failed or unloaded.
+    """
+    resident = _resident_set()
+    return {n: resident.state(n) or {"state": "registered"} for n in _meta}
+
+
+def resident_stats() -> Dict[str, Any]:
+    return _resident_set().stats()
+
+
+def shutdown() -> None:
+    """Unload every plug-in (stopping worker processes) and clear the registry."""
+    global _resident
+    if _resident is not None:
+        _resident.unload_all()
+        _resident = None
+    with _warming_lock:
+        _warming.clear()
+    _folders.clear()
+    _meta.clear()
 
 
 def get(name: str) -> AIPlugin | None:
-    return _registry.get(name)
+    return _resident_set().plugins.get(name)
 
 
 def all_meta() -> Dict[str, Dict[str, Any]]:
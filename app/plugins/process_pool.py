@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import pathlib
+import pickle
+import queue
+import threading
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+
+from .base import AIPlugin, supports_batching
+from .inference import inference_context
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy is optional
+    np = None
+
+log = logging.getLogger("plugins.process_pool")
+
+# Arrays smaller than this are cheaper to pickle inline than to place in shared memory.
+SHM_MIN_BYTES = 4096
+
+
+# ================================
+# Shared-memory tensor transport
+# ================================
+class _ShmArray:
+    """
+    Picklable handle describing an array stored in a shared-memory block.
+    """
+
+    __slots__ = ("shm", "kind", "dtype", "shape")
+
+    def __init__(self, shm: str, kind: str, dtype: str, shape: Tuple[int, ...]) -> None:
+        self.shm = shm
+        self.kind = kind
+        self.dtype = dtype
+        self.shape = shape
+
+    def __getstate__(self):
+        return (self.shm, self.kind, self.dtype, self.shape)
+
+    def __setstate__(self, state):
+        self.shm, self.kind, self.dtype, self.shape = state
+
+
+def _to_shm(x: Any, owned: List[shared_memory.SharedMemory]) -> _ShmArray:
+    if isinstance(x, torch.Tensor):
+        t = x.detach().cpu().contiguous()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, t.numel() * t.element_size()))
+        owned.append(shm)
+        if t.numel():
+            torch.frombuffer(shm.buf, dtype=t.dtype, count=t.numel()).copy_(t.reshape(-1))
+        return _ShmArray(shm.name, "torch", str(t.dtype).replace("torch.", ""), tuple(t.shape))
+
+    arr = np.ascontiguousarray(x)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    owned.append(shm)
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return _ShmArray(shm.name, "numpy", arr.dtype.str, arr.shape)
+
+
+def _from_shm(ref: _ShmArray, attached: List[shared_memory.SharedMemory], copy: bool) -> Any:
+    shm = shared_memory.SharedMemory(name=ref.shm)
+    attached.append(shm)
+    if ref.kind == "torch":
+        dtype = getattr(torch, ref.dtype)
+        numel = 1
+        for d in ref.shape:
+            numel *= d
+        t = torch.frombuffer(shm.buf, dtype=dtype, count=numel) if numel else torch.empty(0, dtype=dtype)
+        t = t.view(ref.shape)
+        return t.clone() if copy else t
+    arr = np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf)
+    return arr.copy() if copy else arr
+
+
+def _is_array(x: Any) -> bool:
+    if isinstance(x, torch.Tensor):
+        return x.numel() * x.element_size() >= SHM_MIN_BYTES
+    return np is not None and isinstance(x, np.ndarray) and x.nbytes >= SHM_MIN_BYTES and x.dtype.kind in "biufc"
+
+
+def pack(obj: Any, owned: List[shared_memory.SharedMemory]) -> Any:
+    """
+    Replace large arrays/tensors inside `obj` with shared-memory handles.
+
+    Args:
+        obj (Any): Payload or result (dicts, lists and tuples are walked).
+        owned (List[SharedMemory]): Receives the blocks created; the caller unlinks them.
+
+    Returns:
+        Any: Structure safe to send over a pipe without pickling array data.
+    """
+    if _is_array(obj):
+        return _to_shm(obj, owned)
+    if isinstance(obj, dict):
+        return {k: pack(v, owned) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(pack(v, owned) for v in obj)
+    return obj
+
+
+def unpack(obj: Any, attached: List[shared_memory.SharedMemory], copy: bool = False) -> Any:
+    """
+    Turn shared-memory handles back into NumPy arrays / torch tensors.
+
+    Args:
+        obj (Any): Structure produced by `pack`.
+        attached (List[SharedMemory]): Receives the attached blocks; the caller closes them.
+        copy (bool): Copy data out of shared memory (needed when the block is released right away).
+
+    Returns:
+        Any: Structure with arrays restored (zero-copy views unless `copy`).
+    """
+    if isinstance(obj, _ShmArray):
+        return _from_shm(obj, attached, copy)
+    if isinstance(obj, dict):
+        return {k: unpack(v, attached, copy) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(unpack(v, attached, copy) for v in obj)
+    return obj
+
+
+def _unlink_handles(obj: Any) -> None:
+    # Free the blocks of a result that will never be unpacked (e.g. a reply after a timeout).
+    if isinstance(obj, _ShmArray):
+        try:
+            shm = shared_memory.SharedMemory(name=obj.shm)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _unlink_handles(v)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _unlink_handles(v)
+
+
+def _picklable(e: Exception) -> Optional[Exception]:
+    try:
+        pickle.loads(pickle.dumps(e))
+    except Exception:
+        return None
+    return e
+
+
+def _release(blocks: List[shared_memory.SharedMemory], unlink: bool) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still referenced (e.g. kept by the plugin); the mapping is freed on GC.
+            pass
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ================================
+# Worker process
+# ================================
+def _build_plugin(spec: Tuple[str, str]) -> AIPlugin:
+    from . import warm_state
+    from .loader import _load_manifest, _load_module
+
+    folder, name = spec
+    module = _load_module(pathlib.Path(folder))
+    plugin: AIPlugin = getattr(module, "Plugin")()
+    plugin.name = name
+    plugin.manifest = _load_manifest(pathlib.Path(folder))
+    warm_state.load_plugin(plugin, name)
+    return plugin
+
+
+def _error(e: Exception) -> Tuple[Optional[Exception], str, str, str]:
+    return (_picklable(e), type(e).__name__, str(e), traceback.format_exc())
+
+
+def _worker_main(conn, plugin: Optional[AIPlugin], spec: Optional[Tuple[str, str]]) -> None:
+    # The first message tells the parent whether the plugin could be built.
+    try:
+        if plugin is None:
+            plugin = _build_plugin(spec)  # type: ignore[arg-type]
+    except Exception as e:
+        conn.send(("error", _error(e)))
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        method, packed = msg
+        attached: List[shared_memory.SharedMemory] = []
+        owned: List[shared_memory.SharedMemory] = []
+        try:
+            payload = unpack(packed, attached)
+            with inference_context(plugin):
+                result = getattr(plugin, method)(payload)
+            reply = ("ok", pack(result, owned))
+        except Exception as e:
+            reply = ("err", _error(e))
+        try:
+            conn.send(reply)
+        finally:
+            # The parent unlinks result blocks after copying them out.
+            _release(owned, unlink=False)
+            _release(attached, unlink=False)
+
+
+def _share_weights(plugin: AIPlugin) -> None:
+    """
+    Move module weights into shared memory so forked workers map the same pages.
+    """
+    for value in vars(plugin).values():
+        if isinstance(value, torch.nn.Module):
+            value.share_memory()
+
+
+def _raise_remote(name: str, body: Tuple[Optional[Exception], str, str, str]) -> None:
+    exc, etype, msg, tb = body
+    log.debug("worker error in '%s':\n%s", name, tb)
+    if exc is not None:
+        raise exc
+    raise RuntimeError(f"{etype}: {msg}")
+
+
+class _Worker:
+    def __init__(self, ctx, index: int, plugin: Optional[AIPlugin], spec: Optional[Tuple[str, str]], name: str):
+        self.index = index
+        self.name = name
+        self.ready = False
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=_worker_main, args=(child, plugin, spec), name=f"plugin-{name}-{index}", daemon=True
+        )
+        self.proc.start()
+        child.close()
+
+    def wait_ready(self, timeout: Optional[float]) -> None:
+        """
+        Wait for the worker to report that it built and loaded the plugin.
+
+        Raises:
+            TimeoutError: If it does not report within `timeout` seconds.
+            Exception: The worker's load error, or RuntimeError if it exited without reporting.
+        """
+        try:
+            if not self.conn.poll(timeout):
+                raise TimeoutError(f"Plugin '{self.name}' worker {self.index} did not load within {timeout}s")
+            status, body = self.conn.recv()
+        except (EOFError, OSError):
+            raise RuntimeError(f"Plugin '{self.name}' worker {self.index} exited while loading") from None
+        if status == "error":
+            _raise_remote(self.name, body)
+        self.ready = True
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.proc.join(timeout=2)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join(timeout=2)
+        # A reply that arrived after the caller gave up still owns shared-memory blocks
+        try:
+            while self.conn.poll(0):
+                status, body = self.conn.recv()
+                if status == "ok":
+                    _unlink_handles(body)
+        except (EOFError, OSError):
+            pass
+        self.conn.close()
+
+
+class ProcessPlugin(AIPlugin):
+    """
+    Proxy that hosts a plugin in N worker processes.
+
+    With the default `spawn` (or `forkserver`) start method, each worker
+    imports and loads the plugin itself in a fresh interpreter, so weights are
+    read once per worker; those loaded through `app.utils.weights`
+    (memory-mapped safetensors) still share one copy in the page cache. `fork` is
+    opt-in: the plugin is loaded once in the parent, its module weights are
+    moved to shared memory, and workers inherit them without copying; forking
+    a server that already runs threads (event loop, executors, OpenMP) can
+    deadlock the children, so use it only where that is known to be safe.
+    Array and tensor payloads travel through shared-memory blocks; only small
+    handles are pickled. `load()` returns once every worker has loaded the
+    plugin. A worker that dies (busy or idle) or times out is replaced.
+
+    Args:
+        inner (AIPlugin): Plugin instance, not yet loaded.
+        spec (Tuple[str, str]): (plugin folder, plugin name) to rebuild the plugin in a worker.
+        workers (int): Number of worker processes.
+        timeout (float | None): Seconds to wait for a reply before restarting the worker.
+        start_method (str): "spawn", "forkserver" or "fork".
+        load_timeout (float | None): Seconds to wait for a worker to load the plugin.
+    """
+
+    def __init__(
+        self,
+        inner: AIPlugin,
+        spec: Tuple[str, str],
+        workers: int = 2,
+        timeout=None,
+        start_method: str = "spawn",
+        load_timeout: Optional[float] = None,
+    ) -> None:
+        self.name = spec[1]
+        self.tasks = list(getattr(inner, "tasks", []) or [])
+        self.spec = spec
+        self.num_workers = max(1, int(workers))
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self.restarts = 0
+        if start_method not in mp.get_all_start_methods():
+            raise ValueError(f"Start method {start_method!r} is not available; use one of {mp.get_all_start_methods()}")
+        use_fork = start_method == "fork"
+        self._ctx = mp.get_context(start_method)
+        self._inner: Optional[AIPlugin] = inner if use_fork else None
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def _spawn(self, index: int) -> _Worker:
+        return _Worker(self._ctx, index, self._inner, None if self._inner else self.spec, self.name)
+
+    def _restart(self, w: _Worker) -> _Worker:
+        log.warning("restarting worker %d of plugin '%s'", w.index, self.name)
+        w.stop()
+        nw = self._spawn(w.index)
+        with self._lock:
+            self._workers[w.index] = nw
+            self.restarts += 1
+        return nw
+
+    def load(self) -> None:
+        """
+        Load the plugin once (with `fork`), start the worker processes and wait until each has loaded it.
+
+        Raises:
+            Exception: The first worker's load error (or TimeoutError); all workers are stopped.
+        """
+        if self._inner is not None:
+            self._inner.load()
+            _share_weights(self._inner)
+        if os.name == "posix":
+            # Start the tracker before the workers so parent and children share it.
+            resource_tracker.ensure_running()
+        workers = [self._spawn(i) for i in range(self.num_workers)]
+        try:
+            for w in workers:
+                w.wait_ready(self.load_timeout)
+        except BaseException:
+            for w in workers:
+                w.stop()
+            raise
+        for w in workers:
+            self._workers.append(w)
+            self._idle.put(w)
+
+    def _call(self, method: str, payload: Any) -> Any:
+        w = self._idle.get()
+        owned: List[shared_memory.SharedMemory] = []
+        try:
+            if not w.proc.is_alive():  # died while idle: replace it before sending it work
+                w = self._restart(w)
+            if not w.ready:  # a replacement still loading
+                w.wait_ready(self.load_timeout)
+            try:
+                w.conn.send((method, pack(payload, owned)))
+                ready = w.conn.poll(self.timeout)
+                reply = w.conn.recv() if ready else None
+            except (EOFError, OSError):
+                w = self._restart(w)
+                raise RuntimeError(f"Plugin '{self.name}' worker crashed")
+            if reply is None:
+                w = self._restart(w)
+                raise TimeoutError(f"Plugin '{self.name}' worker timed out after {self.timeout}s")
+            status, body = reply
+        finally:
+            _release(owned, unlink=True)
+            self._idle.put(w)
+
+        if status == "err":
+            _raise_remote(self.name, body)
+
+        attached: List[shared_memory.SharedMemory] = []
+        try:
+            return unpack(body, attached, copy=True)
+        finally:
+            _release(attached, unlink=True)
+
+    def infer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call("infer", payload)
+
+    def close(self) -> None:
+        """
+        Stop all worker processes.
+        """
+        for w in list(self._workers):
+            w.stop()
+        self._workers.clear()
+
+    def unload(self) -> None:
+        self.close()
+        if self._inner is not None:
+            self._inner.unload()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "alive": sum(1 for w in self._workers if w.proc.is_alive()),
+            "pids": [w.proc.pid for w in self._workers],
+            "restarts": self.restarts,
+            "start_method": self._ctx.get_start_method(),
+        }
+
+
+class BatchedProcessPlugin(ProcessPlugin):
+    """
+    ProcessPlugin variant that forwards `infer_batch` to the workers.
+    """
+
+    def infer_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._call("infer_batch", payloads)
+
+
+def make_process_plugin(
+    inner: AIPlugin,
+    folder: pathlib.Path,
+    name: str,
+    workers: int,
+    timeout=None,
+    start_method: str = "spawn",
+    load_timeout: Optional[float] = None,
+) -> ProcessPlugin:
+    """
+    Wrap a plugin so its calls run in a pool of worker processes.
+
+    Args:
+        inner (AIPlugin): Plugin instance, not yet loaded.
+        folder (pathlib.Path): Plugin folder, used to rebuild it in spawned workers.
+        name (str): Plugin name.
+        workers (int): Number of worker processes.
+        timeout (float | None): Per-call reply timeout in seconds.
+        start_method (str): Multiprocessing start method ("fork" is opt-in).
+        load_timeout (float | None): Seconds to wait for each worker to load the plugin.
+
+    Returns:
+        ProcessPlugin: Proxy exposing the same plugin interface.
+    """
+    cls = BatchedProcessPlugin if supports_batching(inner) else ProcessPlugin
+    return cls(
+        inner,
+        (str(folder), name),
+        workers=workers,
+        timeout=timeout,
+        start_method=start_method,
+        load_timeout=load_timeout,
+    )
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import torch
+
+from app.core import metrics
+
+from .base import AIPlugin
+from .batching import drop_batchers
+
+log = logging.getLogger("plugins.resident")
+
+MB = 1024 * 1024
+
+
+def _rss_bytes() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+def module_footprint(plugin: AIPlugin) -> Tuple[int, int]:
+    """
+    Sum parameter and buffer bytes of the torch modules held by a plugin.
+
+    Args:
+        plugin (AIPlugin): Loaded plugin.
+
+    Returns:
+        Tuple[int, int]: (bytes in host RAM, bytes on accelerator devices).
+    """
+    ram = dev = 0
+    seen = set()
+    for value in vars(plugin).values():
+        if not isinstance(value, torch.nn.Module):
+            continue
+        for t in list(value.parameters()) + list(value.buffers()):
+            key = (t.device, t.data_ptr())
+            if key in seen:
+                continue
+            seen.add(key)
+            nbytes = t.numel() * t.element_size()
+            if t.device.type == "cpu":
+                ram += nbytes
+            else:
+                dev += nbytes
+    return ram, dev
+
+
+class _Entry:
+    __slots__ = ("name", "plugin", "ram", "dev", "refs", "last_used")
+
+    def __init__(self, name: str, plugin: AIPlugin, ram: int, dev: int) -> None:
+        self.name = name
+        self.plugin = plugin
+        self.ram = ram
+        self.dev = dev
+        self.refs = 0
+        self.last_used = time.time()
+
+
+class ResidentSet:
+    """
+    Keep loaded plugins in memory on demand and evict the least-recently-used ones.
+
+    Plugins are built (imported, instantiated and loaded) the first time they
+    are acquired. After each load, idle plugins are unloaded in LRU order until
+    the resident RAM and device footprints fit their budgets. Plugins with
+    calls in progress are never evicted.
+
+    Args:
+        build (Callable[[str], AIPlugin]): Returns a loaded plugin for a name.
+        ram_budget_mb (float | None): Host memory budget for resident plugins.
+        device_budget_mb (float | None): Accelerator memory budget for resident plugins.
+        manifest_of (Callable[[str], Dict[str, Any]] | None): Manifest lookup; "memory_mb" and
+            "device_memory_mb" override the measured footprint.
+        on_unload (Callable[[str], None] | None): Called with the plugin name after it is unloaded.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[str], AIPlugin],
+        ram_budget_mb: Optional[float] = None,
+        device_budget_mb: Optional[float] = None,
+        manifest_of: Optional[Callable[[str], Dict[str, Any]]] = None,
+        on_unload: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._build = build
+        self.ram_budget = int(ram_budget_mb * MB) if ram_budget_mb else None
+        self.device_budget = int(device_budget_mb * MB) if device_budget_mb else None
+        self._manifest_of = manifest_of or (lambda name: {})
+        self._on_unload = on_unload
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[str, Any]] = {}
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self._states: Dict[str, Dict[str, Any]] = {}
+        # Live name -> plugin view of resident plugins
+        self.plugins: Dict[str, AIPlugin] = {}
+
+    def _hit(self, name: str) -> Optional[AIPlugin]:
+        e = self._entries.get(name)
+        if e is None:
+            return None
+        e.refs += 1
+        e.last_used = time.time()
+        self._entries.move_to_end(name)
+        return e.plugin
+
+    def acquire(self, name: str) -> AIPlugin:
+        """
+        Return a resident plugin, loading it first if needed. Pair with `release`.
+
+        Args:
+            name (str): Plugin name.
+
+        Returns:
+            AIPlugin: The loaded plugin.
+        """
+        with self._lock:
+            plugin = self._hit(name)
+            if plugin is not None:
+                return plugin
+            load_lock = self._loading.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                plugin = self._hit(name)
+                if plugin is not None:
+                    return plugin
+
+            self.mark(name, "loading")
+            rss0 = _rss_bytes()
+            t0 = time.perf_counter()
+            try:
+                plugin = self._build(name)
+            except Exception as e:
+                self.mark(name, "failed", error=str(e))
+                raise
+            load_sec = time.perf_counter() - t0
+            ram, dev = self._footprint(name, plugin, max(0, _rss_bytes() - rss0))
+
+            with self._lock:
+                entry = _Entry(name, plugin, ram, dev)
+                entry.refs = 1
+                self._entries[name] = entry
+                self.plugins[name] = plugin
+                victims = self._select_victims(exclude=name)
+                t = self._timings.setdefault(name, {"loads": 0, "evictions": 0})
+                t["loads"] += 1
+                t["last_load_sec"] = round(load_sec, 4)
+                self._states[name] = {"state": "ready", "load_sec": round(load_sec, 4)}
+            self._event("load", name, load_sec, ram, dev)
+            metrics.observe_load(name, load_sec)
+            log.info("loaded plugin '%s' in %.3fs (ram=%.1fMB device=%.1fMB)", name, load_sec, ram / MB, dev / MB)
+
+        for victim in victims:
+            self._unload(victim, reason="evict")
+        return plugin
+
+    def release(self, name: str) -> None:
+        """
+        Mark one call on a plugin as finished.
+
+        Args:
+            name (str): Plugin name.
+        """
+        with self._lock:
+            e = self._entries.get(name)
+            if e is not None and e.refs > 0:
+                e.refs -= 1
+
+    def unload(self, name: str) -> bool:
+        """
+        Unload a plugin explicitly if it is idle.
+
+        Args:
+            name (str): Plugin name.
+
+        Returns:
+            bool: True if the plugin was resident and has been unloaded.
+        """
+        with self._lock:
+            e = self._entries.get(name)
+            if e is None or e.refs > 0:
+                return False
+            self._pop(name)
+        self._unload(e, reason="unload")
+        return True
+
+    def unload_all(self) -> None:
+        """
+        Unload every resident plugin regardless of usage (shutdown path).
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self.plugins.clear()
+        for e in entries:
+            self._unload(e, reason="shutdown")
+
+    def mark(self, name: str, state: str, **extra: Any) -> None:
+        """
+        Record the lifecycle state of a plugin (loading, ready, failed, unloaded).
+
+        Args:
+            name (str): Plugin name.
+            state (str): New state.
+            **extra (Any): Additional fields such as "error".
+        """
+        with self._lock:
+            self._states[name] = {"state": state, **extra}
+
+    def state(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the last recorded lifecycle state of a plugin, if any.
+        """
+        with self._lock:
+            st = self._states.get(name)
+            return dict(st) if st else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return resident plugins, footprints, budgets and load/eviction timings.
+
+        Returns:
+            Dict[str, Any]: Snapshot of the resident set.
+        """
+        with self._lock:
+            resident = {
+                n: {
+                    "ram_mb": round(e.ram / MB, 2),
+                    "device_mb": round(e.dev / MB, 2),
+                    "in_use": e.refs,
+                    "last_used": e.last_used,
+                }
+                for n, e in self._entries.items()
+            }
+            return {
+                "lru_order": list(self._entries),
+                "resident": resident,
+                "ram_mb": round(sum(e.ram for e in self._entries.values()) / MB, 2),
+                "device_mb": round(sum(e.dev for e in self._entries.values()) / MB, 2),
+                "ram_budget_mb": self.ram_budget / MB if self.ram_budget else None,
+                "device_budget_mb": self.device_budget / MB if self.device_budget else None,
+                "timings": {n: dict(t) for n, t in self._timings.items()},
+                "events": list(self.events),
+            }
+
+    def _footprint(self, name: str, plugin: AIPlugin, rss_delta: int) -> Tuple[int, int]:
+        ram, dev = module_footprint(plugin)
+        if not ram and not dev:
+            ram = rss_delta
+        manifest = self._manifest_of(name)
+        if manifest.get("memory_mb") is not None:
+            ram = int(float(manifest["memory_mb"]) * MB)
+        if manifest.get("device_memory_mb") is not None:
+            dev = int(float(manifest["device_memory_mb"]) * MB)
+        return ram, dev
+
+    def _pop(self, name: str) -> None:
+        self._entries.pop(name, None)
+        self.plugins.pop(name, None)
+
+    def _select_victims(self, exclude: str) -> List[_Entry]:
+        victims: List[_Entry] = []
+        for budget, attr in ((self.ram_budget, "ram"), (self.device_budget, "dev")):
+            if budget is None:
+                continue
+            total = sum(getattr(e, attr) for e in self._entries.values())
+            for n, e in list(self._entries.items()):
+                if total <= budget:
+                    break
+                if n == exclude or e.refs > 0 or not getattr(e, attr):
+                    continue
+                total -= getattr(e, attr)
+                victims.append(e)
+                self._pop(n)
+        return victims
+
+    def _unload(self, e: _Entry, reason: str) -> None:
+        t0 = time.perf_counter()
+        drop_batchers(e.name)
+        try:
+            e.plugin.unload()
+        except Exception:
+            log.exception("unload() failed for plugin '%s'", e.name)
+        e.plugin = None  # type: ignore[assignment]
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        dt = time.perf_counter() - t0
+        with self._lock:
+            t = self._timings.setdefault(e.name, {"loads": 0, "evictions": 0})
+            if reason == "evict":
+                t["evictions"] += 1
+            t["last_unload_sec"] = round(dt, 4)
+            self._states[e.name] = {"state": "unloaded"}
+        self._event(reason, e.name, dt, e.ram, e.dev)
+        if self._on_unload is not None:
+            self._on_unload(e.name)
+        log.info("%s plugin '%s' in %.3fs (freed ram=%.1fMB device=%.1fMB)", reason, e.name, dt, e.ram / MB, e.dev / MB)
+
+    def _event(self, kind: str, name: str, sec: float, ram: int, dev: int) -> None:
+        self.events.append(
+            {
+                "event": kind,
+                "plugin": name,
+                "sec": round(sec, 4),
+                "ram_mb": round(ram / MB, 2),
+                "device_mb": round(dev / MB, 2),
+                "at": time.time(),
+            }
+        )
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from .base import AIPlugin
+from .executor import PluginExecutor
+from .inference import inference_context
+
+_END = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+async def iterate(
+    executor: PluginExecutor, plugin: AIPlugin, payload: Dict[str, Any], buffer: int = 8
+) -> AsyncIterator[Any]:
+    """
+    Drive a plugin's `stream()` and yield its chunks on the event loop.
+
+    Sync generators run on one of the plugin's worker threads for the whole
+    stream and hand chunks over through a bounded queue: when `buffer` chunks
+    are waiting the generator is paused until the client catches up. Async
+    generators are iterated directly under the executor's admission limit.
+
+    Closing this iterator early (e.g. on client disconnect) stops the plugin's
+    generator after its current step and runs its cleanup.
+
+    Args:
+        executor (PluginExecutor): The plugin's executor.
+        plugin (AIPlugin): Plugin implementing `stream`.
+        payload (Dict[str, Any]): Payload including the "task" key.
+        buffer (int): Chunks produced ahead of the consumer.
+
+    Yields:
+        Any: Chunks produced by the plugin.
+
+    Raises:
+        ExecutorBusy: If the plugin's queue-depth limit is reached.
+    """
+    if inspect.isasyncgenfunction(type(plugin).stream):
+        async with executor.slot():
+            agen = plugin.stream(payload)
+            try:
+                async for item in agen:  # type: ignore[union-attr]
+                    yield item
+            finally:
+                await agen.aclose()  # type: ignore[union-attr]
+        return
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer))
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        # Blocks the worker thread while the queue is full (backpressure).
+        fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                fut.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    fut.cancel()
+                    return False
+
+    def produce() -> None:
+        gen: Iterator[Any] = plugin.stream(payload)
+        try:
+            with inference_context(plugin):
+                for item in gen:
+                    if stop.is_set() or not put(item):
+                        return
+            put(_END)
+        except Exception as e:
+            put(_Failure(e))
+        finally:
+            close = getattr(gen, "close", None)
+            if close is not None:
+                close()
+
+    task = asyncio.ensure_future(executor.run(produce))
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                # The producer finished without a sentinel (rejected or crashed).
+                getter.cancel()
+                task.result()
+                return
+            item = getter.result()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+        if getter is not None and not getter.done():
+            getter.cancel()
+        # Unblock a producer waiting on a full queue so it can observe `stop`.
+        while not queue.empty():
+            queue.get_nowait()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+class StreamStats:
+    """
+    Counters for streamed responses, including time-to-first-chunk.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters = {"streams": 0, "completed": 0, "cancelled": 0, "errors": 0, "chunks": 0}
+        self._ttft_sum = 0.0
+        self._ttft_n = 0
+        self._ttft_last = 0.0
+
+    def record(self, outcome: str, chunks: int, ttft: float | None) -> None:
+        """
+        Record a finished stream.
+
+        Args:
+            outcome (str): "completed", "cancelled" or "errors".
+            chunks (int): Chunks sent to the client.
+            ttft (float | None): Seconds until the first chunk, if one was produced.
+        """
+        with self._lock:
+            self.counters["streams"] += 1
+            self.counters[outcome] += 1
+            self.counters["chunks"] += chunks
+            if ttft is not None:
+                self._ttft_sum += ttft
+                self._ttft_n += 1
+                self._ttft_last = ttft
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "ttft_avg_ms": round(self._ttft_sum / self._ttft_n * 1000, 3) if self._ttft_n else None,
+                "ttft_last_ms": round(self._ttft_last * 1000, 3) if self._ttft_n else None,
+            }
+
+
+_stats = StreamStats()
+
+
+def stream_stats() -> Dict[str, Any]:
+    """
+    Return process-wide streaming counters.
+    """
+    return _stats.stats()
+
+
+def record_stream(outcome: str, chunks: int, ttft: float | None) -> None:
+    _stats.record(outcome, chunks, ttft)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import torch
+import torch.nn as nn
+
+from app.plugins.base import AIPlugin
+from app.runtime import pick_device
+from app.toy_model import TinyNet, load_model
+from app.utils.optimize import optimize_model, passes_for
+from app.utils.weights import find_weights
+
+
+def _weights_stamp(weights: Optional[str]) -> Optional[List[int]]:
+    if not weights:
+        return None
+    st = find_weights(weights).stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+class Plugin(AIPlugin):
+    tasks = ["predict"]
+    warm_state = True
+
+    def load(self) -> None:
+        self.model, self.device = load_model(self.manifest.get("weights"))
+        self.in_features = self.model.net[0].in_features
+        self.optimization = None
+        passes = passes_for(self.manifest)
+        if passes:  # optimize_model times the eager model even with no passes to try
+            example = torch.randn(32, self.in_features, device=self.device)
+            self.model, self.optimization = optimize_model(self.model, example, passes)
+
+    def save_state(self, path: Path) -> None:
+        # Tensors and JSON only, so restoring never unpickles code: TorchScript
+        # via jit.save, anything else as a state_dict that load_state applies to
+        # a rebuilt TinyNet (re-quantized and recompiled as recorded in "passes").
+        model = getattr(self.model, "_orig_mod", self.model)  # a compiled model is saved as its module
+        if isinstance(model, torch.jit.ScriptModule):
+            torch.jit.save(model, str(path / "model.ts"))
+            fmt = "torchscript"
+        else:
+            torch.save(model.state_dict(), path / "model.pt")
+            fmt = "state_dict"
+        steps = (self.optimization or {}).get("passes", [])
+        state = {
+            "format": fmt,
+            "passes": [step["pass"] for step in steps if step["status"] == "applied"],
+            "in_features": self.in_features,
+            "optimization": self.optimization,
+            "weights": _weights_stamp(self.manifest.get("weights")),
+        }
+        (path / "state.json").write_text(json.dumps(state), encoding="utf-8")
+
+    def load_state(self, path: Path) -> None:
+        state = json.loads((path / "state.json").read_text(encoding="utf-8"))
+        if state["weights"] != _weights_stamp(self.manifest.get("weights")):
+            raise RuntimeError("weights changed since the snapshot was saved")
+        self.device = pick_device()
+        if state["format"] == "torchscript":
+            model = torch.jit.load(str(path / "model.ts"), map_location=self.device)
+        else:
+            model = TinyNet(state["in_features"])
+            if "quantize_dynamic" in state["passes"]:  # same settings as the optimize pass
+                model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+            weights = torch.load(path / "model.pt", map_location=self.device, weights_only=True)
+            model.load_state_dict(weights)
+            model = model.to(self.device).eval()
+        if "compile" in state["passes"]:
+            model = torch.compile(model)
+        self.model, self.in_features, self.optimization = model, state["in_features"], state["optimization"]
+        with torch.no_grad():  # TorchScript profiles its first calls; keep them off the request path
+            for _ in range(2):
+                self.model(torch.randn(32, self.in_features, device=self.device))
+
+    def unload(self) -> None:
+        self.model = None
+
+    def _rows(self, payload: Dict[str, Any]) -> torch.Tensor:
+        # Binary payloads arrive as NumPy views; as_tensor shares their memory.
+        x = torch.as_tensor(payload.get("inputs", []), dtype=torch.float32)
+        if x.dim() == 1:
+            x = x.unsqueeze(0)
+        if x.dim() != 2 or x.shape[1] != self.in_features:
+            raise ValueError(f"'inputs' must have shape (n, {self.in_features}), got {tuple(x.shape)}")
+        return x
+
+    def _result(self, logits: torch.Tensor) -> Dict[str, Any]:
+        return {
+            "task": "predict",
+            "labels": logits.argmax(dim=1).numpy(),
+            "logits": logits.numpy(),
+            "device": str(self.device),
+        }
+
+    def infer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.infer_batch([payload])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def infer_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results: List[Any] = [None] * len(payloads)
+        rows, index = [], []
+        for i, p in enumerate(payloads):
+            try:
+                rows.append(self._rows(p))
+                index.append(i)
+            except Exception as e:
+                results[i] = e
+
+        if rows:
+            x = torch.cat(rows).to(self.device)
+            with torch.no_grad():
+                logits = self.model(x).float().cpu()
+            for i, chunk in zip(index, torch.split(logits, [r.shape[0] for r in rows])):
+                results[i] = self._result(chunk)
+        return results
@@ -0,0 +1,133 @@
+# app/plugins/warm_state.py
+"""
+Persisted warm state: restore a plugin's prepared state instead of running `load()`.
+
+After a plugin that implements `save_state` loads, its state is written to
+
+    MODEL_CACHE_ROOT/warm_state/<plugin>/<version>-torch<torch version>-<device>-<fingerprint>/
+
+where the fingerprint covers the manifest, the optimization settings and the
+plugin's source files. On the next start `load_state` is called with that
+directory instead of `load()`. Any change of plugin version, code, torch
+version, device or manifest selects a new directory, and older ones of the
+same plugin are removed when the new one is written. A snapshot that fails
+to restore is deleted and the plugin falls back to `load()`.
+
+Off by default (`APP_WARM_STATE_ENABLED`); plugins opt in with `warm_state = True`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import torch
+
+from app.core.config import get_settings
+from app.runtime import pick_device
+from app.utils.result_cache import stable_hash
+
+from .base import AIPlugin, supports_warm_state
+
+log = logging.getLogger("plugins.warm_state")
+
+META_FILE = "warm_state.json"
+
+
+def _source_hash(plugin: AIPlugin) -> str:
+    # Every .py file in the plugin's folder, so an edited plugin never restores an old snapshot.
+    # The loader's module for plugin.py is not in sys.modules, so locate it through a method.
+    folder = Path(inspect.getfile(type(plugin).load)).parent
+    h = hashlib.sha256()
+    for f in sorted(folder.rglob("*.py")):
+        h.update(f.relative_to(folder).as_posix().encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def state_dir(name: str, plugin: AIPlugin) -> Path:
+    """
+    Snapshot directory for a plugin in the current environment.
+    """
+    s = get_settings()
+    manifest = plugin.manifest
+    version = str(manifest.get("version") or "0")
+    device = pick_device().type
+    fingerprint = stable_hash(manifest, s.MODEL_OPTIMIZE, _source_hash(plugin))[:12]
+    return s.MODEL_CACHE_ROOT / "warm_state" / name / f"{version}-torch{torch.__version__}-{device}-{fingerprint}"
+
+
+def restore(plugin: AIPlugin, name: str) -> bool:
+    """
+    Restore a plugin from its snapshot, if there is one for this environment.
+
+    Returns:
+        bool: True if the plugin was restored (and `load()` must not run).
+    """
+    path = state_dir(name, plugin)
+    if not (path / META_FILE).is_file():
+        return False
+    t0 = time.perf_counter()
+    try:
+        plugin.load_state(path)
+    except Exception:
+        log.exception("could not restore warm state of '%s' from %s; loading from scratch", name, path)
+        shutil.rmtree(path, ignore_errors=True)
+        return False
+    log.info("restored plugin '%s' from warm state in %.3fs", name, time.perf_counter() - t0)
+    return True
+
+
+def save(plugin: AIPlugin, name: str) -> Optional[Path]:
+    """
+    Write a loaded plugin's state, replacing snapshots of older versions.
+
+    Returns:
+        Path | None: The snapshot directory, or None if saving failed.
+    """
+    path = state_dir(name, plugin)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    t0 = time.perf_counter()
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        plugin.save_state(tmp)
+        meta = {"plugin": name, "torch": torch.__version__, "created": time.time()}
+        meta["save_sec"] = round(time.perf_counter() - t0, 4)
+        (tmp / META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        try:
+            os.replace(tmp, path)
+        except OSError:  # another worker saved it first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        log.exception("could not save warm state of '%s'", name)
+        shutil.rmtree(tmp, ignore_errors=True)
+        return None
+    for old in path.parent.iterdir():
+        if old != path and ".tmp-" not in old.name:
+            shutil.rmtree(old, ignore_errors=True)
+    log.info("saved warm state of '%s' to %s in %.3fs", name, path, time.perf_counter() - t0)
+    return path
+
+
+def load_plugin(plugin: AIPlugin, name: str) -> str:
+    """
+    Prepare a plugin: restore its warm state, or run `load()` and save the state for next time.
+
+    Returns:
+        str: "restored" or "loaded".
+    """
+    enabled = get_settings().WARM_STATE_ENABLED and supports_warm_state(plugin)
+    if enabled and restore(plugin, name):
+        return "restored"
+    plugin.load()
+    if enabled:
+        save(plugin, name)
+    return "loaded"
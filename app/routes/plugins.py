@@ -1,12 +1,33 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, Request
+import anyio
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 
+from app.core.config import get_settings
+from app.core.responses import FastJSONResponse, dumps
+from app.core.timing import phase
 from app.plugins import loader
+from app.plugins.base import AIPlugin, supports_async, supports_batching, supports_streaming
+from app.plugins.batching import batch_stats, get_batcher
+from app.plugins.bulk import bulk_line, infer_each, iter_json_items, run_bulk
+from app.plugins.executor import ExecutorBusy, PluginExecutor, executor_stats, get_executor
+from app.plugins.inference import guarded
+from app.plugins.process_pool import ProcessPlugin
+from app.plugins.streaming import iterate, record_stream, stream_stats
+from app.utils import tensor_codec
+from app.utils.cache_budget import get_cache_budget
+from app.utils.result_cache import ResultCache, cache_policy, get_result_cache, stable_hash
+from app.utils.singleflight import get_singleflight
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 
 def _ensure_discovered(request: Request) -> None:
@@ -22,6 +43,147 @@ def _ensure_discovered(request: Request) -> None:
         request.app.state.plugin_meta = meta
 
 
+def _executor_for(name: str, meta: Dict[str, Any]) -> PluginExecutor:
+    settings = get_settings()
+    return get_executor(
+        name,
+        meta.get("max_workers", settings.PLUGIN_MAX_WORKERS),
+        meta.get("max_queue", settings.PLUGIN_MAX_QUEUE),
+    )
+
+
+async def _execute(name: str, task: str, plugin: AIPlugin, meta: Dict[str, Any], payload: Dict[str, Any]) -> Any:
+    """
+    Dispatch one inference call through the plugin's executor.
+
+    Async plugins are awaited on the event loop, batched plugins go through the
+    micro-batcher, and everything else runs on the plugin's worker pool.
+
+    Args:
+        name (str): Plugin name.
+        task (str): Task name.
+        plugin (AIPlugin): Plugin instance.
+        meta (Dict[str, Any]): Plugin manifest (may override executor limits).
+        payload (Dict[str, Any]): Payload including the "task" key.
+
+    Returns:
+        Any: The plugin result.
+
+    Raises:
+        ExecutorBusy: If the plugin's queue-depth limit is reached.
+    """
+    settings = get_settings()
+    executor = _executor_for(name, meta)
+
+    if supports_async(plugin):
+        return await executor.run_async(plugin.ainfer, payload)
+
+    if settings.BATCHING_ENABLED and supports_batching(plugin):
+        infer_batch = guarded(plugin, plugin.infer_batch)
+        batcher = get_batcher(name, task, infer_batch, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT_MS)
+        return await executor.run_async(lambda p: asyncio.wrap_future(batcher.submit(p)), payload)
+
+    return await executor.run(guarded(plugin, plugin.infer), payload)
+
+
+async def _infer(name: str, task: str, meta: Dict[str, Any], payload: Dict[str, Any]) -> Any:
+    """
+    Acquire the plugin (loading it if needed), run one call and release it.
+
+    Raises:
+        HTTPException: 503 if the plugin cannot be loaded or is overloaded, 500 on inference errors.
+    """
+    with phase("load"):
+        plugin = await _acquire(name)
+    try:
+        return await _execute(name, task, plugin, meta, payload)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Infer error: {e!s}")
+    finally:
+        loader.release(name)
+
+
+async def _acquire(name: str) -> AIPlugin:
+    try:
+        return await run_in_threadpool(loader.acquire, name)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Plugin '{name}' failed to load: {e!s}")
+
+
+async def _cache_get(cache: ResultCache, key: str):
+    # The disk tier does file IO; keep it off the event loop.
+    if cache.disk_dir:
+        return await run_in_threadpool(cache.get, key)
+    return cache.get(key)
+
+
+async def _cache_put(cache: ResultCache, key: str, value: Any, ttl: float) -> None:
+    if cache.disk_dir:
+        await run_in_threadpool(cache.put, key, value, ttl)
+    else:
+        cache.put(key, value, ttl)
+
+
+async def _read_payload(request: Request) -> Dict[str, Any]:
+    """
+    Read a task payload from a JSON object or a binary tensor body.
+
+    Binary bodies are read into a writable buffer and decoded into zero-copy
+    array views (see `app.utils.tensor_codec`).
+
+    Raises:
+        HTTPException: 422 if a JSON body is not an object, 400 for malformed tensors.
+    """
+    mt = tensor_codec.media_type(request.headers.get("content-type"))
+    if mt is None:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body must be a JSON object")
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=422, detail="Body must be a JSON object")
+        return payload
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+    try:
+        return tensor_codec.decode_payload(mt, body, request.headers)
+    except (tensor_codec.TensorCodecError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {mt} body: {e!s}")
+
+
+def _reply(name: str, result: Any, accept: Optional[str], field: Optional[str], headers: Dict[str, str]) -> Any:
+    """
+    Build the task response: JSON by default, or the binary tensor format named in Accept.
+
+    Raises:
+        HTTPException: 406 if the result cannot be encoded in the requested format.
+    """
+    if accept is None:
+        return FastJSONResponse({"plugin": name, "result": result}, headers=headers)
+    try:
+        body, extra = tensor_codec.encode_result(accept, result, field)
+    except tensor_codec.TensorCodecError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    return Response(body, media_type=accept, headers={**headers, **extra})
+
+
+_PAYLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "object", "additionalProperties": True}},
+            tensor_codec.RAW: {"schema": {"type": "string", "format": "binary"}},
+            tensor_codec.NPY: {"schema": {"type": "string", "format": "binary"}},
+            tensor_codec.SAFETENSORS: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
 @router.get("/plugins", summary="List loaded plugins")
 def list_plugins(request: Request) -> Dict[str, Any]:
     """
@@ -38,35 +200,406 @@ def list_plugins(request: Request) -> Dict[str, Any]:
     return {"count": len(meta), "plugins": meta}
 
 
-@router.post("/plugins/{name}/{task}", summary="Run a task on a plugin")
-def run_plugin_task(name: str, task: str, payload: Dict[str, Any], request: Request) -> Dict[str, Any]:
+@router.get("/plugins/stats", summary="Plugin execution stats")
+def plugin_stats(request: Request) -> Dict[str, Any]:
+    """
+    Report queue depth, in-flight calls, batching counters and worker processes per plugin.
+
+    Args:
+        request (Request): The incoming FastAPI request object.
+
+    Returns:
+        Dict[str, Any]: Executor, batcher and process-pool stats keyed by plugin (and task), plus
+            result cache, model cache (disk budget usage and eviction events) and streaming stats.
+    """
+    registry = getattr(request.app.state, "plugin_registry", {})
+    processes = {n: p.stats() for n, p in registry.items() if isinstance(p, ProcessPlugin)}
+    return {
+        "executors": executor_stats(),
+        "batchers": batch_stats(),
+        "processes": processes,
+        "resident": loader.resident_stats(),
+        "cache": get_result_cache().stats(),
+        "model_cache": get_cache_budget().stats(),
+        "singleflight": get_singleflight().stats(),
+        "streams": stream_stats(),
+    }
+
+
+@router.post(
+    "/plugins/{name}/{task}", summary="Run a task on a plugin", response_model=None, openapi_extra=_PAYLOAD_BODY
+)
+async def run_plugin_task(
+    name: str, task: str, request: Request, response: Response, field: Optional[str] = Query(None)
+) -> Any:
     """
     Execute a specific task on a given plugin.
 
+    The payload is a JSON object, or a binary tensor body: a raw little-endian
+    buffer (`application/octet-stream` with `X-Tensor-Dtype` / `X-Tensor-Shape`),
+    `.npy` (`application/x-npy`) or safetensors (`application/x-safetensors`).
+    Plugins receive binary tensors as zero-copy NumPy views. An Accept header
+    naming one of these formats returns the result's tensors in binary form
+    instead of JSON.
+
+    Results of tasks the manifest declares cacheable are served from the
+    result cache when an identical payload was seen before (`X-Cache: HIT`),
+    and identical concurrent calls share a single computation.
+
+    Args:
+        name (str): The name of the plugin.
+        task (str): The task to execute.
+        request (Request): The incoming FastAPI request object (carries the payload).
+        response (Response): Outgoing response (used for cache headers).
+        field (str | None): Tensor field to return for raw/.npy responses.
+
+    Returns:
+        Any: `{"plugin": name, "result": ...}` as JSON (arrays and tensors serialized natively),
+            or a binary tensor response.
+
+    Raises:
+        HTTPException: If the plugin is not found, the payload is invalid, the plugin is
+            overloaded, or task execution fails.
+    """
+    await run_in_threadpool(_ensure_discovered, request)
+    meta = request.app.state.plugin_meta.get(name)
+
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Plugin '{name}' not found")
+
+    with phase("parse"):
+        payload = {"task": task, **(await _read_payload(request))}
+    accept = tensor_codec.negotiate(request.headers.get("accept"))
+    settings = get_settings()
+
+    # Tasks declared deterministic in the manifest are cacheable and coalescible
+    ttl = cache_policy(meta, task)
+    key = stable_hash(name, task, payload, meta.get("version")) if ttl is not None else None
+    cache = get_result_cache() if key is not None and settings.RESULT_CACHE_ENABLED else None
+
+    if cache is not None:
+        with phase("cache"):
+            hit, cached = await _cache_get(cache, key)
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
+        if hit:
+            with phase("serialize"):
+                return _reply(name, cached, accept, field, dict(response.headers))
+
+    async def compute() -> Any:
+        result = await _infer(name, task, meta, payload)
+        if cache is not None:
+            await _cache_put(cache, key, result, ttl)
+        return result
+
+    if key is not None and settings.SINGLEFLIGHT_ENABLED:
+        try:
+            result = await get_singleflight().do(key, compute, settings.SINGLEFLIGHT_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail=f"Timed out waiting for '{name}/{task}'")
+    else:
+        result = await compute()
+
+    with phase("serialize"):
+        return _reply(name, result, accept, field, dict(response.headers))
+
+
+_STREAM_MEDIA = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+
+def _stream_format(request: Request, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    accept = request.headers.get("accept", "")
+    return "ndjson" if "ndjson" in accept else "sse"
+
+
+def _encode(fmt: str, event: str, data: Dict[str, Any]) -> bytes:
+    if fmt == "sse":
+        return b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+    return dumps({"event": event, "data": data}) + b"\n"
+
+
+async def _single(coro) -> AsyncIterator[Any]:
+    yield await coro
+
+
+@router.post("/plugins/{name}/{task}/stream", summary="Stream a task's results from a plugin")
+async def stream_plugin_task(
+    name: str,
+    task: str,
+    payload: Dict[str, Any],
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(sse|ndjson)$"),
+) -> StreamingResponse:
+    """
+    Execute a task and stream partial results as they are produced.
+
+    Plugins implementing `stream()` send one event per chunk; other plugins
+    send their full result as a single chunk. The format is Server-Sent Events
+    (`text/event-stream`) unless `?format=ndjson` is given or the Accept header
+    asks for NDJSON. Every event is named "chunk", followed by a final "done"
+    event carrying the chunk count, time-to-first-chunk and total time, or an
+    "error" event if the plugin fails mid-stream.
+
+    The plugin produces at most `STREAM_BUFFER` chunks ahead of the client,
+    and stops when the client disconnects.
+
     Args:
         name (str): The name of the plugin.
         task (str): The task to execute.
         payload (Dict[str, Any]): The task input payload.
         request (Request): The incoming FastAPI request object.
+        fmt (str | None): "sse" or "ndjson".
 
     Returns:
-        Dict[str, Any]: The result of executing the task on the plugin.
+        StreamingResponse: The event stream.
 
     Raises:
-        HTTPException: If the plugin is not found or task execution fails.
+        HTTPException: If the plugin is not found, is overloaded, or fails before its first chunk.
     """
-    _ensure_discovered(request)
-    registry = request.app.state.plugin_registry
+    await run_in_threadpool(_ensure_discovered, request)
+    meta = request.app.state.plugin_meta.get(name)
 
-    if name not in registry:
+    if meta is None:
         raise HTTPException(status_code=404, detail=f"Plugin '{name}' not found")
 
-    plugin = registry[name]
     payload = {"task": task, **payload}
+    fmt = _stream_format(request, fmt)
+    started = time.perf_counter()
 
+    plugin = await _acquire(name)
+    if supports_streaming(plugin):
+        chunks = iterate(_executor_for(name, meta), plugin, payload, get_settings().STREAM_BUFFER)
+    else:
+        chunks = _single(_execute(name, task, plugin, meta, payload))
+
+    # Pull the first chunk before answering so early failures keep their status code
+    done = False
     try:
-        result = plugin.infer(payload)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Infer error: {e!s}")
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first, done = None, True
+    except BaseException as e:
+        await chunks.aclose()
+        loader.release(name)
+        record_stream("errors", 0, None)
+        if isinstance(e, ExecutorBusy):
+            raise HTTPException(status_code=503, detail=str(e))
+        if isinstance(e, Exception):
+            raise HTTPException(status_code=500, detail=f"Infer error: {e!s}")
+        raise
+    ttft = None if done else time.perf_counter() - started
+    outcome, sent, closed = "cancelled", 0, False
+
+    async def close() -> None:
+        # Once per stream: on completion, on client disconnect, or when the body was never iterated.
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        with anyio.CancelScope(shield=True):
+            await chunks.aclose()
+        loader.release(name)
+        record_stream(outcome, sent, ttft)
+
+    async def body() -> AsyncIterator[bytes]:
+        nonlocal outcome, sent
+        try:
+            if not done:
+                yield _encode(fmt, "chunk", first)
+                sent += 1
+                async for item in chunks:
+                    yield _encode(fmt, "chunk", item)
+                    sent += 1
+            summary = {
+                "chunks": sent,
+                "ttft_ms": round(ttft * 1000, 3) if ttft is not None else None,
+                "total_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            outcome = "completed"
+            yield _encode(fmt, "done", summary)
+        except Exception as e:
+            outcome = "errors"
+            yield _encode(fmt, "error", {"detail": f"Infer error: {e!s}"})
+        finally:
+            await close()
+
+    media_type = _STREAM_MEDIA[fmt]
+    return _ClosingStreamingResponse(
+        body(), close, media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """
+    Streaming response that always runs `on_close` when it ends.
+
+    The body generator's own cleanup only runs if it was iterated; a client
+    that disconnects before the first byte (or a failed send) would otherwise
+    leave the plugin acquired.
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], on_close: Callable[[], Awaitable[None]], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.on_close()
+
+
+class _DuplexStreamingResponse(_ClosingStreamingResponse):
+    """
+    Streaming response whose body generator is still reading the request body.
+
+    The stock response watches `receive` for a disconnect from the start, which
+    would swallow request body messages; here the watch only begins once
+    `input_done` is set.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        input_done: anyio.Event,
+        on_close: Callable[[], Awaitable[None]],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(content, on_close, **kwargs)
+        self.input_done = input_done
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            async with anyio.create_task_group() as tg:
+
+                async def respond() -> None:
+                    await self.stream_response(send)
+                    tg.cancel_scope.cancel()
+
+                tg.start_soon(respond)
+                await self.input_done.wait()
+                await self.listen_for_disconnect(receive)
+                tg.cancel_scope.cancel()
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.on_close()
+
+
+async def _run_many(plugin: AIPlugin, executor: PluginExecutor, payloads: list) -> list:
+    if supports_async(plugin):
+        # One admission for the whole batch, like a sync batch; the items overlap inside it
+        async with executor.slot():
+            with phase("infer"):
+                return await asyncio.gather(*(plugin.ainfer(p) for p in payloads), return_exceptions=True)
+    if supports_batching(plugin):
+        return await executor.run(guarded(plugin, plugin.infer_batch), payloads)
+    return await executor.run(guarded(plugin, infer_each), plugin, payloads)
+
+
+@router.post("/plugins/{name}/{task}/bulk", summary="Run a task over many payloads")
+async def bulk_plugin_task(
+    name: str,
+    task: str,
+    request: Request,
+    batch_size: Optional[int] = Query(None, ge=1, le=4096),
+    ordered: bool = Query(True),
+) -> StreamingResponse:
+    """
+    Execute a task over a stream of payloads and stream the results back.
+
+    The body is NDJSON (one payload object per line) or a JSON array of
+    payload objects. Payloads are grouped into batches of `batch_size` (one
+    `infer_batch` call for batching plugins, one worker hop otherwise) and the
+    response is NDJSON with one `{"index": i, "result": ...}` or
+    `{"index": i, "error": "..."}` line per payload, in input order unless
+    `ordered=false`, followed by a `{"done": true, ...}` summary line.
+
+    Neither the input nor the output is held in memory: input is read only as
+    fast as batches complete, and results are written as they are ready.
+    Bulk calls bypass the result cache.
+
+    Args:
+        name (str): The name of the plugin.
+        task (str): The task to execute.
+        request (Request): The incoming FastAPI request object (body is read incrementally).
+        batch_size (int | None): Payloads per plugin call (default `BULK_BATCH_SIZE`).
+        ordered (bool): Emit results in input order.
+
+    Returns:
+        StreamingResponse: NDJSON results.
+
+    Raises:
+        HTTPException: If the plugin is not found or cannot be loaded.
+    """
+    await run_in_threadpool(_ensure_discovered, request)
+    meta = request.app.state.plugin_meta.get(name)
+
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Plugin '{name}' not found")
+
+    settings = get_settings()
+    plugin = await _acquire(name)
+    executor = _executor_for(name, meta)
+    input_done = anyio.Event()
+
+    async def read_body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in request.stream():
+                yield chunk
+        finally:
+            input_done.set()
+
+    async def call_batch(batch: list) -> list:
+        results: list = [None] * len(batch)
+        slots, payloads = [], []
+        for i, p in enumerate(batch):
+            if isinstance(p, dict):
+                slots.append(i)
+                payloads.append({"task": task, **p})
+            else:
+                results[i] = TypeError("bulk items must be JSON objects")
+        if payloads:
+            for i, r in zip(slots, await _run_many(plugin, executor, payloads)):
+                results[i] = r
+        return results
+
+    released = False
+
+    async def close() -> None:
+        # Once per request: after the body finishes, or when it was never iterated.
+        nonlocal released
+        if released:
+            return
+        released = True
+        input_done.set()
+        loader.release(name)
+
+    async def body() -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        count = errors = 0
+        try:
+            results = run_bulk(
+                iter_json_items(read_body()),
+                call_batch,
+                batch_size=batch_size or settings.BULK_BATCH_SIZE,
+                concurrency=settings.BULK_CONCURRENCY,
+                ordered=ordered,
+            )
+            async for index, result in results:
+                count += 1
+                errors += isinstance(result, Exception)
+                yield bulk_line(index, result)
+            elapsed = time.perf_counter() - started
+            summary = {"done": True, "items": count, "errors": errors, "elapsed_ms": round(elapsed * 1000, 3)}
+            yield dumps(summary) + b"\n"
+        except ClientDisconnect:
+            return
+        except ValueError as e:
+            # Malformed input: report it after the results produced so far
+            yield dumps({"index": None, "error": str(e)}) + b"\n"
+        finally:
+            await close()
 
-    return {"plugin": name, "result": result}
+    return _DuplexStreamingResponse(body(), input_done, close, media_type="application/x-ndjson")
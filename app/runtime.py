@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import math
 import os
 import time
 from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 import torch
 
@@ -67,6 +69,165 @@ def pick_dtype(device: str | None = None) -> torch.dtype:
     return torch.float32
 
 
+_cpu_layout: dict = {}
+
+
+def available_cores() -> int:
+    """
+    Count the CPU cores this process may use: its affinity mask, capped by a cgroup CPU quota.
+
+    Returns:
+        int: Usable cores (at least 1).
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        cores = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+def plan_threads(
+    cores: int, workers: int = 1, threads: Optional[int] = None, interop: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Split the host's cores between workers so they do not oversubscribe it.
+
+    Args:
+        cores (int): Usable cores on the host.
+        workers (int): Worker processes sharing those cores.
+        threads (int | None): Explicit intra-op threads per worker.
+        interop (int | None): Explicit inter-op threads per worker.
+
+    Returns:
+        Tuple[int, int]: (intra-op threads, inter-op threads) per worker.
+    """
+    intra = threads or max(1, cores // max(1, workers))
+    return intra, interop or min(2, intra)
+
+
+_slot_lock: list = []  # keeps the claimed core slot's lock file open for the life of the process
+
+
+def _claim_slot(workers: int) -> Optional[int]:
+    # Uvicorn does not number its workers: take the first free slot lock under our supervisor.
+    # The lock is released when the process exits, so a respawned worker reuses its slot.
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    import tempfile
+
+    directory = Path(tempfile.gettempdir()) / f"neuroserve-cpu-slots-{os.getppid()}"
+    directory.mkdir(exist_ok=True)
+    for index in range(workers):
+        f = open(directory / f"{index}.lock", "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot_lock.append(f)
+        return index
+    return None
+
+
+def _worker_index(workers: int, index: Optional[int] = None) -> Optional[int]:
+    if workers <= 1:
+        return 0
+    if index is not None:
+        return index % workers
+    if _slot_lock:
+        return int(Path(_slot_lock[0].name).stem)
+    return _claim_slot(workers)
+
+
+def configure_cpu(
+    threads: Optional[int] = None,
+    interop: Optional[int] = None,
+    workers: Optional[int] = None,
+    affinity: bool = False,
+    index: Optional[int] = None,
+) -> dict:
+    """
+    Apply the per-worker CPU layout: torch intra-op/inter-op threads and optional core affinity.
+
+    Without explicit values the available cores (see `available_cores`) are
+    divided evenly between `workers` (default `$WEB_CONCURRENCY` or 1).
+    `OMP_NUM_THREADS`/`MKL_NUM_THREADS` are set (unless already defined) so
+    plugin worker processes started later inherit the same limit. The
+    inter-op pool can only be sized before torch first uses it; if that
+    already happened the current size is kept and reported.
+
+    Args:
+        threads (int | None): Intra-op threads per worker.
+        interop (int | None): Inter-op threads per worker.
+        workers (int | None): Worker processes on this host.
+        affinity (bool): Pin this worker to its own contiguous slice of cores (Linux).
+        index (int | None): This worker's slot (0..workers-1). Without it each worker claims
+            the first free slot through a lock file; if none is free the worker is not pinned.
+
+    Returns:
+        dict: The applied layout (also returned by `cpu_layout()` and `cuda_info()`).
+    """
+    workers = max(1, workers or int(os.getenv("WEB_CONCURRENCY", "1") or 1))
+    cores = available_cores()
+    intra, inter = plan_threads(cores, workers, threads, interop)
+
+    pinned = None
+    if affinity and hasattr(os, "sched_setaffinity"):
+        mask = sorted(os.sched_getaffinity(0))
+        slot = _worker_index(workers, index)
+        if slot is not None:
+            start = (slot * intra) % len(mask)
+            cpus = [mask[(start + i) % len(mask)] for i in range(min(intra, len(mask)))]
+            try:
+                os.sched_setaffinity(0, cpus)
+                pinned = cpus
+            except OSError:
+                pass
+
+    torch.set_num_threads(intra)
+    try:
+        torch.set_num_interop_threads(inter)
+    except RuntimeError:  # inter-op pool already started
+        pass
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(intra))
+
+    _cpu_layout.clear()
+    _cpu_layout.update(
+        {
+            "cores": cores,
+            "workers": workers,
+            "threads": torch.get_num_threads(),
+            "interop_threads": torch.get_num_interop_threads(),
+            "affinity": pinned,
+        }
+    )
+    return dict(_cpu_layout)
+
+
+def cpu_layout() -> dict:
+    """
+    Return the CPU layout applied by `configure_cpu`, or torch's current defaults if it was not called.
+    """
+    if _cpu_layout:
+        return dict(_cpu_layout)
+    return {
+        "cores": available_cores(),
+        "workers": None,
+        "threads": torch.get_num_threads(),
+        "interop_threads": torch.get_num_interop_threads(),
+        "affinity": None,
+    }
+
+
 def cuda_info() -> dict:
     """
     Retrieve CUDA and GPU device information.
@@ -79,6 +240,7 @@ def cuda_info() -> dict:
         "torch_cuda_version": getattr(torch.version, "cuda", None),
         "cuda_available": torch.cuda.is_available(),
         "device": str(pick_device()),
+        "cpu": cpu_layout(),
     }
 
     if torch.cuda.is_available():
@@ -97,10 +259,38 @@ def cuda_info() -> dict:
     return info
 
 
+def device_memory() -> dict:
+    """
+    Report memory held by this process on each accelerator.
+
+    Returns:
+        dict: {device: {"allocated": bytes, "reserved": bytes}}; empty on CPU-only hosts.
+    """
+    out = {}
+    if torch.cuda.is_available():
+        for idx in range(torch.cuda.device_count()):
+            out[f"cuda:{idx}"] = {
+                "allocated": torch.cuda.memory_allocated(idx),
+                "reserved": torch.cuda.memory_reserved(idx),
+            }
+    mps = getattr(torch, "mps", None)
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available() and mps is not None:
+        try:
+            out["mps"] = {
+                "allocated": mps.current_allocated_memory(),
+                "reserved": mps.driver_allocated_memory(),
+            }
+        except Exception:
+            pass
+    return out
+
+
 def warmup() -> dict:
     """
     Perform a matrix multiplication to warm up the selected device.
 
+    One untimed pass initializes kernels and allocator; the second is timed.
+
     Returns:
         dict: Result containing shape, elapsed time, and device used.
     """
@@ -109,19 +299,215 @@ def warmup() -> dict:
     x = torch.randn(size, size, device=dev)
     y = torch.randn(size, size, device=dev)
 
-    if dev.type == "cuda":
-        torch.cuda.synchronize()
+    z = x @ y
+    _sync(dev)
 
-    t0 = time.time()
+    t0 = time.perf_counter()
     z = x @ y
+    _sync(dev)
+    dt = time.perf_counter() - t0
+
+    return {
+        "shape": list(z.shape),
+        "elapsed_sec": round(dt, 4),
+        "device": str(dev),
+    }
 
+
+def _sync(dev: torch.device) -> None:
     if dev.type == "cuda":
-        torch.cuda.synchronize()
+        torch.cuda.synchronize(dev)
+    elif dev.type == "mps":
+        torch.mps.synchronize()
+
+
+def _thread_counts() -> List[int]:
+    cores = os.cpu_count() or 1
+    counts = {1, cores, torch.get_num_threads()}
+    n = 2
+    while n < cores:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def _workload(name: str, dev: torch.device, dtype: torch.dtype, matmul_size: int) -> Tuple[Callable, int]:
+    # Returns (fn(batch) -> output, input features).
+    if name == "tinynet":
+        from app.toy_model import TinyNet  # lazy: toy_model imports this module
+
+        model = TinyNet().to(device=dev, dtype=dtype).eval()
+        return model, 512
+    if name == "matmul":
+        w = torch.randn(matmul_size, matmul_size, device=dev, dtype=dtype)
+        return (lambda x: x @ w), matmul_size
+    raise ValueError(f"Unknown workload '{name}' (expected 'tinynet' or 'matmul')")
 
-    dt = time.time() - t0
+
+def _time(fn: Callable, x: torch.Tensor, dev: torch.device, warmup: int, iters: int) -> List[float]:
+    with torch.inference_mode():
+        for _ in range(warmup):
+            fn(x)
+        _sync(dev)
+        times = []
+        for _ in range(iters):
+            t0 = time.perf_counter()
+            fn(x)
+            _sync(dev)
+            times.append(time.perf_counter() - t0)
+    return sorted(times)
+
+
+def benchmark(
+    workloads: Sequence[str] = ("tinynet", "matmul"),
+    batch_sizes: Sequence[int] = (1, 8, 32, 128),
+    dtypes: Optional[Sequence[torch.dtype]] = None,
+    threads: Optional[Sequence[int]] = None,
+    warmup: int = 3,
+    iters: int = 20,
+    matmul_size: int = 1024,
+    device: str | None = None,
+) -> dict:
+    """
+    Measure inference throughput across workloads, batch sizes, dtypes and CPU thread counts.
+
+    Each configuration runs `warmup` untimed iterations, then `iters` timed
+    ones (`perf_counter`, device synchronized). The process-wide
+    `torch.set_num_threads` value is restored afterwards.
+
+    Args:
+        workloads (Sequence[str]): "tinynet" (512 -> 1024 -> 10 MLP) and/or "matmul" (batch x size @ size x size).
+        batch_sizes (Sequence[int]): Rows per call.
+        dtypes (Sequence[torch.dtype] | None): Defaults to float32 plus `pick_dtype(device)`.
+        threads (Sequence[int] | None): Intra-op thread counts to try on CPU; defaults to 1, powers of two
+            and the core count. Ignored on accelerators.
+        warmup (int): Untimed iterations per configuration.
+        iters (int): Timed iterations per configuration.
+        matmul_size (int): Inner/outer dimension of the matmul workload.
+        device (str | None): Device string, or None to auto-select.
+
+    Returns:
+        dict: `runs` (one entry per configuration), `curves` (items/sec by batch size for each
+            workload/dtype/threads), `best` (highest-throughput and lowest-latency configuration
+            per workload) and `suggested` (threads/batch size/dtype for the first workload).
+    """
+    dev = torch.device(device) if device else pick_device()
+    if dtypes is None:
+        dtypes = list(dict.fromkeys([torch.float32, pick_dtype(str(dev))]))
+    if dev.type != "cpu":
+        threads = [torch.get_num_threads()]
+    elif threads is None:
+        threads = _thread_counts()
+
+    original_threads = torch.get_num_threads()
+    runs = []
+    try:
+        for name in workloads:
+            for dtype in dtypes:
+                fn, features = _workload(name, dev, dtype, matmul_size)
+                for n in threads:
+                    torch.set_num_threads(n)
+                    for bs in batch_sizes:
+                        x = torch.randn(bs, features, device=dev, dtype=dtype)
+                        times = _time(fn, x, dev, warmup, iters)
+                        p50 = times[len(times) // 2]
+                        runs.append(
+                            {
+                                "workload": name,
+                                "dtype": str(dtype).replace("torch.", ""),
+                                "threads": n,
+                                "batch_size": bs,
+                                "ms_p50": round(p50 * 1000, 4),
+                                "ms_min": round(times[0] * 1000, 4),
+                                "items_per_sec": round(bs / p50, 1),
+                            }
+                        )
+    finally:
+        torch.set_num_threads(original_threads)
+
+    curves: dict = {}
+    for r in runs:
+        key = curves.setdefault(r["workload"], {}).setdefault(r["dtype"], {}).setdefault(str(r["threads"]), [])
+        key.append([r["batch_size"], r["items_per_sec"]])
+
+    best = {}
+    for name in workloads:
+        mine = [r for r in runs if r["workload"] == name]
+        if not mine:
+            continue
+        single = [r for r in mine if r["batch_size"] == min(batch_sizes)]
+        best[name] = {
+            "throughput": max(mine, key=lambda r: r["items_per_sec"]),
+            "latency": min(single, key=lambda r: r["ms_p50"]),
+        }
+
+    # Suggest the highest-throughput layout of the first workload (TinyNet by default).
+    top = best[workloads[0]]["throughput"] if workloads and workloads[0] in best else None
+    suggested = {"threads": top["threads"], "batch_size": top["batch_size"], "dtype": top["dtype"]} if top else None
 
     return {
-        "shape": list(z.shape),
-        "elapsed_sec": round(dt, 4),
         "device": str(dev),
+        "cpu_count": os.cpu_count(),
+        "default_threads": original_threads,
+        "warmup": warmup,
+        "iters": iters,
+        "runs": runs,
+        "curves": curves,
+        "best": best,
+        "suggested": suggested,
     }
+
+
+def _csv(kind: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda s: [kind(v.strip()) for v in s.split(",") if v.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    CLI: `python -m app.runtime bench [--workloads tinynet,matmul] [--batch-sizes 1,8,32,128] ...`.
+    """
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser(prog="python -m app.runtime")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info", help="print device information")
+    b = sub.add_parser("bench", help="sweep workloads over batch sizes, dtypes and threads")
+    b.add_argument("--workloads", type=_csv(str), default=["tinynet", "matmul"])
+    b.add_argument("--batch-sizes", type=_csv(int), default=[1, 8, 32, 128])
+    b.add_argument("--dtypes", type=_csv(lambda d: getattr(torch, d)), default=None, help="e.g. float32,bfloat16")
+    b.add_argument("--threads", type=_csv(int), default=None)
+    b.add_argument("--warmup", type=int, default=3)
+    b.add_argument("--iters", type=int, default=20)
+    b.add_argument("--matmul-size", type=int, default=1024)
+    b.add_argument("--device", default=None)
+    b.add_argument("--out", help="also write the full report to this JSON file")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "info":
+        print(json.dumps(cuda_info(), indent=2))
+        return
+
+    report = benchmark(
+        args.workloads,
+        args.batch_sizes,
+        args.dtypes,
+        args.threads,
+        args.warmup,
+        args.iters,
+        args.matmul_size,
+        args.device,
+    )
+    for r in report["runs"]:
+        print(
+            f"{r['workload']:>8} {r['dtype']:>9} threads={r['threads']:<3} batch={r['batch_size']:<5} "
+            f"p50={r['ms_p50']:>10.4f} ms  {r['items_per_sec']:>12.1f} items/s"
+        )
+    print(json.dumps({k: report[k] for k in ("device", "best", "suggested")}, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import torch
 import torch.nn as nn
 
 from .runtime import pick_device
+from .utils.weights import load_weights
 
 
 class TinyNet(nn.Module):
@@ -33,15 +36,24 @@ class TinyNet(nn.Module):
         return self.net(x)
 
 
-def load_model() -> tuple[TinyNet, torch.device]:
+def load_model(weights: Optional[str] = None) -> tuple[TinyNet, torch.device]:
     """
     Instantiate and prepare the TinyNet model for inference.
 
+    Args:
+        weights (str | None): Checkpoint to load, memory-mapped from the model cache
+            (see `app.utils.weights`). Default is randomly initialized weights.
+
     Returns:
         tuple[TinyNet, torch.device]: The initialized model and the device it resides on.
     """
     dev = pick_device()
-    model = TinyNet().to(dev).eval()
+    if weights:
+        with torch.device("meta"):
+            model = TinyNet()  # no allocation; the mapped weights are assigned below
+        model = load_weights(model, weights).to(dev).eval()
+    else:
+        model = TinyNet().to(dev).eval()
 
     # Warm-up forward pass to initialize weights on device
     with torch.no_grad():
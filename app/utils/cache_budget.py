@@ -0,0 +1,237 @@
+# app/utils/cache_budget.py
+"""
+Disk budget for the model cache: least-recently-used eviction of model snapshots.
+
+Two limits, both optional:
+    budget: total size of the indexed models (`APP_MODEL_CACHE_BUDGET_GB`).
+    min free: free space on the cache's filesystem (`APP_MODEL_CACHE_MIN_FREE_GB`);
+        falling below it is "disk pressure".
+
+When a limit is exceeded, snapshots are evicted oldest `last_access` first
+until both hold again. Snapshots pinned by a live process (a loaded plugin
+declares them, see `model_cache.touch_models`) are never evicted, whichever
+process runs the check. Hugging Face blobs still referenced by another
+snapshot of the same repository are kept.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.core import metrics
+from app.utils.model_cache import ModelCacheIndex, get_model_cache_index, lock_file, process_alive
+
+log = logging.getLogger("plugins.model_cache")
+
+GB = 1024**3
+MANAGER_LOCK_FILE = "cache_manager.lock"
+USAGE_MAX_AGE_SEC = 5.0
+
+
+def _remove_snapshot(index: ModelCacheIndex, entry: Dict[str, Any]) -> None:
+    path = index.abspath(entry)
+    if entry["source"] != "hf":
+        path.unlink(missing_ok=True)
+        return
+    repo = path.parent.parent  # models--org--name/snapshots/<revision>
+    shutil.rmtree(path, ignore_errors=True)
+    snapshots = repo / "snapshots"
+    if not snapshots.is_dir() or not any(snapshots.iterdir()):
+        shutil.rmtree(repo, ignore_errors=True)
+        return
+    referenced = {p.resolve() for p in snapshots.rglob("*") if p.is_symlink()}
+    for blob in (repo / "blobs").glob("*"):
+        if blob.resolve() not in referenced:
+            blob.unlink(missing_ok=True)
+
+
+class CacheBudget:
+    """
+    Enforce a size budget and a free-space floor on the model cache.
+
+    Args:
+        index (ModelCacheIndex): Index of the cached models.
+        budget_bytes (int | None): Maximum total size of indexed models.
+        min_free_bytes (int | None): Minimum free space on the cache filesystem.
+        live (Callable[[int, float | None], bool]): Whether a pinning process (ID, start time) is still running.
+    """
+
+    def __init__(
+        self,
+        index: ModelCacheIndex,
+        budget_bytes: Optional[int] = None,
+        min_free_bytes: Optional[int] = None,
+        live: Callable[[int, Optional[float]], bool] = process_alive,
+    ) -> None:
+        self.index = index
+        self.budget_bytes = budget_bytes
+        self.min_free_bytes = min_free_bytes
+        self._live = live
+        self._lock = threading.Lock()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self.counters = {"runs": 0, "evictions": 0, "evicted_bytes": 0, "pressure": 0, "unresolved": 0}
+        self._usage: Optional[Dict[str, Any]] = None
+        self._usage_at = 0.0
+
+    def _free(self) -> int:
+        path = self.index.root
+        while not path.exists() and path != path.parent:
+            path = path.parent
+        return shutil.disk_usage(path).free
+
+    def usage(self) -> Dict[str, Any]:
+        """
+        Current cache size, free disk space, the limits and whether either is exceeded.
+        """
+        used = sum(e["size"] for e in self.index.entries())
+        free = self._free()
+        usage = {
+            "bytes": used,
+            "budget_bytes": self.budget_bytes,
+            "free_bytes": free,
+            "min_free_bytes": self.min_free_bytes,
+            "over_budget": self.budget_bytes is not None and used > self.budget_bytes,
+            "pressure": self.min_free_bytes is not None and free < self.min_free_bytes,
+        }
+        self._usage, self._usage_at = usage, time.monotonic()
+        return usage
+
+    def recent_usage(self, max_age: float = USAGE_MAX_AGE_SEC) -> Dict[str, Any]:
+        """
+        `usage()`, reusing the last result if it is at most `max_age` seconds old.
+
+        Metrics scrapes read this so they don't re-read the index and stat the disk every time.
+        """
+        if self._usage is not None and time.monotonic() - self._usage_at <= max_age:
+            return self._usage
+        return self.usage()
+
+    def _event(self, kind: str, **fields: Any) -> None:
+        self.events.append({"event": kind, "at": time.time(), **fields})
+
+    def enforce(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Evict least-recently-used snapshots until the budget and free-space floor hold.
+
+        Args:
+            dry_run (bool): Only report what would be evicted.
+
+        Returns:
+            Dict[str, Any]: Usage before and after, the evicted entries (ID, revision, bytes)
+                and whether the limits still cannot be met because the rest is in use.
+        """
+        with self._lock:
+            before = self.usage()
+            used, free = before["bytes"], before["free_bytes"]
+            evicted: List[Dict[str, Any]] = []
+            protected = 0
+            if before["pressure"]:
+                self.counters["pressure"] += 1
+                self._event("pressure", free_bytes=free, min_free_bytes=self.min_free_bytes)
+                floor = self.min_free_bytes / GB
+                log.warning("model cache disk pressure: %.2f GB free (floor %.2f GB)", free / GB, floor)
+
+            def over() -> bool:
+                return (self.budget_bytes is not None and used > self.budget_bytes) or (
+                    self.min_free_bytes is not None and free < self.min_free_bytes
+                )
+
+            for entry in sorted(self.index.entries(), key=lambda e: e["last_access"]):
+                if not over():
+                    break
+                if self.index.in_use(entry, self._live):
+                    protected += 1
+                    continue
+                item = {"id": entry["id"], "revision": entry["revision"], "bytes": entry["size"]}
+                if not dry_run:
+                    try:
+                        _remove_snapshot(self.index, entry)
+                    except OSError as e:
+                        log.warning("could not evict %s@%s: %s", entry["id"], entry["revision"], e)
+                        continue
+                    self.index.remove(entry["id"], entry["revision"])
+                    free = self._free()
+                    self.counters["evictions"] += 1
+                    self.counters["evicted_bytes"] += entry["size"]
+                    metrics.observe_cache_eviction(entry["size"])
+                    self._event("evict", **item, last_access=entry["last_access"])
+                    log.info("evicted model %s@%s (%.1f MB)", entry["id"], entry["revision"], entry["size"] / 2**20)
+                else:
+                    free += entry["size"]
+                used -= entry["size"]
+                evicted.append(item)
+
+            unresolved = over()
+            if unresolved:
+                self.counters["unresolved"] += 1
+                self._event("unresolved", bytes=used, free_bytes=free, in_use=protected)
+                log.warning("model cache still over its limits; %d snapshots are in use", protected)
+            self.counters["runs"] += 1
+            return {
+                "before": before,
+                "after": before if dry_run else self.usage(),
+                "evicted": evicted,
+                "dry_run": dry_run,
+                "unresolved": unresolved,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.usage(), **self.counters, "events": list(self.events)}
+
+
+def start_cache_manager(budget: CacheBudget, interval: float) -> threading.Event:
+    """
+    Run `budget.enforce()` every `interval` seconds until the returned event is set.
+
+    Of the workers sharing a cache root, only the one holding its
+    `MANAGER_LOCK_FILE` runs the checks; the others retry the lock each
+    interval and take over when that worker exits.
+    """
+    stop = threading.Event()
+
+    def loop() -> None:
+        manager = None
+        try:
+            while not stop.wait(interval):
+                if manager is None:
+                    manager = lock_file(budget.index.root / MANAGER_LOCK_FILE, blocking=False)
+                    if manager is None:
+                        continue
+                try:
+                    budget.enforce()
+                except Exception:
+                    log.exception("model cache budget check failed")
+        finally:
+            if manager is not None:
+                manager.close()
+
+    threading.Thread(target=loop, name="model-cache-budget", daemon=True).start()
+    return stop
+
+
+_budget: Optional[CacheBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_cache_budget() -> CacheBudget:
+    """
+    Return the process-wide cache budget configured from settings.
+    """
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                from app.core.config import get_settings
+
+                s = get_settings()
+                _budget = CacheBudget(
+                    get_model_cache_index(),
+                    budget_bytes=int(s.MODEL_CACHE_BUDGET_GB * GB) if s.MODEL_CACHE_BUDGET_GB else None,
+                    min_free_bytes=int(s.MODEL_CACHE_MIN_FREE_GB * GB) if s.MODEL_CACHE_MIN_FREE_GB else None,
+                )
+    return _budget
@@ -0,0 +1,526 @@
+# app/utils/model_cache.py
+"""
+Persistent index of the models in `MODEL_CACHE_ROOT`.
+
+The index (`MODEL_CACHE_ROOT/index.json`) records, per model snapshot, the
+model ID, revision, files with sizes and SHA-256 hashes, and the time it was
+added and last used. Lookups are dictionary hits on the in-memory copy, so
+the app can check availability at startup without walking the cache or
+touching the network. `scan()` refreshes the index incrementally: files whose
+size and mtime are unchanged are not hashed again.
+
+Every Uvicorn worker keeps its own copy; changes are read, applied and
+written back under an exclusive lock on `MODEL_CACHE_ROOT/index.lock`.
+
+Indexed layouts:
+    Hugging Face hub (`TRANSFORMERS_CACHE`): models--<org>--<name>/snapshots/<revision>/...
+        The hash of a large (LFS) file is taken from its blob name.
+    Torch hub (`TORCH_HOME`/hub/checkpoints): one entry per file, ID "torch/<file>".
+
+Plugins declare the models they need in `manifest.json`:
+
+    "models": ["org/name", "org/name@<revision>", {"id": "org/name", "revision": "main"}]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process locking
+    fcntl = None
+
+log = logging.getLogger("plugins.model_cache")
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+ModelRef = Tuple[str, Optional[str]]
+
+
+def model_refs(manifest: Optional[Dict[str, Any]]) -> List[ModelRef]:
+    """
+    Parse a manifest's "models" list into (model ID, revision or None) pairs.
+    """
+    refs: List[ModelRef] = []
+    for item in (manifest or {}).get("models") or []:
+        if isinstance(item, dict):
+            refs.append((str(item["id"]), item.get("revision")))
+        else:
+            model_id, _, revision = str(item).partition("@")
+            refs.append((model_id, revision or None))
+    return refs
+
+
+def sha256_file(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def lock_file(path: Path, blocking: bool = True) -> Optional[IO[str]]:
+    """
+    Take an exclusive advisory lock on `path` (created if missing); close the returned file to release it.
+
+    The lock is held per open file, so it also excludes other threads and
+    processes. Without `fcntl` (Windows) it is always granted.
+
+    Args:
+        path (Path): Lock file.
+        blocking (bool): Wait for the lock instead of giving up.
+
+    Returns:
+        IO | None: The open lock file, or None if `blocking` is False and the lock is held elsewhere.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, "a")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        if blocking:
+            raise
+        return None
+    return f
+
+
+def _started(pid: int) -> Optional[float]:
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+def process_alive(pid: int, started: Optional[float] = None) -> bool:
+    """
+    True if process `pid` is running and, when `started` is given, is the process that started then.
+    """
+    now = _started(pid)
+    return now is not None and (started is None or abs(now - started) < 1.0)
+
+
+def _pins(entry: Dict[str, Any]) -> List[Tuple[int, Optional[float]]]:
+    # [pid, start time] pairs; older indexes stored bare process IDs
+    return [(p, None) if isinstance(p, int) else (p[0], p[1]) for p in entry.get("pinned_by", [])]
+
+
+def _hf_model_id(dirname: str) -> Optional[str]:
+    # models--org--name -> org/name
+    if not dirname.startswith("models--"):
+        return None
+    return "/".join(dirname[len("models--") :].split("--"))
+
+
+class ModelCacheIndex:
+    """
+    Index of cached model snapshots, persisted as JSON under the cache root.
+
+    Reads pick up the file again whenever another process replaced it. Every
+    change holds an exclusive lock on `root / "index.lock"` while it re-reads
+    the file, applies the change and atomically replaces it, so changes from
+    workers sharing a cache are serialized and none is lost. Without `fcntl`
+    (Windows) the lock is skipped and concurrent changes can overwrite each
+    other until the next `scan()`.
+
+    Pins record the process ID and its start time, so a new process that
+    reuses the ID (e.g. after a container restart) does not keep them alive.
+
+    Args:
+        root (Path): Cache root; the index is written to `root / "index.json"`.
+        hub_dir (Path | None): Hugging Face hub cache to scan.
+        torch_dir (Path | None): Torch hub checkpoint directory to scan.
+    """
+
+    def __init__(self, root: Path, hub_dir: Optional[Path] = None, torch_dir: Optional[Path] = None) -> None:
+        self.root = Path(root)
+        self.hub_dir = Path(hub_dir) if hub_dir else None
+        self.torch_dir = Path(torch_dir) if torch_dir else None
+        self.path = self.root / INDEX_FILE
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._refs: Dict[str, str] = {}  # model ID -> default revision
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._reload()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _reload(self, force: bool = False) -> None:
+        stamp = self._file_stamp()
+        if not force and stamp is not None and stamp == self._stamp:
+            return
+        data: Dict[str, Any] = {}
+        if stamp is not None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                log.warning("model cache index %s is unreadable; run a scan to rebuild it", self.path)
+        self._models = data.get("models", {})
+        self._refs = data.get("refs", {})
+        self._stamp = stamp
+
+    def _write(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{INDEX_FILE}.{os.getpid()}.tmp")
+        data = {"version": 1, "models": self._models, "refs": self._refs}
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._stamp = self._file_stamp()
+
+    def _update(self, fn: Callable[[], Any]) -> Any:
+        # Workers share index.json: read, change and write it under the file lock.
+        # The reload is forced since two writes can leave the same mtime and size.
+        with self._lock:
+            lock = lock_file(self.root / LOCK_FILE)
+            try:
+                self._reload(force=True)
+                result = fn()
+                if result is not False:  # False: nothing changed
+                    self._write()
+                return result
+            finally:
+                lock.close()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    @staticmethod
+    def key(model_id: str, revision: str) -> str:
+        return f"{model_id}@{revision}"
+
+    def _resolve(self, model_id: str, revision: Optional[str]) -> Optional[str]:
+        if revision and revision != "main":
+            return self.key(model_id, revision)
+        default = self._refs.get(model_id)  # "main" is whatever refs/main pointed to when indexed
+        return self.key(model_id, default) if default else None
+
+    def lookup(self, model_id: str, revision: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the entry of a cached model (default revision unless given), or None.
+        """
+        with self._lock:
+            self._reload()
+            key = self._resolve(model_id, revision)
+            entry = self._models.get(key) if key else None
+            return dict(entry) if entry else None
+
+    def has(self, model_id: str, revision: Optional[str] = None) -> bool:
+        return self.lookup(model_id, revision) is not None
+
+    def missing(self, refs: Iterable[ModelRef]) -> List[str]:
+        """
+        Return the references (as "id" or "id@revision") that are not in the index.
+        """
+        return [f"{m}@{r}" if r else m for m, r in refs if not self.has(m, r)]
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._reload()
+            return [dict(e) for e in self._models.values()]
+
+    def summary(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {"index": str(self.path), "models": len(entries), "bytes": sum(e["size"] for e in entries)}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def _path_str(self, p: Path) -> str:
+        try:
+            return str(p.relative_to(self.root))
+        except ValueError:
+            return str(p)
+
+    def abspath(self, entry: Dict[str, Any]) -> Path:
+        p = Path(entry["path"])
+        return p if p.is_absolute() else self.root / p
+
+    def _files(self, directory: Path, previous: Dict[str, Any], stats: Dict[str, int]) -> Dict[str, Any]:
+        files: Dict[str, Any] = {}
+        paths = [directory] if directory.is_file() else sorted(p for p in directory.rglob("*") if p.is_file())
+        for p in paths:
+            rel = p.name if p == directory else p.relative_to(directory).as_posix()
+            st = p.stat()
+            old = previous.get(rel)
+            if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+                files[rel] = old
+                continue
+            target = p.resolve()
+            digest = target.name if _SHA256.match(target.name) else sha256_file(p)
+            stats["hashed"] = stats.get("hashed", 0) + 1
+            files[rel] = {"size": st.st_size, "sha256": digest, "mtime": st.st_mtime_ns}
+        return files
+
+    def _put(
+        self, model_id: str, revision: str, path: Path, source: str, stats: Dict[str, int], default: bool
+    ) -> Dict[str, Any]:
+        key = self.key(model_id, revision)
+        old = self._models.get(key, {})
+        files = self._files(path, old.get("files", {}), stats)
+        now = time.time()
+        entry = {
+            "id": model_id,
+            "revision": revision,
+            "source": source,
+            "path": self._path_str(path),
+            "files": files,
+            "size": sum(f["size"] for f in files.values()),
+            "added": old.get("added", now),
+            "last_access": old.get("last_access", now),
+        }
+        if old.get("pinned_by"):
+            entry["pinned_by"] = old["pinned_by"]
+        if entry != old:
+            stats["updated" if old else "added"] = stats.get("updated" if old else "added", 0) + 1
+        self._models[key] = entry
+        if default or model_id not in self._refs:
+            self._refs[model_id] = revision
+        return entry
+
+    def register(
+        self, model_id: str, revision: str, path: Path, source: str = "hf", default: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Add or refresh one snapshot (a directory, or a single checkpoint file).
+
+        Args:
+            model_id (str): Model ID, e.g. "org/name".
+            revision (str): Commit hash or other revision label.
+            path (Path): Snapshot directory or file.
+            source (str): "hf", "torch" or "file".
+            default (bool): Make this the revision returned when none is asked for.
+
+        Returns:
+            Dict[str, Any]: The index entry.
+        """
+        return dict(self._update(lambda: self._put(model_id, revision, Path(path), source, {}, default)))
+
+    def remove(self, model_id: str, revision: str) -> bool:
+        """
+        Drop a snapshot from the index (the files are left alone).
+        """
+
+        def drop() -> bool:
+            found = self._models.pop(self.key(model_id, revision), None) is not None
+            if self._refs.get(model_id) == revision:
+                others = [e for e in self._models.values() if e["id"] == model_id]
+                if others:
+                    self._refs[model_id] = max(others, key=lambda e: e["last_access"])["revision"]
+                else:
+                    self._refs.pop(model_id, None)
+            return found
+
+        return self._update(drop)
+
+    def touch(self, model_id: str, revision: Optional[str] = None, pin: Optional[int] = None) -> bool:
+        """
+        Record that a model was used now (drives least-recently-used eviction).
+
+        Args:
+            model_id (str): Model ID.
+            revision (str | None): Revision; the default one if omitted.
+            pin (int | None): Also mark the model in use by this process ID until `unpin`;
+                eviction skips models pinned by a live process.
+        """
+
+        def bump() -> bool:
+            key = self._resolve(model_id, revision)
+            entry = self._models.get(key) if key else None
+            if entry is None:
+                return False
+            entry["last_access"] = time.time()
+            if pin is not None:
+                pins = [[p, t] for p, t in _pins(entry) if p != pin and process_alive(p, t)]
+                entry["pinned_by"] = pins + [[pin, _started(pin)]]
+            return True
+
+        return self._update(bump)
+
+    def unpin(self, model_id: str, revision: Optional[str] = None, pid: Optional[int] = None) -> bool:
+        """
+        Drop the in-use mark of `pid` (default: this process) from a model.
+        """
+        pid = os.getpid() if pid is None else pid
+
+        def drop() -> bool:
+            key = self._resolve(model_id, revision)
+            entry = self._models.get(key) if key else None
+            pins = _pins(entry) if entry else []
+            if all(p != pid for p, _ in pins):
+                return False
+            entry["pinned_by"] = [[p, t] for p, t in pins if p != pid]
+            return True
+
+        return self._update(drop)
+
+    @staticmethod
+    def in_use(entry: Dict[str, Any], live: Callable[[int, Optional[float]], bool] = process_alive) -> bool:
+        """
+        True if a live process has pinned the entry (a loaded plugin depends on it).
+
+        Args:
+            entry (Dict[str, Any]): Index entry.
+            live (Callable[[int, float | None], bool]): Whether the process with this ID and start time runs.
+        """
+        return any(live(pid, started) for pid, started in _pins(entry))
+
+    def scan(self) -> Dict[str, int]:
+        """
+        Bring the index in line with the cache directories.
+
+        New snapshots are added, changed files re-hashed and entries whose
+        files are gone removed; unchanged files are not read.
+
+        Returns:
+            Dict[str, int]: Counts of "added", "updated", "removed" entries and "hashed" files.
+        """
+
+        def run() -> Dict[str, int]:
+            stats: Dict[str, int] = {"added": 0, "updated": 0, "removed": 0, "hashed": 0}
+            seen = set()
+            if self.hub_dir and self.hub_dir.is_dir():
+                for repo in sorted(self.hub_dir.iterdir()):
+                    model_id = _hf_model_id(repo.name)
+                    snapshots = repo / "snapshots"
+                    if model_id is None or not snapshots.is_dir():
+                        continue
+                    main = repo / "refs" / "main"
+                    default = main.read_text().strip() if main.is_file() else None
+                    for snap in sorted(snapshots.iterdir()):
+                        if snap.is_dir():
+                            self._put(model_id, snap.name, snap, "hf", stats, snap.name == default)
+                            seen.add(self.key(model_id, snap.name))
+            if self.torch_dir and self.torch_dir.is_dir():
+                for f in sorted(self.torch_dir.iterdir()):
+                    if f.is_file() and not f.name.startswith("."):
+                        self._put(f"torch/{f.name}", "local", f, "torch", stats, True)
+                        seen.add(self.key(f"torch/{f.name}", "local"))
+            for key, entry in list(self._models.items()):
+                if key not in seen and (entry["source"] != "file" or not self.abspath(entry).exists()):
+                    del self._models[key]
+                    stats["removed"] += 1
+            for model_id, rev in list(self._refs.items()):
+                if self.key(model_id, rev) not in self._models:
+                    self._refs.pop(model_id)
+                    others = [e for e in self._models.values() if e["id"] == model_id]
+                    if others:
+                        self._refs[model_id] = max(others, key=lambda e: e["last_access"])["revision"]
+            return stats
+
+        return self._update(run)
+
+    def verify(self, model_id: str, revision: Optional[str] = None, deep: bool = False) -> List[str]:
+        """
+        Check a cached model against the index.
+
+        Args:
+            model_id (str): Model ID.
+            revision (str | None): Revision; the default one if omitted.
+            deep (bool): Also re-hash every file (reads the whole snapshot).
+
+        Returns:
+            List[str]: Problems found; empty if the snapshot is intact.
+        """
+        entry = self.lookup(model_id, revision)
+        if entry is None:
+            return [f"{model_id} is not in the index"]
+        base = self.abspath(entry)
+        problems = []
+        for rel, info in entry["files"].items():
+            p = base if base.is_file() else base / rel
+            if not p.is_file():
+                problems.append(f"{rel}: missing")
+            elif p.stat().st_size != info["size"]:
+                problems.append(f"{rel}: size {p.stat().st_size} != {info['size']}")
+            elif deep and sha256_file(p) != info["sha256"]:
+                problems.append(f"{rel}: sha256 mismatch")
+        return problems
+
+
+def missing_models(meta: Dict[str, Dict[str, Any]], index: Optional[ModelCacheIndex] = None) -> Dict[str, List[str]]:
+    """
+    Map plugin name -> models its manifest declares that are not in the cache index, logging each.
+
+    Only the index is consulted: no directory walk and no network access.
+    """
+    index = index or get_model_cache_index()
+    out = {}
+    for name, manifest in meta.items():
+        missing = index.missing(model_refs(manifest))
+        if missing:
+            log.warning("plugin '%s' needs models that are not in the local cache: %s", name, missing)
+            out[name] = missing
+    return out
+
+
+def touch_models(manifest: Optional[Dict[str, Any]]) -> None:
+    """
+    Mark the models a plugin declares as used now and pinned by this process (call after loading it).
+    """
+    _each_model(manifest, lambda index, m, r: index.touch(m, r, pin=os.getpid()))
+
+
+def release_models(manifest: Optional[Dict[str, Any]]) -> None:
+    """
+    Unpin the models a plugin declares (call after unloading it).
+    """
+    _each_model(manifest, lambda index, m, r: index.unpin(m, r))
+
+
+def _each_model(manifest: Optional[Dict[str, Any]], fn: Callable[[ModelCacheIndex, str, Optional[str]], Any]) -> None:
+    refs = model_refs(manifest)
+    if not refs:
+        return
+    index = get_model_cache_index()
+    for model_id, revision in refs:
+        try:
+            fn(index, model_id, revision)
+        except OSError as e:
+            log.warning("could not update model cache index: %s", e)
+            return
+
+
+_index: Optional[ModelCacheIndex] = None
+_lock = threading.Lock()
+
+
+def get_model_cache_index() -> ModelCacheIndex:
+    """
+    Return the process-wide model cache index configured from settings.
+    """
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                from app.core.config import get_settings
+
+                s = get_settings()
+                _index = ModelCacheIndex(
+                    s.MODEL_CACHE_ROOT,
+                    hub_dir=s.TRANSFORMERS_CACHE,
+                    torch_dir=Path(s.TORCH_HOME) / "hub" / "checkpoints" if s.TORCH_HOME else None,
+                )
+    return _index
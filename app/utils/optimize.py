@@ -0,0 +1,202 @@
+# app/utils/optimize.py
+from __future__ import annotations
+
+import copy
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import torch
+import torch.nn as nn
+
+from app.core.config import get_settings
+
+log = logging.getLogger("plugins.optimize")
+
+PASSES = ("channels_last", "quantize_dynamic", "torchscript", "compile")
+
+# Default (rtol, atol) per pass when checking against the eager model; int8 needs more slack.
+_TOLERANCE = {
+    "channels_last": (1e-4, 1e-5),
+    "quantize_dynamic": (5e-2, 5e-2),
+    "torchscript": (1e-4, 1e-5),
+    "compile": (1e-3, 1e-4),
+}
+
+
+class _Skip(Exception):
+    pass
+
+
+class _ChannelsLast(nn.Module):
+    # Feeds NHWC-strided inputs to a model whose weights were converted to channels-last.
+    def __init__(self, model: nn.Module) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.model(x.contiguous(memory_format=torch.channels_last))
+
+
+def _channels_last(model: nn.Module, example: torch.Tensor) -> nn.Module:
+    if example.dim() != 4:
+        raise _Skip("inputs are not 4-D (NCHW)")
+    return _ChannelsLast(copy.deepcopy(model).to(memory_format=torch.channels_last))
+
+
+def _quantize_dynamic(model: nn.Module, example: torch.Tensor) -> nn.Module:
+    if example.device.type != "cpu":
+        raise _Skip("dynamic int8 quantization runs on CPU only")
+    if not any(isinstance(m, nn.Linear) for m in model.modules()):
+        raise _Skip("no nn.Linear layers")
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {nn.Linear}, dtype=torch.qint8)
+
+
+def _torchscript(model: nn.Module, example: torch.Tensor) -> nn.Module:
+    with torch.inference_mode(False), torch.no_grad():
+        traced = torch.jit.trace(model, example, check_trace=False)
+    return torch.jit.freeze(traced.eval())
+
+
+def _compile(model: nn.Module, example: torch.Tensor) -> Callable:
+    if isinstance(model, torch.jit.ScriptModule):
+        raise _Skip("model is already TorchScript")
+    return torch.compile(model)
+
+
+_APPLY: Dict[str, Callable[[nn.Module, torch.Tensor], Any]] = {
+    "channels_last": _channels_last,
+    "quantize_dynamic": _quantize_dynamic,
+    "torchscript": _torchscript,
+    "compile": _compile,
+}
+
+
+def _sync(dev: torch.device) -> None:
+    if dev.type == "cuda":
+        torch.cuda.synchronize(dev)
+
+
+def _run(model: Callable, example: torch.Tensor) -> torch.Tensor:
+    with torch.no_grad():
+        return model(example)
+
+
+def _time_ms(model: Callable, example: torch.Tensor, warmup: int, iters: int) -> float:
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(example)
+        _sync(example.device)
+        times = []
+        for _ in range(iters):
+            t0 = time.perf_counter()
+            model(example)
+            _sync(example.device)
+            times.append(time.perf_counter() - t0)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def passes_for(manifest: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Resolve which optimization passes to run for a plugin.
+
+    The manifest's "optimize" entry (a list of pass names, or `false` to
+    disable) wins over `APP_MODEL_OPTIMIZE`.
+
+    Args:
+        manifest (Dict[str, Any] | None): Plugin manifest.
+
+    Returns:
+        List[str]: Pass names, in the order they will be tried.
+    """
+    value = (manifest or {}).get("optimize")
+    if value is None:
+        value = get_settings().MODEL_OPTIMIZE
+    if not value:
+        return []
+    names = [value] if isinstance(value, str) else list(value)
+    unknown = [n for n in names if n not in _APPLY]
+    if unknown:
+        raise ValueError(f"Unknown optimization passes {unknown}; expected any of {list(PASSES)}")
+    return names
+
+
+def optimize_model(
+    model: nn.Module,
+    example: torch.Tensor,
+    passes: Sequence[str],
+    tolerance: Optional[Dict[str, Tuple[float, float]]] = None,
+    min_speedup: float = 1.0,
+    warmup: int = 3,
+    iters: int = 20,
+) -> Tuple[Callable, Dict[str, Any]]:
+    """
+    Run optional optimization passes on an eval-mode model, keeping those that are correct and faster.
+
+    Passes are tried in the given order, each on top of the last kept
+    result. A pass is kept only if its output on `example` matches the eager
+    model within the pass's (rtol, atol), or the looser tolerance of a pass
+    already kept, and it is at least `min_speedup` times faster than the
+    model it replaces. Failing, mismatching or slower
+    passes are recorded and skipped; the eager model is never modified.
+
+    Passes:
+        channels_last: NHWC memory format (4-D inputs, i.e. conv nets).
+        quantize_dynamic: int8 dynamic quantization of nn.Linear layers (CPU).
+        torchscript: `torch.jit.trace` + `torch.jit.freeze`.
+        compile: `torch.compile` (needs a working compiler toolchain).
+
+    Args:
+        model (nn.Module): Eager model in eval mode.
+        example (torch.Tensor): Representative input on the model's device.
+        passes (Sequence[str]): Pass names (see `passes_for`).
+        tolerance (Dict[str, Tuple[float, float]] | None): Per-pass (rtol, atol) overrides.
+        min_speedup (float): Required speedup over the previous stage to keep a pass.
+        warmup (int): Untimed calls before timing.
+        iters (int): Timed calls (median is used).
+
+    Returns:
+        Tuple[Callable, Dict[str, Any]]: The model to serve and a report with the eager and final
+            latency, the overall speedup, and per-pass status, max error and speedup.
+    """
+    tol = {**_TOLERANCE, **(tolerance or {})}
+    reference = _run(model, example)
+    eager_ms = _time_ms(model, example, warmup, iters)
+    current, current_ms = model, eager_ms
+    kept_tol = (0.0, 0.0)  # error already accepted from earlier passes carries over
+    steps = []
+
+    for name in passes:
+        step: Dict[str, Any] = {"pass": name}
+        try:
+            candidate = _APPLY[name](current, example)
+            out = _run(candidate, example)
+            err = (out.float() - reference.float()).abs().max().item()
+            step["max_abs_err"] = round(err, 6)
+            rtol, atol = max(kept_tol[0], tol[name][0]), max(kept_tol[1], tol[name][1])
+            if not torch.allclose(out.float(), reference.float(), rtol=rtol, atol=atol):
+                step["status"] = "mismatch"
+            else:
+                ms = _time_ms(candidate, example, warmup, iters)
+                step["ms"] = round(ms, 4)
+                step["speedup"] = round(current_ms / ms, 3)
+                if current_ms / ms >= min_speedup:
+                    step["status"] = "applied"
+                    current, current_ms, kept_tol = candidate, ms, (rtol, atol)
+                else:
+                    step["status"] = "slower"
+        except _Skip as e:
+            step.update(status="skipped", reason=str(e))
+        except Exception as e:
+            step.update(status="failed", reason=f"{type(e).__name__}: {e}")
+        steps.append(step)
+
+    report = {
+        "eager_ms": round(eager_ms, 4),
+        "final_ms": round(current_ms, 4),
+        "speedup": round(eager_ms / current_ms, 3),
+        "passes": steps,
+    }
+    if passes:
+        log.info("optimized model: %s", report)
+    return current, report
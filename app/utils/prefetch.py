@@ -0,0 +1,359 @@
+# app/utils/prefetch.py
+"""
+Parallel, resumable model prefetcher driven by plugin manifests.
+
+Models come from the "models" list in each plugin's `manifest.json` (see
+`app.utils.model_cache`). Entries may narrow the files to fetch or point at
+a plain URL (torch hub checkpoints):
+
+    "models": [
+        "org/name",
+        {"id": "org/name", "revision": "<commit>", "files": ["*.json", "*.safetensors"]},
+        {"id": "torch/resnet18-f37072fd.pth", "url": "https://download.pytorch.org/models/resnet18-f37072fd.pth"}
+    ]
+
+Files are fetched concurrently (bounded by `workers`) into the same layouts
+the libraries read: the Hugging Face hub cache (`TRANSFORMERS_CACHE`:
+blobs/, snapshots/<revision>/, refs/main) and `TORCH_HOME/hub/checkpoints`.
+A download is written to a ".partial" file first and resumed from its size
+on the next run. Models already in the cache index are skipped without
+contacting any source. Each finished model is added to the index.
+
+Sources are tried in order: a local mirror directory (`<mirror>/<model id>/<files>`,
+e.g. the output of `huggingface-cli download --local-dir`), then the network,
+unless `HF_HUB_OFFLINE` is set.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.utils.model_cache import ModelCacheIndex, get_model_cache_index, sha256_file
+
+log = logging.getLogger("plugins.prefetch")
+
+CHUNK = 1 << 20
+
+# (name relative to the snapshot, size or None, sha256 or None)
+FileInfo = Tuple[str, Optional[int], Optional[str]]
+
+
+def model_specs(manifests: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collect the model entries of several manifests as dicts with "id", "revision", "files" and "url".
+
+    String entries are "id", "id@revision" or "id=url". Duplicates (same ID
+    and revision) are merged.
+    """
+    out: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+    for manifest in manifests:
+        for item in (manifest or {}).get("models") or []:
+            if isinstance(item, dict):
+                spec = {"id": str(item["id"]), "revision": item.get("revision"), **item}
+            elif "=" in str(item):
+                model_id, _, url = str(item).partition("=")
+                spec = {"id": model_id, "revision": None, "url": url}
+            else:
+                model_id, _, revision = str(item).partition("@")
+                spec = {"id": model_id, "revision": revision or None}
+            out.setdefault((spec["id"], spec["revision"]), spec)
+    return list(out.values())
+
+
+class SourceError(Exception):
+    pass
+
+
+class MirrorSource:
+    """
+    Files from a local directory laid out as `<root>/<model id>/<files>`.
+    """
+
+    name = "mirror"
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def resolve(self, spec: Dict[str, Any]) -> Tuple[str, List[FileInfo]]:
+        base = self.root / spec["id"]
+        if base.is_file():
+            return "local", [(base.name, base.stat().st_size, None)]
+        if not base.is_dir():
+            raise SourceError(f"{spec['id']} is not in mirror {self.root}")
+        files = sorted(p for p in base.rglob("*") if p.is_file() and ".cache" not in p.relative_to(base).parts)
+        infos = [(p.relative_to(base).as_posix(), p.stat().st_size, None) for p in files]
+        return spec.get("revision") or "main", infos
+
+    def fetch(self, spec: Dict[str, Any], revision: str, name: str, offset: int) -> Tuple[int, Iterator[bytes]]:
+        base = self.root / spec["id"]
+        path = base if base.is_file() else base / name
+
+        def read() -> Iterator[bytes]:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                yield from iter(lambda: f.read(CHUNK), b"")
+
+        return offset, read()
+
+
+class HubSource:
+    """
+    Files from the Hugging Face Hub (or a compatible endpoint), or from a spec's "url".
+
+    Args:
+        endpoint (str): Hub base URL (`HF_ENDPOINT`).
+        token (str | None): Access token for gated or private models (`HF_TOKEN`).
+        timeout (float): Per-request connect/read timeout in seconds.
+    """
+
+    name = "hub"
+
+    def __init__(self, endpoint: str = "https://huggingface.co", token: Optional[str] = None, timeout: float = 30.0):
+        import requests
+
+        self.endpoint = endpoint.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def resolve(self, spec: Dict[str, Any]) -> Tuple[str, List[FileInfo]]:
+        if spec.get("url"):
+            return "local", [(spec["url"].rsplit("/", 1)[-1], None, None)]
+        revision = spec.get("revision") or "main"
+        url = f"{self.endpoint}/api/models/{spec['id']}/revision/{revision}"
+        r = self.session.get(url, params={"blobs": "true"}, timeout=self.timeout)
+        if r.status_code != 200:
+            raise SourceError(f"{spec['id']}@{revision}: HTTP {r.status_code} from {url}")
+        info = r.json()
+        files = []
+        for s in info.get("siblings", []):
+            lfs = s.get("lfs") or {}
+            files.append((s["rfilename"], lfs.get("size", s.get("size")), lfs.get("sha256")))
+        return info["sha"], files
+
+    def fetch(self, spec: Dict[str, Any], revision: str, name: str, offset: int) -> Tuple[int, Iterator[bytes]]:
+        url = spec.get("url") or f"{self.endpoint}/{spec['id']}/resolve/{revision}/{name}"
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        r = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        if r.status_code == 416:  # nothing left to fetch
+            r.close()
+            return offset, iter(())
+        if r.status_code not in (200, 206):
+            r.close()
+            raise SourceError(f"{name}: HTTP {r.status_code} from {url}")
+        start = offset if r.status_code == 206 else 0  # 200: the server ignored the range
+        return start, r.iter_content(CHUNK)
+
+
+def _select(files: List[FileInfo], patterns: Optional[List[str]]) -> List[FileInfo]:
+    if not patterns:
+        return files
+    return [f for f in files if any(fnmatch.fnmatch(f[0], p) for p in patterns)]
+
+
+def _link(target: Path, link: Path) -> None:
+    link.parent.mkdir(parents=True, exist_ok=True)
+    if link.is_symlink() or link.exists():
+        link.unlink()
+    try:
+        link.symlink_to(os.path.relpath(target, link.parent))
+    except OSError:  # no symlink permission (e.g. Windows without developer mode)
+        shutil.copy2(target, link)
+
+
+class Prefetcher:
+    """
+    Fetch models into the local caches.
+
+    Args:
+        sources (List): Sources tried in order (`MirrorSource`, `HubSource`).
+        hub_dir (Path): Hugging Face hub cache (`TRANSFORMERS_CACHE`).
+        torch_dir (Path): Torch hub checkpoint directory.
+        index (ModelCacheIndex | None): Cache index to skip cached models and record new ones.
+        workers (int): Files downloaded in parallel.
+    """
+
+    def __init__(
+        self,
+        sources: List[Any],
+        hub_dir: Path,
+        torch_dir: Path,
+        index: Optional[ModelCacheIndex] = None,
+        workers: int = 4,
+    ) -> None:
+        self.sources = sources
+        self.hub_dir = Path(hub_dir)
+        self.torch_dir = Path(torch_dir)
+        self.index = index
+        self.workers = max(1, int(workers))
+
+    # ------------------------------------------------------------------
+    def _is_torch(self, spec: Dict[str, Any]) -> bool:
+        return spec["id"].startswith("torch/")
+
+    def _repo(self, spec: Dict[str, Any]) -> Path:
+        return self.hub_dir / ("models--" + spec["id"].replace("/", "--"))
+
+    def _partial(self, spec: Dict[str, Any], revision: str, name: str) -> Path:
+        if self._is_torch(spec):
+            return self.torch_dir / f".{name}.partial"
+        return self._repo(spec) / ".partial" / revision / f"{name}.partial"
+
+    def _cached(self, spec: Dict[str, Any]) -> bool:
+        if self.index is None:
+            return False
+        revision = "local" if self._is_torch(spec) else spec.get("revision")
+        return self.index.has(spec["id"], revision) and not self.index.verify(spec["id"], revision)
+
+    def _resolve(self, spec: Dict[str, Any]) -> Tuple[Any, str, List[FileInfo]]:
+        errors = []
+        for source in self.sources:
+            try:
+                revision, files = source.resolve(spec)
+                files = _select(files, spec.get("files"))
+                if not files:
+                    raise SourceError(f"{spec['id']}: no files match {spec.get('files')}")
+                return source, revision, files
+            except Exception as e:
+                errors.append(f"{source.name}: {e}")
+        raise SourceError("; ".join(errors) or "no sources configured")
+
+    def _download(self, source: Any, spec: Dict[str, Any], revision: str, info: FileInfo) -> Tuple[Path, int]:
+        name, size, sha = info
+        partial = self._partial(spec, revision, name)
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        offset = partial.stat().st_size if partial.exists() else 0
+        if size is not None and offset > size:
+            offset = 0
+        fetched = 0
+        if size is None or offset < size:
+            start, chunks = source.fetch(spec, revision, name, offset)
+            with open(partial, "r+b" if start and partial.exists() else "wb") as f:
+                f.seek(start)
+                f.truncate()
+                for chunk in chunks:
+                    f.write(chunk)
+                    fetched += len(chunk)
+        actual = partial.stat().st_size
+        if size is not None and actual != size:
+            raise SourceError(f"{name}: got {actual} bytes, expected {size}")
+        if sha is not None and sha256_file(partial) != sha:
+            partial.unlink()  # corrupt: start over next time
+            raise SourceError(f"{name}: sha256 mismatch")
+        return partial, fetched
+
+    def _finish(self, spec: Dict[str, Any], revision: str, parts: Dict[str, Path]) -> None:
+        if self._is_torch(spec):
+            (name, partial), *_ = parts.items()
+            dest = self.torch_dir / name
+            os.replace(partial, dest)
+            if self.index is not None:
+                self.index.register(spec["id"], "local", dest, source="torch")
+            return
+
+        repo = self._repo(spec)
+        snapshot = repo / "snapshots" / revision
+        for name, partial in parts.items():
+            blob = repo / "blobs" / sha256_file(partial)
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            if blob.exists():
+                partial.unlink()
+            else:
+                os.replace(partial, blob)
+            _link(blob, snapshot / name)
+        shutil.rmtree(repo / ".partial" / revision, ignore_errors=True)
+        if spec.get("revision") in (None, "main"):
+            (repo / "refs").mkdir(parents=True, exist_ok=True)
+            (repo / "refs" / "main").write_text(revision)
+        if self.index is not None:
+            self.index.register(spec["id"], revision, snapshot, source="hf")
+
+    # ------------------------------------------------------------------
+    def run(self, specs: List[Dict[str, Any]], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch every model that is not cached yet.
+
+        Args:
+            specs (List[Dict[str, Any]]): Model entries (see `model_specs`).
+            refresh (bool): Re-resolve models that are already in the index.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per model ID: "status" ("cached", "fetched" or "failed"),
+                plus "source", "revision", "files", "bytes" fetched, "seconds" until its last
+                file finished, or "error".
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        todo = []
+        for spec in specs:
+            if not refresh and self._cached(spec):
+                results[spec["id"]] = {"status": "cached"}
+            else:
+                todo.append(spec)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch") as pool:
+            t0 = time.perf_counter()
+            resolved = {}
+            for spec, fut in [(s, pool.submit(self._resolve, s)) for s in todo]:
+                try:
+                    resolved[spec["id"]] = (spec, *fut.result())
+                except Exception as e:
+                    results[spec["id"]] = {"status": "failed", "error": str(e)}
+
+            jobs = {}
+            for model_id, (spec, source, revision, files) in resolved.items():
+                results[model_id] = {"status": "fetched", "source": source.name, "revision": revision, "bytes": 0}
+                results[model_id]["files"] = len(files)
+                for info in files:
+                    jobs[pool.submit(self._download, source, spec, revision, info)] = (model_id, info[0])
+
+            parts: Dict[str, Dict[str, Path]] = {m: {} for m in resolved}
+            for fut in as_completed(jobs):
+                model_id, name = jobs[fut]
+                try:
+                    path, fetched = fut.result()
+                except Exception as e:
+                    log.warning("prefetch %s/%s failed: %s", model_id, name, e)
+                    results[model_id].update(status="failed", error=f"{name}: {e}")
+                    continue
+                parts[model_id][name] = path
+                results[model_id]["bytes"] += fetched
+                results[model_id]["seconds"] = round(time.perf_counter() - t0, 3)
+
+        for model_id, (spec, _, revision, files) in resolved.items():
+            res = results[model_id]
+            if res["status"] == "fetched":
+                try:
+                    self._finish(spec, revision, parts[model_id])
+                except OSError as e:
+                    res.update(status="failed", error=str(e))
+            log.info("prefetch %s: %s", model_id, res)
+        return results
+
+
+def default_prefetcher(mirror: Optional[Path] = None, workers: Optional[int] = None) -> Prefetcher:
+    """
+    Build a `Prefetcher` for the configured caches: mirror first, then the Hub unless offline.
+    """
+    from app.core.config import get_settings
+
+    s = get_settings()
+    mirror = mirror or s.PREFETCH_MIRROR
+    sources: List[Any] = [MirrorSource(mirror)] if mirror else []
+    if os.getenv("HF_HUB_OFFLINE", "0").lower() not in ("1", "true", "yes"):
+        endpoint = os.getenv("HF_ENDPOINT", "https://huggingface.co")
+        sources.append(HubSource(endpoint, token=os.getenv("HF_TOKEN")))
+    return Prefetcher(
+        sources,
+        hub_dir=s.TRANSFORMERS_CACHE,
+        torch_dir=Path(s.TORCH_HOME) / "hub" / "checkpoints",
+        index=get_model_cache_index(),
+        workers=workers or s.PREFETCH_WORKERS,
+    )
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+from app.utils import tensor_codec
+
+log = logging.getLogger("plugins.cache")
+
+# Disk entries start with their expiry time so pruning never decodes values.
+_HEADER = struct.Struct("<d")
+_SUFFIX = ".entry"
+_TENSOR = "__tensor__"
+
+
+def _canonical_default(x: Any) -> Any:
+    """
+    JSON fallback for hashing: arrays/tensors hash by dtype, shape and raw bytes.
+    """
+    if hasattr(x, "detach") and hasattr(x, "cpu"):
+        x = x.detach().cpu().contiguous().numpy()
+    if hasattr(x, "tobytes") and hasattr(x, "dtype") and hasattr(x, "shape"):
+        digest = hashlib.sha256(x.tobytes()).hexdigest()
+        return {"__array__": [str(x.dtype), list(x.shape), digest]}
+    if isinstance(x, (bytes, bytearray, memoryview)):
+        return {"__bytes__": hashlib.sha256(bytes(x)).hexdigest()}
+    if isinstance(x, (set, frozenset)):
+        return sorted(x, key=repr)
+    return repr(x)
+
+
+def stable_hash(*parts: Any) -> str:
+    """
+    Content hash of JSON-like values that is independent of dict key order.
+
+    Args:
+        *parts (Any): Values to hash together (e.g. plugin, task, payload, version).
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_canonical_default)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _encode_disk(value: Any) -> Optional[bytes]:
+    """
+    Encode a result for the disk tier without pickle: arrays and tensors as
+    safetensors, the rest of the structure as JSON in its metadata.
+
+    Returns:
+        bytes | None: The entry, or None if the value holds anything else (kept in memory only).
+    """
+    tensors: Dict[str, Any] = {}
+
+    def walk(x: Any) -> Any:
+        if isinstance(x, (torch.Tensor, np.ndarray, np.generic)):
+            name = f"t{len(tensors)}"
+            kind = "torch" if isinstance(x, torch.Tensor) else "numpy" if isinstance(x, np.ndarray) else "scalar"
+            tensors[name] = np.asarray(x) if kind == "scalar" else x
+            return {_TENSOR: name, "kind": kind}
+        if isinstance(x, dict) and all(isinstance(k, str) for k in x) and _TENSOR not in x:
+            return {k: walk(v) for k, v in x.items()}
+        if isinstance(x, (list, tuple)):
+            return [walk(v) for v in x]
+        if x is None or isinstance(x, (str, int, float, bool)):
+            return x
+        raise TypeError(f"{type(x).__name__} is not stored on disk")
+
+    try:
+        tree = json.dumps(walk(value))
+        return tensor_codec.encode_safetensors(tensors, {"value": tree})
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode_disk(blob: bytes) -> Any:
+    tensors, meta = tensor_codec.decode_safetensors(blob)
+
+    def walk(x: Any) -> Any:
+        if isinstance(x, dict):
+            if _TENSOR in x:
+                arr = tensors[x[_TENSOR]]
+                if x["kind"] == "torch":
+                    return arr.clone() if isinstance(arr, torch.Tensor) else torch.from_numpy(arr.copy())
+                return arr[()] if x["kind"] == "scalar" else arr.copy()
+            return {k: walk(v) for k, v in x.items()}
+        if isinstance(x, list):
+            return [walk(v) for v in x]
+        return x
+
+    return walk(json.loads(meta["value"]))
+
+
+def cache_policy(manifest: Dict[str, Any], task: str) -> Optional[float]:
+    """
+    Decide whether a plugin task is cacheable, from its manifest.
+
+    The manifest declares deterministic tasks as::
+
+        "cache": {"tasks": ["classify"], "ttl_sec": 600}
+
+    where "tasks" may be "*" for every task and "ttl_sec" is optional.
+
+    Args:
+        manifest (Dict[str, Any]): Plugin manifest.
+        task (str): Task name.
+
+    Returns:
+        Optional[float]: TTL override in seconds (0 = cache default), or None if not cacheable.
+    """
+    spec = manifest.get("cache")
+    if not isinstance(spec, dict):
+        return None
+    tasks = spec.get("tasks", "*")
+    if tasks != "*" and task not in tasks:
+        return None
+    return float(spec.get("ttl_sec") or 0)
+
+
+class ResultCache:
+    """
+    Two-tier inference result cache with LRU eviction and TTL expiry.
+
+    The memory tier is bounded by entry count and byte size and keeps
+    results pickled, so every hit returns a fresh copy that callers may
+    mutate. The optional disk tier stores them under `disk_dir`, sharded by
+    key prefix, and promotes hits back into memory. Nothing on disk is
+    unpickled: entries hold arrays/tensors as safetensors and the rest as
+    JSON, so results with other types (sets, dataclasses, ...) stay in memory
+    only and tuples come back from disk as lists.
+
+    Args:
+        max_entries (int): Maximum entries in memory.
+        max_bytes (int): Maximum approximate size of memory entries.
+        ttl_sec (float): Default time-to-live for entries.
+        disk_dir (Path | None): Directory for the on-disk tier, or None to disable it.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl_sec: float = 300.0, disk_dir=None
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl_sec = float(ttl_sec)
+        self.disk_dir: Optional[Path] = Path(disk_dir) if disk_dir else None
+        self._mem: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expired": 0, "puts": 0}
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key in memory, then on disk.
+
+        Args:
+            key (str): Cache key from `stable_hash`.
+
+        Returns:
+            Tuple[bool, Any]: (hit, value).
+        """
+        now = time.time()
+        blob = None
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                if item[1] > now:
+                    self._mem.move_to_end(key)
+                    self.counters["hits"] += 1
+                    blob = item[0]
+                else:
+                    self._drop(key)
+                    self.counters["expired"] += 1
+        if blob is not None:
+            return True, pickle.loads(blob)
+
+        if self.disk_dir:
+            entry, expires = self._disk_get(key, now)
+            if entry is not None:
+                try:
+                    value = _decode_disk(entry)
+                    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    self._path(key).unlink(missing_ok=True)
+                else:
+                    with self._lock:
+                        self.counters["hits"] += 1
+                        self.counters["disk_hits"] += 1
+                        if len(blob) <= self.max_bytes:
+                            self._insert(key, blob, expires)
+                    return True, value
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return False, None
+
+    def put(self, key: str, value: Any, ttl_sec: Optional[float] = None) -> None:
+        """
+        Store a result.
+
+        Args:
+            key (str): Cache key.
+            value (Any): Result to cache (must be picklable; see the class notes for the disk tier).
+            ttl_sec (float | None): Entry TTL; defaults to the cache TTL.
+        """
+        ttl = ttl_sec or self.ttl_sec
+        expires = time.time() + ttl
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            log.debug("result for %s is not picklable; not cached", key)
+            return
+        with self._lock:
+            self.counters["puts"] += 1
+            if len(blob) <= self.max_bytes:
+                self._insert(key, blob, expires)
+        if self.disk_dir:
+            entry = _encode_disk(value)
+            if entry is not None:
+                self._disk_put(key, entry, expires)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._bytes = 0
+        if self.disk_dir:
+            for f in self.disk_dir.glob(f"*/*{_SUFFIX}"):
+                f.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_ratio": round(self.counters["hits"] / total, 4) if total else 0.0,
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_sec": self.ttl_sec,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+    # --- memory tier (call with lock held) ---
+    def _drop(self, key: str) -> None:
+        blob, _ = self._mem.pop(key)
+        self._bytes -= len(blob)
+
+    def _insert(self, key: str, blob: bytes, expires: float) -> None:
+        if key in self._mem:
+            self._drop(key)
+        self._mem[key] = (blob, expires)
+        self._bytes += len(blob)
+        while len(self._mem) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._mem))
+            self._drop(oldest)
+            self.counters["evictions"] += 1
+
+    # --- disk tier ---
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}{_SUFFIX}"  # type: ignore[operator]
+
+    def _disk_get(self, key: str, now: float) -> Tuple[Optional[bytes], float]:
+        path = self._path(key)
+        try:
+            with path.open("rb") as fh:
+                (expires,) = _HEADER.unpack(fh.read(_HEADER.size))
+                blob = fh.read() if expires > now else None
+        except FileNotFoundError:
+            return None, 0.0
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None, 0.0
+        if blob is None:
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.counters["expired"] += 1
+        return blob, expires
+
+    def _disk_put(self, key: str, blob: bytes, expires: float) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp.open("wb") as fh:
+                fh.write(_HEADER.pack(expires))
+                fh.write(blob)
+            os.replace(tmp, path)
+        except Exception:
+            log.exception("failed to write result cache entry %s", key)
+        self._puts += 1
+        if self._puts % 256 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        now = time.time()
+        for f in self.disk_dir.glob(f"*/*{_SUFFIX}"):  # type: ignore[union-attr]
+            try:
+                with f.open("rb") as fh:
+                    (expires,) = _HEADER.unpack(fh.read(_HEADER.size))
+                if expires <= now:
+                    f.unlink(missing_ok=True)
+            except Exception:
+                f.unlink(missing_ok=True)
+
+
+_cache: Optional[ResultCache] = None
+_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide result cache configured from settings.
+    """
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                from app.core.config import get_settings
+
+                s = get_settings()
+                _cache = ResultCache(
+                    max_entries=s.RESULT_CACHE_MAX_ENTRIES,
+                    max_bytes=int(s.RESULT_CACHE_MAX_MB * 1024 * 1024),
+                    ttl_sec=s.RESULT_CACHE_TTL_SEC,
+                    disk_dir=s.MODEL_CACHE_ROOT / "results" if s.RESULT_CACHE_DISK else None,
+                )
+    return _cache
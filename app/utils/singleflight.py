@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one computation.
+
+    The first caller for a key starts the computation as a separate task;
+    callers arriving while it runs await that same task and receive its result
+    or exception. Because the task is shielded, a caller that is cancelled or
+    times out does not cancel the work for the others. The key is released as
+    soon as the computation finishes, successfully or not.
+
+    Calls are coalesced per event loop.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.counters = {"leaders": 0, "coalesced": 0, "errors": 0, "timeouts": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Identity of the computation (e.g. a payload hash).
+            fn (Callable[[], Awaitable[Any]]): Coroutine function producing the result.
+            timeout (float | None): Seconds this caller waits before giving up.
+
+        Returns:
+            Any: The shared result.
+
+        Raises:
+            asyncio.TimeoutError: If this caller's wait exceeds `timeout`.
+        """
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is not asyncio.get_running_loop():
+            task = None  # left behind by a loop that has since stopped
+        if task is None:
+            self.counters["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        else:
+            self.counters["coalesced"] += 1
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "in_flight": len(self._inflight)}
+
+
+_group = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """
+    Return the process-wide single-flight group used by the plugin routes.
+    """
+    return _group
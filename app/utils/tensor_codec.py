@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import ast
+import json
+import struct
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+RAW = "application/octet-stream"
+NPY = "application/x-npy"
+SAFETENSORS = "application/x-safetensors"
+MEDIA_TYPES = (RAW, NPY, SAFETENSORS)
+
+# Raw buffers describe themselves with these headers (request and response)
+DTYPE_HEADER = "X-Tensor-Dtype"
+SHAPE_HEADER = "X-Tensor-Shape"
+NAME_HEADER = "X-Tensor-Name"
+
+_ST_DTYPES = {
+    "F64": np.float64,
+    "F32": np.float32,
+    "F16": np.float16,
+    "I64": np.int64,
+    "I32": np.int32,
+    "I16": np.int16,
+    "I8": np.int8,
+    "U8": np.uint8,
+    "BOOL": np.bool_,
+}
+_ST_NAMES = {np.dtype(v): k for k, v in _ST_DTYPES.items()}
+_NPY_MAGIC = b"\x93NUMPY"
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class TensorCodecError(ValueError):
+    """
+    Raised for malformed or unsupported binary tensor payloads.
+    """
+
+
+def media_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Return the binary tensor media type named by a Content-Type header, if any.
+    """
+    if not content_type:
+        return None
+    mt = content_type.split(";", 1)[0].strip().lower()
+    return mt if mt in MEDIA_TYPES else None
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick the binary media type requested by an Accept header, if any.
+
+    Only exact media types count; wildcards keep the default JSON response.
+    """
+    if not accept:
+        return None
+    for part in accept.split(","):
+        mt = media_type(part)
+        if mt:
+            return mt
+    return None
+
+
+def _parse_shape(value: str) -> Tuple[int, ...]:
+    try:
+        shape = tuple(int(s) for s in value.replace("(", "").replace(")", "").replace(" ", "").split(",") if s)
+    except ValueError as e:
+        raise TensorCodecError(f"Invalid shape {value!r}") from e
+    if any(d < 0 for d in shape):
+        raise TensorCodecError(f"Invalid shape {value!r}")
+    return shape
+
+
+def _check_dtype(dt: np.dtype) -> None:
+    # numeric only: strings, objects and structured dtypes can be empty (itemsize 0) or unsafe
+    if dt.kind not in "biufc" or dt.itemsize == 0:
+        raise TensorCodecError(f"Unsupported dtype {dt.str!r}: only bool and numeric arrays are accepted")
+
+
+def _view(buf: Buffer, dtype: np.dtype, shape: Tuple[int, ...], offset: int = 0, order: str = "C") -> np.ndarray:
+    count = int(np.prod(shape, dtype=np.int64))
+    if offset + count * dtype.itemsize > len(buf):
+        raise TensorCodecError(f"Buffer too small for {dtype.str}{list(shape)}")
+    return np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(shape, order=order)
+
+
+# ---------------- decoding ----------------
+def decode_raw(buf: Buffer, dtype: str, shape: str) -> np.ndarray:
+    """
+    View a raw little-endian buffer as an array.
+
+    Args:
+        buf (Buffer): Tensor bytes.
+        dtype (str): NumPy dtype name, e.g. "float32".
+        shape (str): Comma-separated dimensions, e.g. "8,512".
+
+    Returns:
+        np.ndarray: Zero-copy view of `buf`.
+    """
+    try:
+        dt = np.dtype(dtype).newbyteorder("<")
+    except TypeError as e:
+        raise TensorCodecError(f"Unknown dtype {dtype!r}") from e
+    _check_dtype(dt)
+    shape_t = _parse_shape(shape) if shape else (len(buf) // dt.itemsize,)
+    if int(np.prod(shape_t, dtype=np.int64)) * dt.itemsize != len(buf):
+        raise TensorCodecError(f"{len(buf)} bytes do not match {dt.name}{list(shape_t)}")
+    return _view(buf, dt, shape_t)
+
+
+def decode_npy(buf: Buffer) -> np.ndarray:
+    """
+    View a `.npy` buffer as an array without copying its data.
+    """
+    mv = memoryview(buf)
+    if bytes(mv[:6]) != _NPY_MAGIC or len(mv) < 10:
+        raise TensorCodecError("Not a .npy buffer")
+    major = mv[6]
+    if major == 1:
+        (hlen,) = struct.unpack_from("<H", mv, 8)
+        start = 10
+    else:
+        (hlen,) = struct.unpack_from("<I", mv, 8)
+        start = 12
+    try:
+        header = ast.literal_eval(bytes(mv[start : start + hlen]).decode("latin1"))
+        dt = np.dtype(header["descr"])
+        shape = tuple(header["shape"])
+    except Exception as e:
+        raise TensorCodecError(f"Invalid .npy header: {e!s}") from e
+    _check_dtype(dt)
+    return _view(buf, dt, shape, offset=start + hlen, order="F" if header.get("fortran_order") else "C")
+
+
+def decode_safetensors(buf: Buffer) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    View every tensor in a safetensors buffer.
+
+    Args:
+        buf (Buffer): Serialized safetensors file.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, str]]: (tensors by name, `__metadata__` strings).
+            BF16 tensors are returned as torch tensors, everything else as NumPy arrays.
+    """
+    mv = memoryview(buf)
+    if len(mv) < 8:
+        raise TensorCodecError("Not a safetensors buffer")
+    (hlen,) = struct.unpack_from("<Q", mv, 0)
+    if 8 + hlen > len(mv):
+        raise TensorCodecError("Truncated safetensors header")
+    try:
+        header = json.loads(bytes(mv[8 : 8 + hlen]))
+    except ValueError as e:
+        raise TensorCodecError(f"Invalid safetensors header: {e!s}") from e
+    base = 8 + hlen
+    meta = header.pop("__metadata__", None) or {}
+    tensors: Dict[str, Any] = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        shape = tuple(info["shape"])
+        if info["dtype"] == "BF16":
+            raw = _view(buf, np.dtype("<i2"), shape, offset=base + begin)
+            tensors[name] = torch.from_numpy(raw).view(torch.bfloat16)
+            continue
+        if info["dtype"] not in _ST_DTYPES:
+            raise TensorCodecError(f"Unsupported safetensors dtype {info['dtype']!r}")
+        dt = np.dtype(_ST_DTYPES[info["dtype"]]).newbyteorder("<")
+        if (end - begin) != int(np.prod(shape, dtype=np.int64)) * dt.itemsize:
+            raise TensorCodecError(f"Tensor {name!r} has inconsistent offsets")
+        tensors[name] = _view(buf, dt, shape, offset=base + begin)
+    return tensors, meta
+
+
+def decode_payload(content_type: str, buf: Buffer, headers: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Turn a binary request body into a plugin payload.
+
+    Raw and `.npy` bodies become a single field named by `X-Tensor-Name`
+    (default "inputs"). A safetensors body maps every tensor to a field of the
+    same name; `__metadata__` entries become extra fields (JSON-decoded when
+    possible).
+
+    Args:
+        content_type (str): One of `MEDIA_TYPES`.
+        buf (Buffer): Request body; keep it writable for writable views.
+        headers (Mapping[str, str]): Request headers.
+
+    Returns:
+        Dict[str, Any]: Payload whose tensors are views of `buf`.
+    """
+    if content_type == SAFETENSORS:
+        tensors, meta = decode_safetensors(buf)
+        payload: Dict[str, Any] = {}
+        for k, v in meta.items():
+            try:
+                payload[k] = json.loads(v)
+            except ValueError:
+                payload[k] = v
+        payload.update(tensors)
+        return payload
+    name = headers.get(NAME_HEADER) or "inputs"
+    if content_type == NPY:
+        return {name: decode_npy(buf)}
+    return {name: decode_raw(buf, headers.get(DTYPE_HEADER) or "float32", headers.get(SHAPE_HEADER) or "")}
+
+
+# ---------------- encoding ----------------
+def is_tensor(x: Any) -> bool:
+    return isinstance(x, (np.ndarray, torch.Tensor))
+
+
+def _numpy(x: Any) -> Tuple[np.ndarray, str]:
+    """Return a C-contiguous little-endian NumPy view (copying only when required) and its safetensors tag."""
+    if isinstance(x, torch.Tensor):
+        x = x.detach()
+        if x.device.type != "cpu":
+            x = x.cpu()
+        if x.dtype == torch.bfloat16:
+            return np.asarray(x.contiguous().view(torch.int16).numpy(), order="C"), "BF16"
+        x = x.contiguous().numpy()
+    arr = np.asarray(x, order="C")  # unlike ascontiguousarray, keeps 0-d shapes
+    if arr.dtype.byteorder == ">":
+        arr = arr.astype(arr.dtype.newbyteorder("<"))
+    tag = _ST_NAMES.get(np.dtype(arr.dtype.name)) if arr.dtype.kind != "O" else None
+    return arr, tag or ""
+
+
+def split_result(result: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Separate top-level tensors from the other fields of a result.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: (tensors, remaining fields).
+    """
+    if is_tensor(result):
+        return {"result": result}, {}
+    if not isinstance(result, dict):
+        return {}, {"result": result}
+    tensors = {k: v for k, v in result.items() if is_tensor(v)}
+    return tensors, {k: v for k, v in result.items() if k not in tensors}
+
+
+def encode_raw(x: Any) -> Tuple[memoryview, Dict[str, str]]:
+    """
+    Encode one tensor as a raw little-endian buffer.
+
+    Returns:
+        Tuple[memoryview, Dict[str, str]]: (zero-copy view of the data, dtype/shape headers).
+    """
+    arr, tag = _numpy(x)
+    dtype = "bfloat16" if tag == "BF16" else arr.dtype.name
+    return memoryview(arr).cast("B"), {DTYPE_HEADER: dtype, SHAPE_HEADER: ",".join(map(str, arr.shape))}
+
+
+def encode_npy(x: Any) -> bytes:
+    """
+    Encode one tensor in `.npy` format (version 1.0).
+    """
+    arr, tag = _numpy(x)
+    if tag == "BF16":
+        raise TensorCodecError("bfloat16 cannot be stored in .npy; use safetensors")
+    header = repr({"descr": np.lib.format.dtype_to_descr(arr.dtype), "fortran_order": False, "shape": arr.shape})
+    # Pad so the data starts on a 64-byte boundary, as numpy does.
+    pad = -(10 + len(header) + 1) % 64
+    head = header.encode("latin1") + b" " * pad + b"\n"
+    return b"".join([_NPY_MAGIC, b"\x01\x00", struct.pack("<H", len(head)), head, memoryview(arr).cast("B")])
+
+
+def encode_safetensors(tensors: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Encode named tensors (plus JSON-encoded metadata) in safetensors format.
+    """
+    header: Dict[str, Any] = {}
+    chunks: List[memoryview] = []
+    offset = 0
+    for name, x in tensors.items():
+        arr, tag = _numpy(x)
+        if not tag:
+            raise TensorCodecError(f"dtype {arr.dtype} of {name!r} is not supported by safetensors")
+        data = memoryview(arr).cast("B")
+        header[name] = {"dtype": tag, "shape": list(arr.shape), "data_offsets": [offset, offset + len(data)]}
+        chunks.append(data)
+        offset += len(data)
+    if metadata:
+        header["__metadata__"] = {
+            k: v if isinstance(v, str) else json.dumps(v, default=str) for k, v in metadata.items()
+        }
+    blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    blob += b" " * (-len(blob) % 8)
+    return b"".join([struct.pack("<Q", len(blob)), blob, *chunks])
+
+
+def encode_result(mt: str, result: Any, field: Optional[str] = None) -> Tuple[Buffer, Dict[str, str]]:
+    """
+    Encode a plugin result for a negotiated binary media type.
+
+    safetensors carries every top-level tensor plus the other fields as
+    metadata. Raw and `.npy` carry a single tensor: `field`, or the only
+    tensor in the result.
+
+    Args:
+        mt (str): One of `MEDIA_TYPES`.
+        result (Any): Plugin result.
+        field (str | None): Tensor field to return for raw/.npy.
+
+    Returns:
+        Tuple[Buffer, Dict[str, str]]: (body, extra response headers).
+
+    Raises:
+        TensorCodecError: If the result cannot be represented in `mt`.
+    """
+    tensors, rest = split_result(result)
+    if mt == SAFETENSORS:
+        return encode_safetensors(tensors, rest), {}
+    if field is None:
+        if len(tensors) != 1:
+            raise TensorCodecError(f"Result has tensor fields {sorted(tensors)}; choose one with ?field=")
+        field = next(iter(tensors))
+    if field not in tensors:
+        raise TensorCodecError(f"Result has no tensor field {field!r}")
+    if mt == NPY:
+        return encode_npy(tensors[field]), {NAME_HEADER: field}
+    body, headers = encode_raw(tensors[field])
+    return body, {**headers, NAME_HEADER: field}
@@ -1,55 +1,151 @@
-from copy import deepcopy
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - numpy is optional
+    np = None
+
+try:
+    import torch
+except Exception:  # pragma: no cover - torch is optional
+    torch = None
 
 SCHEMA_VERSION = 1
 
+_Converter = Callable[[Any, bool], Any]
 
-def _jsonable(x: Any) -> Any:
-    """
-    Convert common data types (NumPy, Torch) to JSON-serializable formats.
 
-    Args:
-        x (Any): Input object to be converted.
+def _same(x: Any, keep_arrays: bool) -> Any:
+    return x
 
-    Returns:
-        Any: JSON-serializable version of the input.
-    """
+
+def _item(x: Any, keep_arrays: bool) -> Any:
+    return x.item()
+
+
+def _array(x: Any, keep_arrays: bool) -> Any:
+    if keep_arrays:
+        return x
     try:
-        import numpy as np
+        return x.tolist()
     except Exception:
-        np = None
+        return str(x)
+
 
+def _tensor(x: Any, keep_arrays: bool) -> Any:
+    if keep_arrays:
+        return x
     try:
-        import torch
+        return x.detach().cpu().tolist()
     except Exception:
-        torch = None
+        return str(x)
 
-    if x is None:
-        return None
-    if np is not None and isinstance(x, (np.generic,)):
-        return x.item()
-    if np is not None and hasattr(x, "dtype") and hasattr(x, "shape"):
-        try:
-            return x.tolist()
-        except Exception:
-            return str(x)
-    if torch is not None and hasattr(x, "detach") and hasattr(x, "cpu"):
-        try:
-            return x.detach().cpu().tolist()
-        except Exception:
-            return str(x)
-    if isinstance(x, dict):
-        return {k: _jsonable(v) for k, v in x.items()}
-    if isinstance(x, (list, tuple, set)):
-        return type(x)(_jsonable(v) for v in x)
-    if isinstance(x, (str, int, float, bool)):
-        return x
+
+def _dict(x: Dict[Any, Any], keep_arrays: bool) -> Any:
+    # Copy-on-write: a subtree that needs no conversion is returned as is.
+    out = None
+    for k, v in x.items():
+        c = _convert(v, keep_arrays)
+        if c is not v:
+            if out is None:
+                out = dict(x)
+            out[k] = c
+    return x if out is None else out
+
+
+def _list(x: Any, keep_arrays: bool) -> Any:
+    out = None
+    for i, v in enumerate(x):
+        c = _convert(v, keep_arrays)
+        if c is not v:
+            if out is None:
+                out = list(x)
+            out[i] = c
+    return x if out is None else out
+
+
+def _set(x: Any, keep_arrays: bool) -> Any:
+    return [_convert(v, keep_arrays) for v in x]
+
+
+def _str(x: Any, keep_arrays: bool) -> Any:
     try:
         return str(x)
     except Exception:
         return None
 
 
+# Exact type -> converter. Subclasses and array-likes are resolved once and cached.
+_DISPATCH: Dict[type, _Converter] = {
+    type(None): _same,
+    str: _same,
+    int: _same,
+    float: _same,
+    bool: _same,
+    dict: _dict,
+    list: _list,
+    tuple: _list,
+    set: _set,
+    frozenset: _set,
+}
+if np is not None:
+    _DISPATCH[np.ndarray] = _array
+if torch is not None:
+    _DISPATCH[torch.Tensor] = _tensor
+
+
+def _resolve(t: type) -> _Converter:
+    fn: Optional[_Converter] = None
+    if np is not None and issubclass(t, np.generic):
+        fn = _item  # before the MRO walk: np.float64 subclasses float
+    else:
+        fn = next((_DISPATCH[b] for b in t.__mro__[1:] if b in _DISPATCH), None)
+    if fn is None:
+        if hasattr(t, "detach") and hasattr(t, "cpu"):
+            fn = _tensor
+        elif hasattr(t, "dtype") and hasattr(t, "shape") and hasattr(t, "tolist"):
+            fn = _array
+        else:
+            fn = _str
+    _DISPATCH[t] = fn
+    return fn
+
+
+def _convert(x: Any, keep_arrays: bool) -> Any:
+    fn = _DISPATCH.get(type(x)) or _resolve(type(x))
+    return fn(x, keep_arrays)
+
+
+def to_jsonable(x: Any, keep_arrays: bool = False) -> Any:
+    """
+    Convert common data types (NumPy, Torch) to JSON-serializable formats in one pass.
+
+    Containers are only rebuilt along paths that contain something to convert;
+    anything already JSON-native is returned as is, without copying.
+
+    Args:
+        x (Any): Input object to be converted.
+        keep_arrays (bool): Leave ndarray/tensor leaves intact for an encoder that handles them.
+
+    Returns:
+        Any: JSON-serializable version of the input.
+    """
+    return _convert(x, keep_arrays)
+
+
+def _jsonable(x: Any) -> Any:
+    """
+    Convert common data types (NumPy, Torch) to JSON-serializable formats.
+
+    Args:
+        x (Any): Input object to be converted.
+
+    Returns:
+        Any: JSON-serializable version of the input.
+    """
+    return _convert(x, False)
+
+
 def is_already_unified(raw: Dict[str, Any]) -> bool:
     """
     Check if a response is already unified.
@@ -63,15 +159,26 @@ def is_already_unified(raw: Dict[str, Any]) -> bool:
     return isinstance(raw, dict) and raw.get("schema_version") is not None and raw.get("status") in ("ok", "error")
 
 
-def unify_response(provider: str, task: str, raw: Any, request_id: Optional[str] = None) -> Dict[str, Any]:
+def _with_request_id(out: Dict[str, Any], request_id: Optional[str]) -> None:
+    if request_id:
+        out["meta"] = {**(out.get("meta") or {}), "request_id": request_id}
+
+
+def unify_response(
+    provider: str, task: str, raw: Any, request_id: Optional[str] = None, keep_arrays: bool = False
+) -> Dict[str, Any]:
     """
     Standardize responses from different providers with optional metadata and JSON cleaning.
 
+    The input is never modified: the envelope is a new dict that shares
+    unchanged subtrees with `raw`.
+
     Args:
         provider (str): Name of the data provider.
         task (str): Task name associated with the response.
         raw (Any): Raw response data.
         request_id (Optional[str]): Optional request identifier.
+        keep_arrays (bool): Leave ndarray/tensor leaves intact for a binary or array-aware encoder.
 
     Returns:
         Dict[str, Any]: Unified and JSON-serializable response.
@@ -79,27 +186,19 @@ def unify_response(provider: str, task: str, raw: Any, request_id: Optional[str]
     if not isinstance(raw, dict):
         raw = {"result": raw}
 
-    if isinstance(raw, dict) and raw.get("status") in ("ok", "error") and raw.get("schema_version") is None:
-        out = deepcopy(raw)
-        out.setdefault("provider", provider)
-        out.setdefault("task", task)
-        out["schema_version"] = SCHEMA_VERSION
-        if request_id:
-            out.setdefault("meta", {})
-            out["meta"]["request_id"] = request_id
-        return _jsonable(out)
-
-    if is_already_unified(raw):
-        out = deepcopy(raw)
+    if raw.get("status") in ("ok", "error"):
+        out = dict(raw)
         out.setdefault("provider", provider)
         out.setdefault("task", task)
-        if request_id:
-            out.setdefault("meta", {})
-            out["meta"]["request_id"] = request_id
-        return _jsonable(out)
+        if out.get("schema_version") is None:
+            out["schema_version"] = SCHEMA_VERSION
+        _with_request_id(out, request_id)
+        return _convert(out, keep_arrays)
 
     meta_keys = ("device", "model", "backend", "params", "input", "usage", "input_chars", "truncated_to_1024_tokens")
-    meta = {k: raw.get(k) for k in meta_keys if k in raw}
+    meta = {k: raw[k] for k in meta_keys if k in raw}
+    if request_id:
+        meta["request_id"] = request_id
 
     if "error" in raw:
         err = raw["error"]
@@ -109,11 +208,11 @@ def unify_response(provider: str, task: str, raw: Any, request_id: Optional[str]
             "provider": provider,
             "task": task,
             "status": "error",
-            "error": _jsonable(err),
+            "error": _convert(err, keep_arrays),
             "schema_version": SCHEMA_VERSION,
         }
-        if request_id or meta:
-            out["meta"] = _jsonable({**meta, **({"request_id": request_id} if request_id else {})}) or None
+        if meta:
+            out["meta"] = _convert(meta, keep_arrays)
         return out
 
     out = {
@@ -121,9 +220,9 @@ def unify_response(provider: str, task: str, raw: Any, request_id: Optional[str]
         "task": task,
         "status": "ok",
         "elapsed_sec": raw.get("elapsed_sec"),
-        "data": _jsonable(raw),
+        "data": _convert(raw, keep_arrays),
         "schema_version": SCHEMA_VERSION,
     }
-    if request_id or meta:
-        out["meta"] = _jsonable({**meta, **({"request_id": request_id} if request_id else {})}) or None
+    if meta:
+        out["meta"] = _convert(meta, keep_arrays)
     return out
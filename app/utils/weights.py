@@ -0,0 +1,177 @@
+# app/utils/weights.py
+"""
+Memory-mapped, zero-copy weight loading from the local model cache.
+
+Tensors are views into a copy-on-write mapping of the checkpoint file, so
+pages come from the OS page cache: they are read only when touched and are
+shared by every worker (and every plugin) that maps the same file, instead
+of each process holding a private copy.
+
+Supported formats:
+    .safetensors: parsed here directly (no `safetensors` package needed).
+    .pt / .pth / .bin: `torch.load(..., mmap=True, weights_only=True)`; the
+        file must use the zipfile format (the default since torch 1.6).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap as _mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import torch
+import torch.nn as nn
+
+from app.core.config import get_settings
+
+PathLike = Union[str, os.PathLike]
+
+_DTYPES: Dict[str, torch.dtype] = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+    "F8_E4M3": torch.float8_e4m3fn,
+    "F8_E5M2": torch.float8_e5m2,
+}
+_NAMES = {v: k for k, v in _DTYPES.items()}
+
+_LEN = struct.Struct("<Q")
+
+
+def cache_dirs() -> List[Path]:
+    """
+    Directories searched for relative checkpoint paths, in order.
+    """
+    s = get_settings()
+    dirs = [s.MODEL_CACHE_ROOT, s.TORCH_HOME, s.HF_HOME]
+    return [Path(d) for d in dict.fromkeys(dirs) if d is not None]
+
+
+def find_weights(path: PathLike) -> Path:
+    """
+    Resolve a checkpoint path; relative paths are looked up in `cache_dirs()`.
+
+    Raises:
+        FileNotFoundError: If the file is not in any cache directory.
+    """
+    p = Path(path).expanduser()
+    if p.is_absolute():
+        if p.is_file():
+            return p
+    else:
+        for d in cache_dirs():
+            if (d / p).is_file():
+                return d / p
+    raise FileNotFoundError(f"Weights {str(path)!r} not found in {[str(d) for d in cache_dirs()]}")
+
+
+def _mmap_safetensors(path: Path) -> Dict[str, torch.Tensor]:
+    with open(path, "rb") as f:
+        (n,) = _LEN.unpack(f.read(8))
+        header = json.loads(f.read(n))
+        if os.fstat(f.fileno()).st_size == 8 + n:
+            buf = None  # no tensor data; mmap cannot map an empty range
+        else:
+            # ACCESS_COPY: a private copy-on-write mapping, so tensors are writable without
+            # touching the file, and pages stay shared until a process writes to them.
+            buf = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_COPY)
+    header.pop("__metadata__", None)
+
+    out: Dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        dtype = _DTYPES.get(info["dtype"])
+        if dtype is None:
+            raise ValueError(f"{path}: unsupported dtype {info['dtype']} for {name!r}")
+        start, end = info["data_offsets"]
+        if start == end:
+            out[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        flat = torch.frombuffer(buf, dtype=dtype, count=(end - start) // dtype.itemsize, offset=8 + n + start)
+        out[name] = flat.view(info["shape"])
+    return out
+
+
+def load_state_dict(path: PathLike, mmap: bool = True) -> Dict[str, torch.Tensor]:
+    """
+    Load a checkpoint as a CPU state dict, memory-mapped by default.
+
+    Args:
+        path (PathLike): Checkpoint file; relative paths are resolved with `find_weights`.
+        mmap (bool): Map the file instead of reading it into process memory.
+
+    Returns:
+        Dict[str, torch.Tensor]: Parameter name -> tensor.
+    """
+    p = find_weights(path)
+    if p.suffix == ".safetensors":
+        if mmap:
+            return _mmap_safetensors(p)
+        return {k: v.clone() for k, v in _mmap_safetensors(p).items()}
+    return torch.load(p, map_location="cpu", mmap=mmap, weights_only=True)
+
+
+def load_weights(model: nn.Module, path: PathLike, strict: bool = True, mmap: bool = True) -> nn.Module:
+    """
+    Load a checkpoint into `model` without copying the weights.
+
+    Parameters are replaced by the mapped tensors (`assign=True`), so build
+    the model on the meta device to skip allocating and initializing weights
+    that are about to be replaced:
+
+        with torch.device("meta"):
+            model = TinyNet()
+        load_weights(model, "tinynet/model.safetensors").eval()
+
+    Moving the model to another device or dtype afterwards copies it, as usual.
+
+    Args:
+        model (nn.Module): Model to fill.
+        path (PathLike): Checkpoint file (see `load_state_dict`).
+        strict (bool): Require the keys to match exactly.
+        mmap (bool): Map the file instead of reading it.
+
+    Returns:
+        nn.Module: `model`, for chaining.
+    """
+    model.load_state_dict(load_state_dict(path, mmap=mmap), strict=strict, assign=True)
+    return model
+
+
+def save_safetensors(
+    state_dict: Dict[str, torch.Tensor], path: PathLike, metadata: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Write a state dict in the safetensors format (tensors are saved contiguous, on CPU).
+    """
+    tensors = {k: v.detach().cpu().contiguous() for k, v in state_dict.items()}
+    header: Dict[str, Any] = {"__metadata__": metadata} if metadata else {}
+    offset = 0
+    for name, t in tensors.items():
+        if t.dtype not in _NAMES:
+            raise ValueError(f"unsupported dtype {t.dtype} for {name!r}")
+        size = t.numel() * t.element_size()
+        header[name] = {"dtype": _NAMES[t.dtype], "shape": list(t.shape), "data_offsets": [offset, offset + size]}
+        offset += size
+    raw = json.dumps(header, separators=(",", ":")).encode()
+    raw += b" " * (-len(raw) % 8)  # keep the data section 8-byte aligned
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_LEN.pack(len(raw)))
+        f.write(raw)
+        for t in tensors.values():
+            if t.numel():
+                f.write(t.reshape(-1).view(torch.uint8).numpy())
+    os.replace(tmp, path)
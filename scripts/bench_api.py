@@ -0,0 +1,214 @@
+# scripts/bench_api.py
+"""
+Load-test the HTTP API and save the results as JSON.
+
+Drives a fixed concurrency against each endpoint for a fixed time and reports
+throughput, p50/p95/p99 latency and error rate. Without BASE_URL the app is
+started in-process with uvicorn on a free local port (client and server then
+share the CPU; compare runs made the same way).
+
+Usage:
+    python -m scripts.bench_api --concurrency 16 --duration 10 --out bench.json
+    python -m scripts.bench_api --compare bench.json            # exit 1 on regression
+    BASE_URL=http://host:8000 python -m scripts.bench_api --endpoints health,ping
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+BASE_URL = os.getenv("BASE_URL")
+
+# name -> (method, path, json body)
+ENDPOINTS: Dict[str, Tuple[str, str, Optional[dict]]] = {
+    "health": ("GET", "/health", None),
+    "plugins": ("GET", "/plugins", None),
+    "ping": ("POST", "/plugins/dummy/ping", {}),
+}
+
+
+def _percentile(sorted_ms: List[float], q: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    k = max(0, min(len(sorted_ms) - 1, round(q / 100 * len(sorted_ms) + 0.5) - 1))
+    return round(sorted_ms[k], 3)
+
+
+async def _run_endpoint(client: httpx.AsyncClient, name: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    method, path, body = ENDPOINTS[name]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    async def worker(deadline: float) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body)
+                key = str(r.status_code)
+                if r.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(t0 + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "requests": n,
+        "errors": errors,
+        "error_rate": round(errors / n, 4) if n else None,
+        "rps": round(n / elapsed, 1),
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "mean": round(sum(latencies) / n, 3) if n else None,
+            "max": round(latencies[-1], 3) if n else None,
+        },
+        "status": statuses,
+    }
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            r = await client.get("/health")
+            if r.status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("server did not become ready")
+
+
+async def bench(base_url: str, names: List[str], concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        await _wait_ready(client)
+        results = {}
+        for name in names:
+            if warmup > 0:
+                await _run_endpoint(client, name, concurrency, warmup)
+            results[name] = await _run_endpoint(client, name, concurrency, duration)
+            print(
+                f"{name:>8}: {results[name]['rps']:>9} req/s  p99 {results[name]['latency_ms']['p99']} ms",
+                file=sys.stderr,
+            )
+        return results
+
+
+def _start_in_process() -> Tuple[str, Any]:
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config("app.main:app", host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("in-process server failed to start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", (server, thread)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    List regressions: throughput down or p99 latency up by more than `threshold` (fraction), or new errors.
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if base["rps"] and cur["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['rps']} -> {cur['rps']} req/s")
+        b99, c99 = base["latency_ms"]["p99"], cur["latency_ms"]["p99"]
+        if b99 and c99 and c99 > b99 * (1 + threshold):
+            regressions.append(f"{name}: p99 {b99} -> {c99} ms")
+        if (cur["error_rate"] or 0) > (base["error_rate"] or 0):
+            regressions.append(f"{name}: error rate {base['error_rate']} -> {cur['error_rate']}")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"comma-separated subset of {list(ENDPOINTS)}")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    ap.add_argument("--warmup", type=float, default=1.0, help="seconds per endpoint before measuring")
+    ap.add_argument("--out", help="write results to this JSON file")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run; exit 1 on regression")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression (default 10%%)")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.endpoints.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ENDPOINTS]
+    if unknown:
+        ap.error(f"unknown endpoints: {unknown}")
+
+    server = None
+    base_url = BASE_URL
+    if base_url is None:
+        base_url, server = _start_in_process()
+    try:
+        results = asyncio.run(bench(base_url, names, args.concurrency, args.duration, args.warmup))
+    finally:
+        if server is not None:
+            server[0].should_exit = True
+            server[1].join(timeout=30)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": BASE_URL or "in-process",
+        "concurrency": args.concurrency,
+        "duration_sec": args.duration,
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# scripts/bench_bulk.py
+"""
+Benchmark the bulk endpoint against one-request-per-item calls.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python scripts/bench_bulk.py --items 100000 --single 2000
+    BASE_URL=http://host:8000 python scripts/bench_bulk.py --plugin tinynet --task predict --payload '{"inputs": [[0.5, ...512 values]]}'
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:8000")
+
+
+async def _upload(writer: asyncio.StreamWriter, n: int, payload: dict) -> None:
+    # Chunked upload generated on the fly: the client never materializes all items either.
+    batch = []
+    for i in range(n):
+        batch.append(json.dumps({"i": i, **payload}) + "\n")
+        if len(batch) == 1000 or i == n - 1:
+            data = "".join(batch).encode()
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()
+            batch = []
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _download(reader: asyncio.StreamReader) -> tuple:
+    # Reads the chunked NDJSON response while the upload is still running.
+    await reader.readuntil(b"\r\n\r\n")
+    count, tail = 0, b""
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+        if size == 0:
+            break
+        data = (await reader.readexactly(size + 2))[:-2]
+        count += data.count(b"\n")
+        tail = (tail + data)[-65536:]
+    return count, tail.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+
+
+async def _bulk(plugin: str, task: str, n: int, payload: dict, batch_size: int) -> tuple:
+    url = urlsplit(BASE_URL)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+    head = (
+        f"POST /plugins/{plugin}/{task}/bulk?batch_size={batch_size} HTTP/1.1\r\n"
+        f"Host: {url.netloc}\r\nContent-Type: application/x-ndjson\r\n"
+        "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+    )
+    writer.write(head.encode())
+    up = asyncio.ensure_future(_upload(writer, n, payload))
+    count, last = await _download(reader)
+    await up
+    writer.close()
+    return count, last
+
+
+def bench_bulk(plugin: str, task: str, n: int, payload: dict, batch_size: int) -> dict:
+    t0 = time.perf_counter()
+    lines, last = asyncio.run(_bulk(plugin, task, n, payload, batch_size))
+    elapsed = time.perf_counter() - t0
+    summary = json.loads(last) if last.strip() else {}
+    return {
+        "mode": "bulk",
+        "items": summary.get("items", lines - 1),
+        "errors": summary.get("errors"),
+        "batch_size": batch_size,
+        "elapsed_sec": round(elapsed, 3),
+        "items_per_sec": round((lines - 1) / elapsed, 1),
+    }
+
+
+def bench_single(plugin: str, task: str, n: int, payload: dict) -> dict:
+    s = requests.Session()
+    t0 = time.perf_counter()
+    for i in range(n):
+        s.post(f"{BASE_URL}/plugins/{plugin}/{task}", json={"i": i, **payload}, timeout=30).raise_for_status()
+    elapsed = time.perf_counter() - t0
+    return {"mode": "single", "items": n, "elapsed_sec": round(elapsed, 3), "items_per_sec": round(n / elapsed, 1)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--plugin", default="dummy")
+    ap.add_argument("--task", default="ping")
+    ap.add_argument("--payload", default="{}", help="JSON object merged into every item")
+    ap.add_argument("--items", type=int, default=100_000)
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--single", type=int, default=0, help="also time N one-request-per-item calls")
+    args = ap.parse_args()
+
+    payload = json.loads(args.payload)
+    results = [bench_bulk(args.plugin, args.task, args.items, payload, args.batch_size)]
+    if args.single:
+        results.append(bench_single(args.plugin, args.task, args.single, payload))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# scripts/bench_json.py
+"""
+Measure per-response serialization CPU: FastAPI's default path vs FastJSONResponse.
+
+Usage:
+    python -m scripts.bench_json [--number 200]
+"""
+
+import argparse
+import datetime as dt
+import json
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.utils.unify import to_jsonable
+
+
+def cases() -> dict:
+    rng = np.random.default_rng(0)
+    logits = lambda n: rng.random((n, 10), dtype=np.float32)  # noqa: E731
+    return {
+        "dummy_ping": {"task": "ping", "message": "✅ Dummy service is working", "payload_received": {"task": "ping"}},
+        "tinynet_1": {"task": "predict", "labels": np.array([3]), "logits": logits(1), "device": "cpu"},
+        "tinynet_64": {"task": "predict", "labels": np.arange(64), "logits": logits(64), "device": "cpu"},
+        "nested_200": {
+            "items": [
+                {"id": i, "score": float(i) / 7, "box": [i, i, i + 1, i + 1], "at": dt.datetime(2025, 1, 1)}
+                for i in range(200)
+            ]
+        },
+        "embeddings_256x512": {"embeddings": rng.random((256, 512), dtype=np.float32)},
+    }
+
+
+def default_path(result):
+    # Before: convert arrays, then FastAPI re-encodes with jsonable_encoder and renders with json.dumps
+    return JSONResponse(jsonable_encoder({"plugin": "p", "result": to_jsonable(result)})).body
+
+
+def fast_path(result):
+    return FastJSONResponse({"plugin": "p", "result": result}).body
+
+
+def cpu_us(fn, arg, number: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.process_time()
+        for _ in range(number):
+            fn(arg)
+        best = min(best, (time.process_time() - t0) / number)
+    return round(best * 1e6, 1)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--number", type=int, default=200)
+    args = ap.parse_args()
+
+    orjson = responses.orjson
+    out = {"unit": "cpu us/response", "orjson": orjson.__version__ if orjson else None}
+    for name, result in cases().items():
+        n = args.number if "embeddings" not in name else max(1, args.number // 20)
+        row = {"default": cpu_us(default_path, result, n), "fast": cpu_us(fast_path, result, n)}
+        if orjson is not None:
+            responses.orjson = None
+            row["fast_stdlib"] = cpu_us(fast_path, result, n)
+            responses.orjson = orjson
+        row["saved"] = round(row["default"] - row["fast"], 1)
+        row["speedup"] = round(row["default"] / row["fast"], 1) if row["fast"] else None
+        out[name] = row
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# scripts/bench_middleware.py
+"""
+Requests/sec on /health with the previous BaseHTTPMiddleware RequestIDMiddleware
+versus the pure-ASGI RequestIDMiddleware + ServerTimingMiddleware.
+
+Requests are driven in-process straight through the ASGI interface (no
+sockets, no HTTP client), so the numbers isolate the framework and
+middleware cost per request.
+
+Usage:
+    python -m scripts.bench_middleware [--requests 5000] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import RequestIDMiddleware, ServerTimingMiddleware
+from app.main import health
+
+
+# Previous implementation, kept verbatim for comparison.
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+        request.state.request_id = rid
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = rid
+        return response
+
+
+def build(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+    for m in middleware:
+        app.add_middleware(m)
+    app.get("/health")(health)
+    return app
+
+
+async def drive(app, n: int, concurrency: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"accept", b"application/json")],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def one():
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                assert message["status"] == 200, message
+
+        await app(dict(scope), receive, send)
+
+    async def worker(k: int):
+        for _ in range(k):
+            await one()
+
+    for _ in range(200):  # warm-up
+        await one()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(n // concurrency) for _ in range(concurrency)))
+    return (n // concurrency * concurrency) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    variants = {
+        "none": [],
+        "legacy_basehttp": [LegacyRequestIDMiddleware],
+        "pure_asgi": [ServerTimingMiddleware, RequestIDMiddleware],
+    }
+    out = {}
+    for name, mw in variants.items():
+        app = build(mw)
+        best = max(asyncio.run(drive(app, args.requests, args.concurrency)) for _ in range(args.rounds))
+        out[name] = round(best, 1)
+    print(json.dumps({"requests": args.requests, "concurrency": args.concurrency, "req_per_sec": out}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
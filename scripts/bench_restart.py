@@ -0,0 +1,92 @@
+# scripts/bench_restart.py
+"""
+Time-to-ready of a server restart with and without the plugins' warm-state snapshot.
+
+Starts `uvicorn app.main:app` with only `--plugin` in the warm set and polls
+/health until it reports ready. The first start fills the snapshot
+(`MODEL_CACHE_ROOT/warm_state`, see app/plugins/warm_state.py); then
+restarts alternate between (warm state is opt-in, so it is enabled here)
+
+    cold:      APP_WARM_STATE_ENABLED=false, plugin.load() runs as before
+    snapshot:  the plugin is restored from the snapshot
+
+Reported per mode (median over --runs): total time from process start to
+ready (interpreter, imports, load) and the plugin's own load time as shown by
+/health. A temporary model cache root is used, so nothing existing is touched.
+
+Usage:
+    python -m scripts.bench_restart [--plugin tinynet] [--optimize quantize_dynamic,torchscript] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(plugin: str, env: dict, timeout: float = 300.0) -> dict:
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                r = requests.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                state = r.json()["plugins"].get(plugin, {})
+                if r.status_code == 200 and state.get("state") == "ready":
+                    return {"ready_s": time.perf_counter() - t0, "load_s": state["load_sec"]}
+                if state.get("state") == "failed":
+                    raise RuntimeError(f"plugin {plugin} failed to load: {state}")
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"server not ready within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--plugin", default="tinynet")
+    ap.add_argument("--optimize", default="", help="comma-separated APP_MODEL_OPTIMIZE passes (default: none)")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        env = {
+            **os.environ,
+            "APP_MODEL_CACHE_ROOT": root,
+            "APP_WARM_STATE_ENABLED": "true",
+            "APP_PLUGINS_WARM": json.dumps([args.plugin]),
+            "APP_MODEL_OPTIMIZE": json.dumps([p for p in args.optimize.split(",") if p]),
+        }
+        first = start(args.plugin, env)  # writes the snapshot
+        runs = {"cold": [], "snapshot": []}
+        for _ in range(args.runs):
+            runs["cold"].append(start(args.plugin, {**env, "APP_WARM_STATE_ENABLED": "false"}))
+            runs["snapshot"].append(start(args.plugin, env))
+
+    results = {"plugin": args.plugin, "optimize": args.optimize or None, "runs": args.runs}
+    results["first_start"] = {k: round(v, 3) for k, v in first.items()}
+    for mode, rows in runs.items():
+        results[mode] = {k: round(statistics.median(r[k] for r in rows), 3) for k in ("ready_s", "load_s")}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
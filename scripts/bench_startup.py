@@ -0,0 +1,89 @@
+# scripts/bench_startup.py
+"""
+Time to first inference with startup warm-up versus lazy loading.
+
+Starts `uvicorn app.main:app` and measures, per mode (median over --runs):
+
+    ready_s:          process start until /health answers 200
+    first_request_ms: latency of the first request to --plugin (includes load() when lazy)
+    first_result_s:   process start until that first result arrives
+
+Modes:
+    lazy:  APP_PLUGINS_WARM=[]; the first request loads the plugin
+    warm:  APP_PLUGINS_WARM=["<plugin>"]; loaded in the background at startup
+
+Warm state snapshots are disabled so both modes run the plugin's `load()`.
+
+Usage:
+    python -m scripts.bench_startup [--plugin tinynet] [--task predict] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(env: dict, url: str, payload: dict, timeout: float = 300.0) -> dict:
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                if requests.get(f"{base}/health", timeout=1).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.02)
+        else:
+            raise TimeoutError(f"server not ready within {timeout}s")
+        ready = time.perf_counter() - t0
+        sent = time.perf_counter()
+        r = requests.post(base + url, json=payload, timeout=timeout)
+        r.raise_for_status()
+        done = time.perf_counter()
+        return {"ready_s": ready, "first_request_ms": (done - sent) * 1000, "first_result_s": done - t0}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--plugin", default="tinynet")
+    ap.add_argument("--task", default="predict")
+    ap.add_argument("--payload", default=json.dumps({"inputs": [0.5] * 512}), help="JSON request body")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    url, payload = f"/plugins/{args.plugin}/{args.task}", json.loads(args.payload)
+    env = {**os.environ, "APP_WARM_STATE_ENABLED": "false"}
+    modes = {"lazy": [], "warm": [args.plugin]}
+    runs = {mode: [] for mode in modes}
+    for _ in range(args.runs):
+        for mode, warm in modes.items():
+            runs[mode].append(start({**env, "APP_PLUGINS_WARM": json.dumps(warm)}, url, payload))
+
+    results = {"plugin": args.plugin, "runs": args.runs}
+    for mode, rows in runs.items():
+        results[mode] = {k: round(statistics.median(r[k] for r in rows), 3) for k in rows[0]}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# scripts/bench_tensors.py
+"""
+Compare JSON and binary tensor payloads on tinynet/predict.
+
+Usage:
+    uvicorn app.main:app --port 8000 &
+    python scripts/bench_tensors.py --rows 1024 --repeat 20
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+import requests
+
+BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:8000")
+URL = f"{BASE_URL}/plugins/tinynet/predict"
+
+
+def _time(fn, repeat: int) -> dict:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"p50_ms": round(statistics.median(samples), 2), "min_ms": round(min(samples), 2)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=1024)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    s = requests.Session()
+    # Distinct inputs per run so the result cache is never hit
+    rng = np.random.default_rng(0)
+    x = lambda: rng.random((args.rows, 512), dtype=np.float32)  # noqa: E731
+
+    def as_json():
+        r = s.post(URL, data=json.dumps({"inputs": x().tolist()}), headers={"Content-Type": "application/json"})
+        r.raise_for_status()
+        np.asarray(r.json()["result"]["logits"], dtype=np.float32)
+
+    def as_raw():
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "X-Tensor-Dtype": "float32",
+            "X-Tensor-Shape": f"{args.rows},512",
+            "Accept": "application/octet-stream",
+        }
+        r = s.post(URL, params={"field": "logits"}, data=x().tobytes(), headers=headers)
+        r.raise_for_status()
+        np.frombuffer(r.content, dtype=np.float32)
+
+    def as_npy():
+        f = io.BytesIO()
+        np.save(f, x())
+        r = s.post(
+            URL,
+            params={"field": "logits"},
+            data=f.getvalue(),
+            headers={"Content-Type": "application/x-npy", "Accept": "application/x-npy"},
+        )
+        r.raise_for_status()
+        np.load(io.BytesIO(r.content))
+
+    results = {"rows": args.rows, "request_bytes_f32": args.rows * 512 * 4}
+    for name, fn in (("json", as_json), ("raw", as_raw), ("npy", as_npy)):
+        results[name] = _time(fn, args.repeat)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
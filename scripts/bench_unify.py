@@ -0,0 +1,209 @@
+# scripts/bench_unify.py
+"""
+Microbenchmark unify_response against the previous implementation.
+
+Usage:
+    python -m scripts.bench_unify [--number 200]
+"""
+
+import argparse
+import json
+import timeit
+from copy import deepcopy
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+
+from app.utils.unify import unify_response
+
+# ----------------------------------------------------------------------------
+# Previous implementation (deepcopy + recursive _jsonable with per-call imports),
+# kept verbatim for comparison.
+# ----------------------------------------------------------------------------
+LEGACY_SCHEMA_VERSION = 1
+
+
+def _legacy_jsonable(x: Any) -> Any:
+    """
+    Convert common data types (NumPy, Torch) to JSON-serializable formats.
+
+    Args:
+        x (Any): Input object to be converted.
+
+    Returns:
+        Any: JSON-serializable version of the input.
+    """
+    try:
+        import numpy as np
+    except Exception:
+        np = None
+
+    try:
+        import torch
+    except Exception:
+        torch = None
+
+    if x is None:
+        return None
+    if np is not None and isinstance(x, (np.generic,)):
+        return x.item()
+    if np is not None and hasattr(x, "dtype") and hasattr(x, "shape"):
+        try:
+            return x.tolist()
+        except Exception:
+            return str(x)
+    if torch is not None and hasattr(x, "detach") and hasattr(x, "cpu"):
+        try:
+            return x.detach().cpu().tolist()
+        except Exception:
+            return str(x)
+    if isinstance(x, dict):
+        return {k: _legacy_jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple, set)):
+        return type(x)(_legacy_jsonable(v) for v in x)
+    if isinstance(x, (str, int, float, bool)):
+        return x
+    try:
+        return str(x)
+    except Exception:
+        return None
+
+
+def _legacy_is_already_unified(raw: Dict[str, Any]) -> bool:
+    """
+    Check if a response is already unified.
+
+    Args:
+        raw (Dict[str, Any]): Input dictionary to check.
+
+    Returns:
+        bool: True if response is already unified, else False.
+    """
+    return isinstance(raw, dict) and raw.get("schema_version") is not None and raw.get("status") in ("ok", "error")
+
+
+def legacy_unify_response(provider: str, task: str, raw: Any, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Standardize responses from different providers with optional metadata and JSON cleaning.
+
+    Args:
+        provider (str): Name of the data provider.
+        task (str): Task name associated with the response.
+        raw (Any): Raw response data.
+        request_id (Optional[str]): Optional request identifier.
+
+    Returns:
+        Dict[str, Any]: Unified and JSON-serializable response.
+    """
+    if not isinstance(raw, dict):
+        raw = {"result": raw}
+
+    if isinstance(raw, dict) and raw.get("status") in ("ok", "error") and raw.get("schema_version") is None:
+        out = deepcopy(raw)
+        out.setdefault("provider", provider)
+        out.setdefault("task", task)
+        out["schema_version"] = LEGACY_SCHEMA_VERSION
+        if request_id:
+            out.setdefault("meta", {})
+            out["meta"]["request_id"] = request_id
+        return _legacy_jsonable(out)
+
+    if _legacy_is_already_unified(raw):
+        out = deepcopy(raw)
+        out.setdefault("provider", provider)
+        out.setdefault("task", task)
+        if request_id:
+            out.setdefault("meta", {})
+            out["meta"]["request_id"] = request_id
+        return _legacy_jsonable(out)
+
+    meta_keys = ("device", "model", "backend", "params", "input", "usage", "input_chars", "truncated_to_1024_tokens")
+    meta = {k: raw.get(k) for k in meta_keys if k in raw}
+
+    if "error" in raw:
+        err = raw["error"]
+        if not isinstance(err, dict):
+            err = {"type": "Error", "message": str(err)}
+        out = {
+            "provider": provider,
+            "task": task,
+            "status": "error",
+            "error": _legacy_jsonable(err),
+            "schema_version": LEGACY_SCHEMA_VERSION,
+        }
+        if request_id or meta:
+            out["meta"] = _legacy_jsonable({**meta, **({"request_id": request_id} if request_id else {})}) or None
+        return out
+
+    out = {
+        "provider": provider,
+        "task": task,
+        "status": "ok",
+        "elapsed_sec": raw.get("elapsed_sec"),
+        "data": _legacy_jsonable(raw),
+        "schema_version": LEGACY_SCHEMA_VERSION,
+    }
+    if request_id or meta:
+        out["meta"] = _legacy_jsonable({**meta, **({"request_id": request_id} if request_id else {})}) or None
+    return out
+
+
+# ----------------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------------
+def small():
+    return {"label": "cat", "score": 0.93, "device": "cpu"}
+
+
+def nested():
+    return {
+        "items": [
+            {
+                "id": i,
+                "label": f"c{i}",
+                "score": np.float32(i / 100),
+                "box": [i, i + 1, i + 2, i + 3],
+                "tags": ["a", "b"],
+            }
+            for i in range(200)
+        ],
+        "model": "demo",
+        "usage": {"tokens": 1234},
+    }
+
+
+def tensor_heavy():
+    return {
+        "embeddings": np.random.rand(256, 512).astype(np.float32),
+        "logits": torch.rand(256, 10),
+        "labels": np.arange(256),
+        "device": "cpu",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--number", type=int, default=200)
+    args = ap.parse_args()
+
+    results = {}
+    for case in (small, nested, tensor_heavy):
+        raw = case()
+        n = args.number if case is not tensor_heavy else max(1, args.number // 20)
+        row = {}
+        for label, fn in (
+            ("legacy", lambda: legacy_unify_response("p", "t", raw, "rid")),
+            ("new", lambda: unify_response("p", "t", raw, "rid")),
+            ("new_keep_arrays", lambda: unify_response("p", "t", raw, "rid", keep_arrays=True)),
+        ):
+            best = min(timeit.repeat(fn, number=n, repeat=5)) / n
+            row[label] = round(best * 1e6, 2)  # microseconds per call
+        row["speedup"] = round(row["legacy"] / row["new"], 1)
+        row["speedup_keep_arrays"] = round(row["legacy"] / row["new_keep_arrays"], 1)
+        results[case.__name__] = row
+    print(json.dumps({"unit": "us/call", **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
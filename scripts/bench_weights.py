@@ -0,0 +1,118 @@
+# scripts/bench_weights.py
+"""
+Cold-load time and per-worker memory of eager versus memory-mapped weight loading.
+
+Writes one checkpoint as .pt and .safetensors, then for each mode starts
+`--workers` processes that load it at the same time, run one forward pass
+(touching every weight), and report load time, time to the first result
+(load + forward, which includes the page faults of mapped files) and memory
+while all of them are alive. The file is evicted from the page cache (posix_fadvise) before
+each mode, so the first worker's load is cold.
+
+    eager:        torch.load() into process memory (the current approach)
+    torch-mmap:   torch.load(..., mmap=True)
+    safetensors:  app.utils.weights (mmap of a .safetensors file)
+
+RSS counts shared file pages in every process that maps them; PSS splits
+them between the processes, so sum(PSS) is the real footprint.
+
+Usage:
+    python -m scripts.bench_weights [--workers 2] [--width 4096] [--layers 4]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+import torch
+import torch.nn as nn
+
+from app.utils.weights import load_weights, save_safetensors
+
+MB = 1024 * 1024
+
+
+def build(width: int, layers: int) -> nn.Module:
+    return nn.Sequential(*[nn.Linear(width, width) for _ in range(layers)])
+
+
+def _evict(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _worker(mode: str, path: str, width: int, layers: int, barrier, out) -> None:
+    torch.set_num_threads(1)
+    with torch.device("meta"):
+        model = build(width, layers)
+    t0 = time.perf_counter()
+    if mode == "eager":
+        model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True), assign=True)
+    else:
+        load_weights(model, path)
+    load_s = time.perf_counter() - t0
+    with torch.inference_mode():
+        model(torch.randn(1, width))
+    ready_s = time.perf_counter() - t0
+    barrier.wait()  # every worker holds its model now
+    mem = psutil.Process().memory_full_info()
+    out.put(
+        {"load_s": load_s, "ready_s": ready_s, "rss_mb": mem.rss / MB, "pss_mb": mem.pss / MB, "uss_mb": mem.uss / MB}
+    )
+    barrier.wait()
+
+
+def run(mode: str, path: Path, workers: int, width: int, layers: int) -> dict:
+    _evict(path)
+    ctx = mp.get_context("spawn")
+    barrier, out = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, str(path), width, layers, barrier, out)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [out.get(timeout=600) for _ in procs]
+    for p in procs:
+        p.join()
+    return {
+        "load_s": [round(r["load_s"], 3) for r in sorted(rows, key=lambda r: r["load_s"])],
+        "ready_s": [round(r["ready_s"], 3) for r in sorted(rows, key=lambda r: r["ready_s"])],
+        "rss_mb_per_worker": round(sum(r["rss_mb"] for r in rows) / workers, 1),
+        "pss_mb_total": round(sum(r["pss_mb"] for r in rows), 1),
+        "uss_mb_per_worker": round(sum(r["uss_mb"] for r in rows) / workers, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--width", type=int, default=4096)
+    ap.add_argument("--layers", type=int, default=4)
+    ap.add_argument("--dir", help="where to write the checkpoints (default: a temp dir)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        sd = build(args.width, args.layers).state_dict()
+        pt, st = Path(tmp) / "model.pt", Path(tmp) / "model.safetensors"
+        torch.save(sd, pt)
+        save_safetensors(sd, st)
+        del sd
+
+        results = {
+            "checkpoint_mb": round(st.stat().st_size / MB, 1),
+            "workers": args.workers,
+            "eager": run("eager", pt, args.workers, args.width, args.layers),
+            "torch-mmap": run("torch-mmap", pt, args.workers, args.width, args.layers),
+            "safetensors": run("safetensors", st, args.workers, args.width, args.layers),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
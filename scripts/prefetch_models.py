@@ -1,106 +1,110 @@
-import os
-
-import torch
-from dotenv import load_dotenv
-
-
-def info(title):
-    """Print a formatted title with separators for clarity."""
-    print("\n" + "=" * 80)
-    print(title)
-    print("=" * 80)
-
-
-# Load environment variables from .env
-load_dotenv()
-
-
-# ----- Transformers / HF -----
-def prefetch_bart():
-    """Prefetch BART model and tokenizer, then perform a dummy generation."""
-    from transformers import AutoTokenizer, BartForConditionalGeneration
-
-    name = "facebook/bart-large-cnn"
-    info(f"Prefetch BART: {name}")
-    tok = AutoTokenizer.from_pretrained(name)
-    model = BartForConditionalGeneration.from_pretrained(name, low_cpu_mem_usage=True, dtype=torch.float32)
-    x = tok("hello world", return_tensors="pt", truncation=True, max_length=32)
-    _ = model.generate(**x, max_new_tokens=8)
-
-
-def prefetch_distilbert():
-    """Prefetch DistilBERT model and tokenizer, then perform a dummy forward pass."""
-    from transformers import AutoModelForSequenceClassification, AutoTokenizer
-
-    name = "distilbert-base-uncased-finetuned-sst-2-english"
-    info(f"Prefetch DistilBERT: {name}")
-    tok = AutoTokenizer.from_pretrained(name)
-    model = AutoModelForSequenceClassification.from_pretrained(name, low_cpu_mem_usage=True, dtype=torch.float32)
-    x = tok("a simple test", return_tensors="pt", truncation=True, max_length=32)
-    _ = model(**x)
-
-
-def prefetch_mt5():
-    """Prefetch mT5 model and tokenizer, then perform a dummy generation."""
-    from transformers import AutoTokenizer, MT5ForConditionalGeneration
-
-    name = "google/mt5-small"
-    info(f"Prefetch mT5: {name}")
-    tok = AutoTokenizer.from_pretrained(name, use_fast=False)
-    model = MT5ForConditionalGeneration.from_pretrained(name, low_cpu_mem_usage=True, dtype=torch.float32)
-    x = tok(
-        "translate arabic to english: مرحبا",
-        return_tensors="pt",
-        truncation=True,
-        max_length=64,
-    )
-    _ = model.generate(**x, max_new_tokens=8)
-
-
-def prefetch_tinyllama():
-    """Prefetch TinyLlama model and tokenizer, then perform a dummy generation."""
-    from transformers import AutoModelForCausalLM, AutoTokenizer
-
-    name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-    info(f"Prefetch TinyLlama: {name}")
-    tok = AutoTokenizer.from_pretrained(name)
-    model = AutoModelForCausalLM.from_pretrained(name, low_cpu_mem_usage=True, dtype=torch.float32)
-    x = tok("Hello", return_tensors="pt")
-    _ = model.generate(**x, max_new_tokens=4)
-
-
-def prefetch_whisper():
-    """Prefetch Whisper processor and model, then perform a dummy generation with silent audio."""
-    import numpy as np
-    from transformers import AutoProcessor, WhisperForConditionalGeneration
-
-    name = "openai/whisper-small"
-    info(f"Prefetch Whisper: {name}")
-    proc = AutoProcessor.from_pretrained(name)
-    model = WhisperForConditionalGeneration.from_pretrained(name, low_cpu_mem_usage=True, dtype=torch.float32)
-    dummy = np.zeros(16000, dtype="float32")
-    x = proc(audio=dummy, sampling_rate=16000, return_tensors="pt")
-    _ = model.generate(**x, max_new_tokens=1)
-
-
-# ----- Torch hub / torchvision -----
-def prefetch_resnet18():
-    """Prefetch torchvision ResNet-18 weights."""
-    info("Prefetch torchvision resnet18 weights")
-    from torchvision.models import ResNet18_Weights, resnet18
-
-    _ = resnet18(weights=ResNet18_Weights.IMAGENET1K_V1)
+# scripts/prefetch_models.py
+"""
+Download the models that plugins declare in their manifests into the local caches.
+
+Models are listed under "models" in each plugin's manifest.json (see
+app/utils/prefetch.py), plus the stock set in DEFAULT_MODELS (BART,
+DistilBERT, mT5, TinyLlama, Whisper and ResNet-18) unless --no-defaults is
+given. Files are fetched in parallel, partial downloads are resumed, and
+models already in the cache index are skipped. With a cache budget
+configured, least-recently-used models are evicted afterwards. Loading the
+plugins (to fill tokenizer/compiled caches) is a separate step, enabled with
+--warm.
+
+Usage:
+    python -m scripts.prefetch_models                               # defaults + every plugin's models
+    python -m scripts.prefetch_models --plugins summarizer --no-defaults --warm
+    python -m scripts.prefetch_models --models google/mt5-small,openai/whisper-small
+    python -m scripts.prefetch_models --models torch/resnet50-11ad3fa6.pth=https://download.pytorch.org/models/resnet50-11ad3fa6.pth
+    HF_HUB_OFFLINE=1 python -m scripts.prefetch_models --mirror /mnt/models   # no network
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.plugins import loader
+from app.utils.cache_budget import get_cache_budget
+from app.utils.prefetch import default_prefetcher, model_specs
+
+_HF_FILES = ["*.json", "*.txt", "*.model"]  # configs and tokenizers
+
+# Fetched by default, alongside the models plugin manifests declare
+DEFAULT_MODELS = [
+    {"id": "facebook/bart-large-cnn", "files": _HF_FILES + ["model.safetensors"]},
+    {"id": "distilbert-base-uncased-finetuned-sst-2-english", "files": _HF_FILES + ["model.safetensors"]},
+    {"id": "google/mt5-small", "files": _HF_FILES + ["pytorch_model.bin"]},
+    {"id": "TinyLlama/TinyLlama-1.1B-Chat-v1.0", "files": _HF_FILES + ["model.safetensors"]},
+    {"id": "openai/whisper-small", "files": _HF_FILES + ["model.safetensors"]},
+    {"id": "torch/resnet18-f37072fd.pth", "url": "https://download.pytorch.org/models/resnet18-f37072fd.pth"},
+]
+
+
+def warm(names) -> int:
+    """Load each plugin once so its own caches are filled; returns the number of failures."""
+    failed = 0
+    for name in names:
+        t0 = time.perf_counter()
+        try:
+            loader.acquire(name)
+            loader.release(name)
+            print(f"warm {name}: {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+        except Exception as e:
+            failed += 1
+            print(f"warm {name}: FAILED {type(e).__name__}: {e}", file=sys.stderr)
+    return failed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--plugins", help="comma-separated plugins whose manifests to read (default: all)")
+    ap.add_argument("--models", help="comma-separated extra models (id, id@revision or id=url)")
+    ap.add_argument("--no-defaults", action="store_true", help="skip DEFAULT_MODELS")
+    ap.add_argument("--mirror", type=Path, help="local mirror directory tried before the network")
+    ap.add_argument("--workers", type=int, help="files downloaded in parallel (default APP_PREFETCH_WORKERS)")
+    ap.add_argument("--refresh", action="store_true", help="re-resolve models that are already cached")
+    ap.add_argument("--warm", action="store_true", help="load the plugins after downloading")
+    ap.add_argument("--dry-run", action="store_true", help="only list the models that would be fetched")
+    args = ap.parse_args()
+
+    s = get_settings()
+    s.ensure_directories()
+    s.export_env_for_caches()
+
+    _, meta = loader.discover()
+    names = [n.strip() for n in args.plugins.split(",")] if args.plugins else list(meta)
+    unknown = [n for n in names if n not in meta]
+    if unknown:
+        ap.error(f"unknown plugins: {unknown}")
+    extra = {"models": [m.strip() for m in (args.models or "").split(",") if m.strip()]}
+    defaults = {"models": [] if args.no_defaults else DEFAULT_MODELS}
+    specs = model_specs([defaults] + [meta[n] for n in names] + [extra])
+
+    if args.dry_run or not specs:
+        print(json.dumps(specs, indent=2))
+        if not specs:
+            print('No models to fetch (add "models" to a manifest or pass --models).', file=sys.stderr)
+        return 0
+
+    t0 = time.perf_counter()
+    results = default_prefetcher(args.mirror, args.workers).run(specs, refresh=args.refresh)
+    print(json.dumps(results, indent=2))
+    failed = sum(r["status"] == "failed" for r in results.values())
+    print(f"{len(results)} models, {failed} failed, {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    budget = get_cache_budget()
+    if budget.budget_bytes is not None or budget.min_free_bytes is not None:
+        evicted = budget.enforce()["evicted"]  # the models just fetched are the most recently used
+        print(f"evicted to fit the cache budget: {evicted}", file=sys.stderr)
+
+    if args.warm:
+        failed += warm([n for n in names if meta[n].get("models")])
+    loader.shutdown()
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    print("HF_HOME =", os.getenv("HF_HOME"))
-    print("TORCH_HOME =", os.getenv("TORCH_HOME"))
-
-    prefetch_bart()
-    prefetch_distilbert()
-    prefetch_mt5()
-    prefetch_tinyllama()
-    prefetch_whisper()
-    prefetch_resnet18()
-
-    print("\nDone — all models have been downloaded to the unified directories.")
+    sys.exit(main())
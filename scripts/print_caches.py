@@ -1,25 +1,24 @@
-import os
+# scripts/print_caches.py
+"""
+Show the models in the local model cache from its index (`MODEL_CACHE_ROOT/index.json`).
+
+Reading the index does not walk the cache directories; `--scan` refreshes it
+first (incrementally: only new or changed files are hashed).
+
+Usage:
+    python -m scripts.print_caches                 # list indexed models
+    python -m scripts.print_caches --scan          # refresh the index, then list
+    python -m scripts.print_caches --verify [--deep]
+    python -m scripts.print_caches --json
+"""
+
+import argparse
+import json
 import sys
-from pathlib import Path
+import time
 
-from dotenv import load_dotenv
-
-
-def get_size(path: Path) -> int:
-    """
-    Calculate the total size (in bytes) of a directory or file.
-
-    Args:
-        path (Path): The file or directory path to calculate size for.
-
-    Returns:
-        int: Total size in bytes. Returns 0 if the path does not exist.
-    """
-    if not path.exists():
-        return 0
-    if path.is_file():
-        return path.stat().st_size
-    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+from app.core.config import get_settings
+from app.utils.model_cache import get_model_cache_index
 
 
 def human_readable(size: int) -> str:
@@ -39,37 +38,45 @@ def human_readable(size: int) -> str:
     return f"{size:.1f}PB"
 
 
-def print_cache_info(name: str, path: Path):
-    """
-    Print cache information for a given directory path.
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scan", action="store_true", help="refresh the index from the cache directories first")
+    ap.add_argument("--verify", action="store_true", help="check every indexed file exists with its recorded size")
+    ap.add_argument("--deep", action="store_true", help="with --verify, also re-hash every file")
+    ap.add_argument("--json", action="store_true", help="print the index entries as JSON")
+    args = ap.parse_args()
+
+    s = get_settings()
+    index = get_model_cache_index()
+    if args.scan:
+        t0 = time.perf_counter()
+        stats = index.scan()
+        print(f"scanned in {time.perf_counter() - t0:.2f}s: {stats}", file=sys.stderr)
+
+    entries = sorted(index.entries(), key=lambda e: (e["source"], e["id"], e["revision"]))
+    if args.json:
+        print(json.dumps(entries, indent=2))
+        return 0
 
-    Args:
-        name (str): The label/name of the cache.
-        path (Path): The directory path of the cache.
-    """
     print("=" * 80)
-    print(f"{name} cache: {path}")
-    if not path.exists():
-        print("Warning: This path does not exist.")
-        return
-
-    size = get_size(path)
-    print(f"Total size: {human_readable(size)}")
-    print("Subdirectories:")
-    for p in sorted([p for p in path.iterdir() if p.is_dir()]):
-        print(f"  - {p.name}")
-
-
-def main():
-    """
-    Load environment variables and print cache information for HuggingFace and Torch.
-    """
-    load_dotenv()
-    hf_home = Path(os.getenv("HF_HOME", "~/.cache/huggingface")).expanduser()
-    torch_home = Path(os.getenv("TORCH_HOME", "~/.cache/torch")).expanduser()
-
-    print_cache_info("HuggingFace (HF_HOME)", hf_home)
-    print_cache_info("Torch (TORCH_HOME)", torch_home)
+    print(f"Model cache: {s.MODEL_CACHE_ROOT}  (index: {index.path})")
+    print(f"HF hub: {s.TRANSFORMERS_CACHE}  |  Torch: {s.TORCH_HOME}")
+    print("=" * 80)
+    if not entries:
+        print("No indexed models (run with --scan to index the cache).")
+    failed = 0
+    for e in entries:
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_access"]))
+        print(f"{e['source']:<6} {e['id']:<48} {e['revision'][:12]:<12} {human_readable(e['size']):>9}  used {used}")
+        if args.verify:
+            problems = index.verify(e["id"], e["revision"], deep=args.deep)
+            failed += bool(problems)
+            for p in problems:
+                print(f"       ! {p}")
+    total = sum(e["size"] for e in entries)
+    print("-" * 80)
+    print(f"{len(entries)} models, {human_readable(total)}")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+# scripts/prune_caches.py
+"""
+Evict least-recently-used models from the model cache until it fits a disk budget.
+
+Limits default to APP_MODEL_CACHE_BUDGET_GB / APP_MODEL_CACHE_MIN_FREE_GB.
+Models pinned by a running server (loaded plugins) are never evicted. Run it
+before a deploy (e.g. ahead of scripts.prefetch_models) so the node does not
+run out of disk.
+
+Usage:
+    python -m scripts.prune_caches --budget-gb 40 --dry-run
+    python -m scripts.prune_caches --min-free-gb 10 [--scan]
+"""
+
+import argparse
+import json
+import sys
+
+from app.utils.cache_budget import GB, get_cache_budget
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-gb", type=float, help="maximum total size of cached models")
+    ap.add_argument("--min-free-gb", type=float, help="minimum free space to leave on the cache disk")
+    ap.add_argument("--scan", action="store_true", help="refresh the cache index first")
+    ap.add_argument("--dry-run", action="store_true", help="only list what would be evicted")
+    args = ap.parse_args()
+
+    budget = get_cache_budget()
+    if args.budget_gb is not None:
+        budget.budget_bytes = int(args.budget_gb * GB)
+    if args.min_free_gb is not None:
+        budget.min_free_bytes = int(args.min_free_gb * GB)
+    if budget.budget_bytes is None and budget.min_free_bytes is None:
+        ap.error(
+            "no limit: pass --budget-gb/--min-free-gb or set APP_MODEL_CACHE_BUDGET_GB/APP_MODEL_CACHE_MIN_FREE_GB"
+        )
+    if args.scan:
+        print(f"scan: {budget.index.scan()}", file=sys.stderr)
+
+    report = budget.enforce(dry_run=args.dry_run)
+    print(json.dumps(report, indent=2))
+    return 1 if report["unresolved"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
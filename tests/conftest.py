@@ -1,6 +1,7 @@
 import pytest
 from starlette.testclient import TestClient
 
+from app.core.config import get_settings
 from app.main import app
 
 
@@ -13,6 +14,14 @@ def test_client():
         yield client
 
 
+@pytest.fixture(autouse=True)
+def _model_cache_root(tmp_path, monkeypatch):
+    """
+    Point MODEL_CACHE_ROOT at a per-test directory so snapshots and cache files stay out of the repo.
+    """
+    monkeypatch.setattr(get_settings(), "MODEL_CACHE_ROOT", tmp_path / "models_cache")
+
+
 def pytest_collection_modifyitems(config, items):
     """
     Automatically skip gpu_cuda/gpu_mps tests if the hardware is not available.
@@ -0,0 +1,130 @@
+# tests/test_batching.py
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.plugins.batching import MicroBatcher
+
+
+def test_batcher_groups_concurrent_requests():
+    seen = []
+
+    def fn(payloads):
+        seen.append(len(payloads))
+        time.sleep(0.01)
+        return [{"x": p["x"] * 2} for p in payloads]
+
+    b = MicroBatcher(fn, max_batch_size=8, max_wait_ms=50, name="t")
+    futures = [b.submit({"x": i}) for i in range(20)]
+    results = [f.result(timeout=5) for f in futures]
+    b.close()
+
+    assert results == [{"x": i * 2} for i in range(20)]
+    assert max(seen) == 8
+    assert b.stats()["items"] == 20
+
+
+def test_batcher_flushes_partial_batch_after_wait():
+    b = MicroBatcher(lambda ps: ps, max_batch_size=64, max_wait_ms=20, name="t")
+    t0 = time.perf_counter()
+    assert b.submit({"a": 1}).result(timeout=5) == {"a": 1}
+    assert time.perf_counter() - t0 < 1.0
+    b.close()
+
+
+def test_batcher_propagates_errors():
+    def fn(payloads):
+        return [ValueError("bad") if p.get("bad") else p for p in payloads]
+
+    b = MicroBatcher(fn, max_batch_size=4, max_wait_ms=20, name="t")
+    ok, bad = b.submit({"a": 1}), b.submit({"bad": True})
+    assert ok.result(timeout=5) == {"a": 1}
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+    b2 = MicroBatcher(lambda ps: [], max_batch_size=4, max_wait_ms=1, name="t2")
+    with pytest.raises(RuntimeError):
+        b2.submit({}).result(timeout=5)
+    b.close()
+    b2.close()
+
+
+def test_tinynet_predict_batched_route():
+    client = TestClient(app)
+    results = [None] * 8
+
+    def call(i):
+        r = client.post("/plugins/tinynet/predict", json={"inputs": [float(i)] * 512})
+        results[i] = r
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for r in results:
+        assert r.status_code == 200
+        body = r.json()
+        assert body["plugin"] == "tinynet"
+        assert len(body["result"]["labels"]) == 1
+        assert len(body["result"]["logits"][0]) == 10
+
+
+def test_tinynet_bad_input_fails_only_that_request(monkeypatch):
+    from app.core.config import get_settings
+    from app.plugins import loader
+    from app.plugins.batching import drop_batchers
+
+    client = TestClient(app)
+    loader.discover()
+    plugin = loader.acquire("tinynet")
+    batches = []
+    infer_batch = plugin.infer_batch
+
+    def spy(payloads):
+        batches.append(len(payloads))
+        return infer_batch(payloads)
+
+    monkeypatch.setattr(plugin, "infer_batch", spy)
+    monkeypatch.setattr(get_settings(), "BATCH_MAX_WAIT_MS", 300.0)
+    drop_batchers("tinynet")
+    inputs = [[0.25 + i] * 512 if i % 2 else [1.0, 2.0] for i in range(6)]  # odd: good, even: bad
+    results = [None] * len(inputs)
+
+    def call(i):
+        results[i] = client.post("/plugins/tinynet/predict", json={"inputs": inputs[i]})
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(inputs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    drop_batchers("tinynet")
+    loader.release("tinynet")
+
+    assert max(batches) > 1  # good and bad requests shared a batch
+    assert [r.status_code for r in results] == [500, 200, 500, 200, 500, 200]
+    assert all(len(r.json()["result"]["labels"]) == 1 for r in results[1::2])
+
+
+def test_default_infer_batch_calls_infer_per_payload():
+    from app.plugins.base import AIPlugin, supports_batching
+
+    class Echo(AIPlugin):
+        def load(self):
+            pass
+
+        def infer(self, payload):
+            if payload.get("bad"):
+                raise ValueError("bad")
+            return payload
+
+    plugin = Echo()
+    ok, bad = plugin.infer_batch([{"a": 1}, {"bad": True}])
+    assert ok == {"a": 1} and isinstance(bad, ValueError)
+    assert list(plugin.stream({"a": 2})) == [{"a": 2}]
+    assert not supports_batching(plugin)
@@ -0,0 +1,162 @@
+# tests/test_bulk.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.plugins.base import AIPlugin
+from app.plugins.bulk import iter_json_items, run_bulk
+from app.plugins.executor import PluginExecutor
+from app.routes.plugins import _run_many
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _parse(data: bytes, size: int = 3):
+    async def go():
+        return [x async for x in iter_json_items(_chunks(data, size))]
+
+    return asyncio.run(go())
+
+
+def test_parse_ndjson_and_array_across_chunk_boundaries():
+    items = [{"i": i, "s": "ü✅ {,]"} for i in range(20)]
+    ndjson = "\n".join(json.dumps(x, ensure_ascii=False) for x in items).encode()
+    array = json.dumps(items, ensure_ascii=False).encode()
+    assert _parse(ndjson) == items
+    assert _parse(array, size=5) == items
+    assert _parse(b"") == []
+
+    with pytest.raises(ValueError):
+        _parse(b'{"a": 1}\n{"b": ')
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'[{"a": 1}] [{"b": 2}]',  # data after the array
+        b'[{"a": 1} {"b": 2}]',  # missing comma
+        b'[{"a": 1},]',  # trailing comma
+        b'[{"a": 1}',  # unterminated
+        b'{"a": 1}, {"b": 2}',  # commas outside an array
+        b'{"a": 1}]',
+    ],
+)
+def test_parse_rejects_malformed_arrays(body):
+    with pytest.raises(ValueError):
+        _parse(body, size=4)
+
+
+def test_parse_keeps_nested_arrays_as_items():
+    assert _parse(b'[[{"a": 1}], [{"b": 2}], {"c": 3}]') == [[{"a": 1}], [{"b": 2}], {"c": 3}]
+    assert _parse(b"[]") == []
+
+
+def test_run_bulk_order_and_errors():
+    async def items():
+        for i in range(10):
+            yield i
+
+    async def call_batch(batch):
+        await asyncio.sleep(0.01 * (3 - len(batch)))  # last (short) batch finishes first
+        return [ValueError("odd") if x % 2 else x * 10 for x in batch]
+
+    async def go(ordered):
+        return [x async for x in run_bulk(items(), call_batch, batch_size=3, concurrency=4, ordered=ordered)]
+
+    out = asyncio.run(go(True))
+    assert [i for i, _ in out] == list(range(10))
+    assert out[2] == (2, 20) and isinstance(out[1][1], ValueError)
+    assert sorted(i for i, _ in asyncio.run(go(False))) == list(range(10))
+
+
+def test_async_batch_takes_one_executor_slot():
+    class Slow(AIPlugin):
+        def load(self):
+            pass
+
+        def infer(self, payload):
+            raise AssertionError("the async entry point should be used")
+
+        async def ainfer(self, payload):
+            await asyncio.sleep(0.01)
+            return payload["n"]
+
+    executor = PluginExecutor("async-bulk", max_workers=1, max_queue=1)
+    payloads = [{"n": i} for i in range(64)]
+
+    async def go():
+        # two batches in flight, as with BULK_CONCURRENCY=2, against a capacity of 2
+        return await asyncio.gather(*(_run_many(Slow(), executor, payloads) for _ in range(2)))
+
+    assert asyncio.run(go()) == [list(range(64))] * 2
+    assert executor.stats()["rejected"] == 0
+
+
+def test_bulk_route_ndjson():
+    client = TestClient(app)
+    body = "\n".join(json.dumps({"n": i}) for i in range(200)) + "\n[1]\n"
+    r = client.post(
+        "/plugins/dummy/ping/bulk?batch_size=16", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    results, summary = lines[:-1], lines[-1]
+    assert [x["index"] for x in results] == list(range(201))
+    assert results[5]["result"]["payload_received"] == {"task": "ping", "n": 5}
+    assert "error" in results[200]
+    assert summary == {**summary, "done": True, "items": 201, "errors": 1}
+
+
+def test_bulk_route_json_array_batched_plugin():
+    client = TestClient(app)
+    payloads = [{"inputs": [float(i)] * 512} for i in range(40)]
+    r = client.post("/plugins/tinynet/predict/bulk", json=payloads)
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 41 and lines[-1]["errors"] == 0
+    assert all(len(x["result"]["logits"][0]) == 10 for x in lines[:-1])
+
+    assert client.post("/plugins/nope/x/bulk", content=b"").status_code == 404
+
+
+def test_bulk_releases_plugin_when_client_is_gone_before_first_byte():
+    from app.plugins import loader
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/plugins/dummy/ping/bulk",
+        "raw_path": b"/plugins/dummy/ping/bulk",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/x-ndjson"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": b'{"n": 1}\n', "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client disconnected")
+
+    async def main():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(main())
+    assert loader.resident_stats()["resident"]["dummy"]["in_use"] == 0
@@ -0,0 +1,93 @@
+# tests/test_cache_budget.py
+import os
+import time
+
+from app.utils.cache_budget import MANAGER_LOCK_FILE, CacheBudget, start_cache_manager
+from app.utils.model_cache import ModelCacheIndex, lock_file
+
+
+def _snapshot(hub, model_id, revision, blobs):
+    repo = hub / ("models--" + model_id.replace("/", "--"))
+    snap = repo / "snapshots" / revision
+    snap.mkdir(parents=True)
+    (repo / "blobs").mkdir(exist_ok=True)
+    for name, (digest, size) in blobs.items():
+        blob = repo / "blobs" / digest
+        if not blob.exists():
+            blob.write_bytes(b"x" * size)
+        (snap / name).symlink_to(os.path.relpath(blob, snap))
+    return repo
+
+
+def test_lru_eviction_keeps_pinned_models_and_shared_blobs(tmp_path):
+    hub = tmp_path / "hub"
+    a = _snapshot(hub, "org/a", "r1", {"w.bin": ("a" * 64, 400)})
+    _snapshot(hub, "org/a", "r2", {"w.bin": ("a" * 64, 400), "x.bin": ("c" * 64, 100)})
+    b = _snapshot(hub, "org/b", "r1", {"w.bin": ("b" * 64, 300)})
+    index = ModelCacheIndex(tmp_path, hub_dir=hub)
+    index.scan()
+
+    def set_access():
+        for key, when in {"org/a@r1": 1.0, "org/a@r2": 3.0, "org/b@r1": 2.0}.items():
+            index._models[key]["last_access"] = when
+
+    index._update(set_access)
+    index.touch("org/a", "r1", pin=4242)  # a loaded plugin in process 4242 uses org/a@r1
+
+    budget = CacheBudget(index, budget_bytes=600, live=lambda pid, started: pid == 4242)
+    planned = budget.enforce(dry_run=True)["evicted"]
+    assert planned == [{"id": "org/b", "revision": "r1", "bytes": 300}, {"id": "org/a", "revision": "r2", "bytes": 500}]
+    assert b.exists()
+
+    report = budget.enforce()
+    assert [e["id"] + "@" + e["revision"] for e in report["evicted"]] == ["org/b@r1", "org/a@r2"]
+    assert not report["unresolved"] and not b.exists()
+    assert (a / "snapshots" / "r1" / "w.bin").read_bytes() == b"x" * 400  # shared blob kept
+    assert not (a / "blobs" / ("c" * 64)).exists()
+    assert [e["event"] for e in budget.events] == ["evict", "evict"]
+
+    # nothing left but the pinned snapshot: the limit cannot be met and that is reported
+    budget.budget_bytes = 100
+    assert budget.enforce()["unresolved"] and budget.events[-1]["event"] == "unresolved"
+    assert index.has("org/a", "r1")
+
+    # once the process is gone, the pin no longer protects the model
+    budget._live = lambda pid, started: False
+    time.sleep(0.01)
+    assert budget.enforce()["evicted"][0]["id"] == "org/a" and not a.exists()
+
+
+def test_only_one_worker_runs_the_cache_manager(tmp_path):
+    budget = CacheBudget(ModelCacheIndex(tmp_path), budget_bytes=1)
+    runs = []
+    budget.enforce = lambda: runs.append(1)
+    other = lock_file(tmp_path / MANAGER_LOCK_FILE, blocking=False)  # another worker manages the cache
+    stop = start_cache_manager(budget, 0.01)
+    try:
+        time.sleep(0.1)
+        assert runs == []
+        other.close()  # that worker exits
+        time.sleep(0.1)
+        assert runs
+        assert lock_file(tmp_path / MANAGER_LOCK_FILE, blocking=False) is None
+    finally:
+        stop.set()
+
+
+def test_recent_usage_is_reused_until_it_ages_or_eviction_runs(tmp_path):
+    hub = tmp_path / "hub"
+    _snapshot(hub, "org/a", "r1", {"w.bin": ("a" * 64, 400)})
+    index = ModelCacheIndex(tmp_path, hub_dir=hub)
+    index.scan()
+    budget = CacheBudget(index, budget_bytes=100)
+    calls = []
+    entries = index.entries
+    index.entries = lambda: calls.append(1) or entries()
+
+    assert budget.recent_usage()["bytes"] == 400
+    assert budget.recent_usage()["bytes"] == 400 and len(calls) == 1  # scrapes in a row share one read
+    budget.enforce()
+    assert budget.recent_usage()["bytes"] == 0  # eviction refreshed it
+    n = len(calls)
+    budget.recent_usage(max_age=0.0)
+    assert len(calls) == n + 1
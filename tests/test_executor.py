@@ -0,0 +1,74 @@
+# tests/test_executor.py
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.plugins.executor import ExecutorBusy, PluginExecutor
+
+
+def test_executor_rejects_when_queue_full():
+    ex = PluginExecutor("t", max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def main():
+        a = asyncio.ensure_future(ex.run(gate.wait, 5))
+        b = asyncio.ensure_future(ex.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        stats = ex.stats()
+        assert stats["in_flight"] == 1 and stats["queued"] == 1
+        with pytest.raises(ExecutorBusy):
+            await ex.run(time.sleep, 0)
+        gate.set()
+        await asyncio.gather(a, b)
+
+    asyncio.run(main())
+    stats = ex.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["in_flight"] == 0
+    ex.shutdown()
+
+
+def test_cancelled_call_holds_its_slot_until_the_worker_finishes():
+    ex = PluginExecutor("t", max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(ex.run(gate.wait, 5))
+        queued = asyncio.ensure_future(ex.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        queued.cancel()  # never started: its slot is freed at once
+        await asyncio.sleep(0.05)
+        assert ex.stats()["in_flight"] == 1
+        waiting = asyncio.ensure_future(ex.run(lambda: 7))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusy):  # the abandoned call still occupies the worker
+            await ex.run(time.sleep, 0)
+        gate.set()
+        assert await waiting == 7
+
+    asyncio.run(main())
+    assert ex.stats()["in_flight"] == 0 and ex.stats()["queued"] == 0
+    ex.shutdown()
+
+
+def test_executor_runs_coroutines_on_loop():
+    ex = PluginExecutor("t", max_workers=1, max_queue=0)
+
+    async def work(x):
+        return threading.current_thread() is threading.main_thread(), x
+
+    on_main, value = asyncio.run(ex.run_async(work, 3))
+    assert on_main and value == 3
+    ex.shutdown()
+
+
+def test_plugin_stats_endpoint():
+    client = TestClient(app)
+    assert client.post("/plugins/dummy/ping", json={"a": 1}).status_code == 200
+    body = client.get("/plugins/stats").json()
+    assert body["executors"]["dummy"]["completed"] >= 1
+    assert body["executors"]["dummy"]["in_flight"] == 0
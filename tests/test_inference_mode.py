@@ -0,0 +1,40 @@
+# tests/test_inference_mode.py
+import asyncio
+
+import torch
+
+from app.plugins.base import AIPlugin
+from app.plugins.executor import PluginExecutor
+from app.plugins.inference import guarded, inference_context, inference_policy
+
+
+class GradProbe(AIPlugin):
+    name = "grad_probe"
+
+    def load(self) -> None:
+        self.weight = torch.ones(3, requires_grad=True)
+
+    def infer(self, payload):
+        y = (self.weight * 2).sum()
+        return {"inference_mode": torch.is_inference_mode_enabled(), "requires_grad": y.requires_grad}
+
+
+def test_calls_run_in_inference_mode_on_the_worker_thread():
+    plugin = GradProbe()
+    plugin.load()
+    result = asyncio.run(PluginExecutor("grad_probe", max_workers=1).run(guarded(plugin, plugin.infer), {}))
+    assert result == {"inference_mode": True, "requires_grad": False}
+    assert not torch.is_inference_mode_enabled()
+
+
+def test_manifest_opts_out_and_selects_autocast():
+    plugin = GradProbe()
+    plugin.load()
+    plugin.manifest = {"inference_mode": False}
+    assert guarded(plugin, plugin.infer)({}) == {"inference_mode": False, "requires_grad": True}
+
+    plugin.manifest = {"autocast": "bfloat16"}
+    assert inference_policy(plugin) == (True, ("cpu", torch.bfloat16))
+    with inference_context(plugin):
+        assert torch.is_autocast_enabled("cpu")
+        assert (torch.randn(2, 4) @ torch.randn(4, 2)).dtype == torch.bfloat16
@@ -0,0 +1,68 @@
+# tests/test_metrics.py
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.main import app
+
+
+def test_sharded_recording_and_histogram_rendering(monkeypatch):
+    # Keep the test metrics out of the process-wide registry that /metrics renders
+    monkeypatch.setattr(metrics, "_registry", list(metrics._registry))
+    c = metrics.Counter("test_hits_total", "test", ("k",))
+    h = metrics.Histogram("test_seconds", "test", ("k",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            c.inc(("a",))
+        h.observe(("a",), 0.05)
+        h.observe(("a",), 0.5)
+        h.observe(("a",), 5.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = metrics.render([c.family(), h.family()])
+    assert 'neuroserve_test_hits_total{k="a"} 4000' in text
+    assert 'neuroserve_test_seconds_bucket{k="a",le="0.1"} 4' in text
+    assert 'neuroserve_test_seconds_bucket{k="a",le="1.0"} 8' in text
+    assert 'neuroserve_test_seconds_bucket{k="a",le="+Inf"} 12' in text
+    assert 'neuroserve_test_seconds_count{k="a"} 12' in text
+
+
+def test_merge_sums_counters_and_drops_gauges_of_dead_workers():
+    def snap(pid, hits, busy):
+        return {
+            "pid": pid,
+            "families": [
+                {"name": "hits", "kind": "counter", "help": "", "labels": [], "samples": [[[], hits]]},
+                {"name": "busy", "kind": "gauge", "help": "", "labels": [], "samples": [[[], busy]]},
+            ],
+        }
+
+    merged = {f["name"]: f for f in metrics.merge([snap(1, 3, 2), snap(2, 4, 5)], live=lambda pid: pid == 1)}
+    assert merged["hits"]["samples"] == [[[], 7]]
+    assert merged["busy"]["samples"] == [[[], 2]]
+
+
+def test_metrics_endpoint_labels_routes_and_errors():
+    with TestClient(app) as client:
+        client.post("/plugins/dummy/ping", json={})
+        client.get("/__nope__/123", headers={"Accept": "application/json"})
+        r = client.get("/metrics")
+
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert 'route="/plugins/{name}/{task}",plugin="dummy",task="ping"' in text
+    assert 'neuroserve_http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'neuroserve_http_errors_total{status="404"}' in text
+    assert 'neuroserve_plugin_load_seconds_count{plugin="dummy"}' in text
+    assert "/__nope__" not in text
+
+
+def test_test_metrics_do_not_leak_into_the_registry():
+    assert not any(m.name.startswith(metrics.PREFIX + "test_") for m in metrics._registry)
@@ -0,0 +1,90 @@
+# tests/test_middleware.py
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.middleware import RequestIDMiddleware, ServerTimingMiddleware
+from app.core.timing import phase
+from app.main import app
+from app.plugins.executor import PluginExecutor
+
+client = TestClient(app)
+
+
+def test_request_id_is_echoed_and_reaches_error_body():
+    r = client.get("/__nope__", headers={"X-Request-ID": "abc123", "Accept": "application/json"})
+    assert r.status_code == 404
+    assert r.headers["x-request-id"] == "abc123"
+    assert r.json()["request_id"] == "abc123"
+
+    r = client.get("/health")
+    assert len(r.headers["x-request-id"]) == 32
+    assert "app;dur=" in r.headers["server-timing"]
+
+
+def test_plugin_phases_reach_server_timing_and_log(caplog):
+    mini = FastAPI()
+    mini.add_middleware(ServerTimingMiddleware, log=True)
+    mini.add_middleware(RequestIDMiddleware)
+    executor = PluginExecutor("timed", max_workers=1)
+
+    def infer(payload):
+        with phase("tokenize"):
+            pass
+        with phase("forward"):
+            time.sleep(0.002)
+        return {"ok": True}
+
+    @mini.post("/run")
+    async def run():
+        with phase("parse"):
+            payload = {}
+        return await executor.run(infer, payload)
+
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        r = TestClient(mini).post("/run", headers={"X-Request-ID": "t-1"})
+    executor.shutdown()
+
+    names = [m.split(";")[0] for m in r.headers["server-timing"].split(", ")]
+    assert names == ["parse", "queue", "tokenize", "forward", "infer", "app"]
+    (msg,) = [r.getMessage() for r in caplog.records if r.name == "app.timing"]
+    record = json.loads(msg.split(" ", 1)[1])
+    assert record["request_id"] == "t-1" and record["status"] == 200
+    assert record["phases_ms"]["forward"] >= 2 and record["phases_ms"]["infer"] >= record["phases_ms"]["forward"]
+
+
+def test_streaming_passes_through_unbuffered():
+    produced = []
+
+    async def inner(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"x-seen-id", scope["state"]["request_id"].encode())],
+            }
+        )
+        for i in range(3):
+            produced.append(i)
+            await send({"type": "http.response.body", "body": b"%d" % i, "more_body": i < 2})
+
+    messages = []
+
+    async def send(message):
+        messages.append((message, len(produced)))
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"x-request-id", b"rid-1")]}
+    asyncio.run(RequestIDMiddleware(ServerTimingMiddleware(inner))(scope, receive, send))
+
+    start = dict(messages[0][0]["headers"])
+    assert start[b"x-request-id"] == start[b"x-seen-id"] == b"rid-1"
+    assert start[b"server-timing"].startswith(b"app;dur=")  # no phases recorded
+    # each body chunk is forwarded as soon as it is produced
+    assert [(m["body"], n) for m, n in messages[1:]] == [(b"0", 1), (b"1", 2), (b"2", 3)]
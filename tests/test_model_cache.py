@@ -0,0 +1,90 @@
+# tests/test_model_cache.py
+import multiprocessing
+import os
+
+from app.utils.model_cache import ModelCacheIndex, missing_models, model_refs, sha256_file
+
+
+def _hf_snapshot(hub, model_id, revision, files):
+    repo = hub / ("models--" + model_id.replace("/", "--"))
+    snap = repo / "snapshots" / revision
+    snap.mkdir(parents=True)
+    for name, data in files.items():
+        (snap / name).write_bytes(data)
+    (repo / "refs").mkdir(exist_ok=True)
+    (repo / "refs" / "main").write_text(revision)
+    return snap
+
+
+def test_scan_is_incremental_and_lookups_use_the_persisted_index(tmp_path):
+    hub, ckpt = tmp_path / "hf" / "hub", tmp_path / "torch" / "hub" / "checkpoints"
+    snap = _hf_snapshot(hub, "org/model", "abc123", {"config.json": b"{}", "model.bin": b"x" * 100})
+    ckpt.mkdir(parents=True)
+    (ckpt / "resnet18-f37072fd.pth").write_bytes(b"w" * 10)
+
+    index = ModelCacheIndex(tmp_path, hub_dir=hub, torch_dir=ckpt)
+    assert index.scan() == {"added": 2, "updated": 0, "removed": 0, "hashed": 3}
+    assert index.scan()["hashed"] == 0
+
+    fresh = ModelCacheIndex(tmp_path)  # no cache dirs: lookups come from index.json alone
+    entry = fresh.lookup("org/model")
+    assert entry["revision"] == "abc123" and entry["size"] == 102
+    assert entry["files"]["model.bin"]["sha256"] == sha256_file(snap / "model.bin")
+    assert fresh.has("org/model", "main") and fresh.has("torch/resnet18-f37072fd.pth")
+    assert fresh.missing([("org/model", None), ("org/other", None)]) == ["org/other"]
+
+    (snap / "model.bin").write_bytes(b"y" * 50)
+    assert index.verify("org/model") == ["model.bin: size 50 != 100"]
+    assert index.scan() == {"added": 0, "updated": 1, "removed": 0, "hashed": 1}
+    os.remove(ckpt / "resnet18-f37072fd.pth")
+    assert index.scan()["removed"] == 1 and not fresh.has("torch/resnet18-f37072fd.pth")
+
+
+def test_manifest_models_and_touch(tmp_path):
+    index = ModelCacheIndex(tmp_path)
+    (tmp_path / "w.safetensors").write_bytes(b"0" * 8)
+    entry = index.register("local/w", "v1", tmp_path / "w.safetensors", source="file")
+    assert model_refs({"models": ["local/w@v1", {"id": "org/x"}]}) == [("local/w", "v1"), ("org/x", None)]
+    assert missing_models({"p": {"models": ["local/w", "org/x"]}}, index) == {"p": ["org/x"]}
+    assert index.touch("local/w") and index.lookup("local/w")["last_access"] >= entry["last_access"]
+    assert not index.touch("org/x")
+
+
+def test_pins_do_not_survive_pid_reuse(tmp_path):
+    index = ModelCacheIndex(tmp_path)
+    (tmp_path / "w.safetensors").write_bytes(b"0" * 8)
+    index.register("local/w", "v1", tmp_path / "w.safetensors", source="file")
+    index.touch("local/w", pin=os.getpid())
+    assert index.in_use(index.lookup("local/w"))
+
+    def restart():  # same PID, different process: what a restarted container sees
+        pin = index._models["local/w@v1"]["pinned_by"][0]
+        pin[1] -= 3600
+
+    index._update(restart)
+    assert not index.in_use(index.lookup("local/w"))
+
+    def legacy():  # bare process IDs from older indexes still count while the PID runs
+        index._models["local/w@v1"]["pinned_by"] = [os.getpid()]
+
+    index._update(legacy)
+    assert index.in_use(index.lookup("local/w"))
+    assert index.unpin("local/w") and not index.in_use(index.lookup("local/w"))
+
+
+def _register_many(root, worker):
+    index = ModelCacheIndex(root)
+    for i in range(20):
+        path = root / f"{worker}-{i}.bin"
+        path.write_bytes(b"0")
+        index.register(f"local/{worker}-{i}", "v1", path, source="file")
+
+
+def test_concurrent_workers_do_not_lose_index_updates(tmp_path):
+    ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    procs = [ctx.Process(target=_register_many, args=(tmp_path, w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert len(ModelCacheIndex(tmp_path).entries()) == 80
@@ -0,0 +1,50 @@
+# tests/test_optimize.py
+import pytest
+import torch
+
+from app.toy_model import TinyNet
+from app.utils.optimize import optimize_model, passes_for
+
+
+def test_passes_verified_against_eager_and_reported():
+    torch.manual_seed(0)
+    model = TinyNet().eval()
+    x = torch.randn(8, 512)
+    expected = model(x).detach()
+
+    optimized, report = optimize_model(
+        model, x, ["channels_last", "quantize_dynamic", "torchscript"], min_speedup=0.0, warmup=1, iters=3
+    )
+    status = {s["pass"]: s["status"] for s in report["passes"]}
+    assert status == {"channels_last": "skipped", "quantize_dynamic": "applied", "torchscript": "applied"}
+    assert isinstance(optimized, torch.jit.ScriptModule)
+    assert torch.allclose(optimized(x), expected, rtol=5e-2, atol=5e-2)
+    assert report["speedup"] > 0 and all("speedup" in s for s in report["passes"][1:])
+    # the eager model is left untouched
+    assert isinstance(model.net[0], torch.nn.Linear) and torch.equal(model(x), expected)
+
+
+def test_mismatching_pass_is_rejected():
+    model = TinyNet().eval()
+    _, report = optimize_model(
+        model, torch.randn(4, 512), ["quantize_dynamic"], tolerance={"quantize_dynamic": (0.0, 0.0)}, iters=1
+    )
+    assert report["passes"][0]["status"] == "mismatch" and report["final_ms"] == report["eager_ms"]
+
+
+def test_passes_for_prefers_manifest():
+    assert passes_for({"optimize": ["torchscript"]}) == ["torchscript"]
+    assert passes_for({"optimize": False}) == []
+    assert passes_for({}) == []
+    with pytest.raises(ValueError):
+        passes_for({"optimize": ["nope"]})
+
+
+def test_tinynet_without_passes_serves_the_loaded_model(monkeypatch):
+    from app.plugins.tinynet import plugin as tinynet
+
+    monkeypatch.setattr(tinynet, "optimize_model", lambda *a: pytest.fail("optimize_model ran with no passes"))
+    p = tinynet.Plugin()
+    p.manifest = {"optimize": False}
+    p.load()
+    assert isinstance(p.model, TinyNet) and p.optimization is None
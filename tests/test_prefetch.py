@@ -0,0 +1,64 @@
+# tests/test_prefetch.py
+from app.utils.model_cache import ModelCacheIndex
+from app.utils.prefetch import MirrorSource, Prefetcher, model_specs
+
+
+class RecordingMirror(MirrorSource):
+    def __init__(self, root):
+        super().__init__(root)
+        self.offsets = {}
+
+    def fetch(self, spec, revision, name, offset):
+        self.offsets[name] = offset
+        return super().fetch(spec, revision, name, offset)
+
+
+def test_prefetch_from_mirror_resumes_and_indexes(tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "org" / "model" / "sub").mkdir(parents=True)
+    (mirror / "org" / "model" / "config.json").write_text("{}")
+    (mirror / "org" / "model" / "model.bin").write_bytes(bytes(range(256)) * 40)
+    (mirror / "org" / "model" / "sub" / "vocab.txt").write_text("a\nb\n")
+    (mirror / "torch").mkdir()
+    (mirror / "torch" / "net-1234.pth").write_bytes(b"w" * 64)
+
+    hub, ckpt = tmp_path / "hub", tmp_path / "checkpoints"
+    index = ModelCacheIndex(tmp_path / "cache")
+    source = RecordingMirror(mirror)
+    fetcher = Prefetcher([source], hub, ckpt, index=index, workers=3)
+
+    # an interrupted earlier run left half of model.bin behind
+    partial = hub / "models--org--model" / ".partial" / "main" / "model.bin.partial"
+    partial.parent.mkdir(parents=True)
+    partial.write_bytes((bytes(range(256)) * 40)[:5000])
+
+    specs = model_specs([{"models": ["org/model", "torch/net-1234.pth"]}, {"models": ["org/model"]}])
+    results = fetcher.run(specs)
+    assert {k: v["status"] for k, v in results.items()} == {"org/model": "fetched", "torch/net-1234.pth": "fetched"}
+    assert source.offsets["model.bin"] == 5000 and results["org/model"]["bytes"] == 10240 - 5000 + 2 + 4
+
+    snap = hub / "models--org--model" / "snapshots" / "main"
+    assert (hub / "models--org--model" / "refs" / "main").read_text() == "main"
+    assert (snap / "model.bin").read_bytes() == bytes(range(256)) * 40
+    assert (snap / "sub" / "vocab.txt").read_text() == "a\nb\n"
+    assert (ckpt / "net-1234.pth").stat().st_size == 64
+    assert index.has("org/model") and index.has("torch/net-1234.pth")
+
+    again = Prefetcher([source], hub, ckpt, index=index).run(specs)
+    assert {v["status"] for v in again.values()} == {"cached"}
+
+
+def test_missing_model_fails_without_network(tmp_path):
+    fetcher = Prefetcher([MirrorSource(tmp_path)], tmp_path / "hub", tmp_path / "ckpt")
+    result = fetcher.run([{"id": "org/absent", "revision": None}])["org/absent"]
+    assert result["status"] == "failed" and "not in mirror" in result["error"]
+
+
+def test_model_specs_parse_revision_and_url_entries():
+    from scripts.prefetch_models import DEFAULT_MODELS
+
+    url = "https://download.pytorch.org/models/resnet18-f37072fd.pth"
+    specs = model_specs([{"models": DEFAULT_MODELS}, {"models": ["org/m@abc", f"torch/resnet18-f37072fd.pth={url}"]}])
+    assert {"id": "org/m", "revision": "abc"} in specs
+    assert [s for s in specs if s.get("url")] == [{"id": "torch/resnet18-f37072fd.pth", "revision": None, "url": url}]
+    assert len(specs) == len(DEFAULT_MODELS) + 1
@@ -0,0 +1,138 @@
+# tests/test_process_pool.py
+import multiprocessing as mp
+import os
+import pathlib
+import signal
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from app.plugins.base import AIPlugin
+from app.plugins.process_pool import BatchedProcessPlugin, ProcessPlugin, make_process_plugin
+
+needs_fork = pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires fork start method")
+
+
+class EchoPlugin(AIPlugin):
+    tasks = ["echo"]
+
+    def load(self) -> None:
+        self.model = torch.nn.Linear(4, 4)
+        self.parent_pid = os.getpid()
+
+    def infer(self, payload):
+        if payload.get("crash"):
+            os._exit(1)
+        if payload.get("sleep"):
+            time.sleep(payload["sleep"])
+            return {"tensor": torch.ones(4096)}
+        return {
+            "pid": os.getpid(),
+            "parent_pid": self.parent_pid,
+            "sum_np": float(payload["arr"].sum()),
+            "is_view": isinstance(payload["arr"], np.ndarray),
+            "tensor": payload["t"] * 2,
+        }
+
+
+class BatchPlugin(EchoPlugin):
+    def infer_batch(self, payloads):
+        return [{"i": p["i"]} for p in payloads]
+
+
+@pytest.fixture
+def pool():
+    # EchoPlugin lives in this module, so workers must inherit it via fork
+    p = make_process_plugin(EchoPlugin(), pathlib.Path("."), "echo", workers=2, timeout=10, start_method="fork")
+    p.load()
+    yield p
+    p.close()
+
+
+@needs_fork
+def test_process_plugin_roundtrip_shared_memory(pool):
+    arr = np.arange(4096, dtype=np.float32)
+    t = torch.ones(2048)
+    out = pool.infer({"arr": arr, "t": t})
+    assert out["pid"] != os.getpid()
+    assert out["parent_pid"] == os.getpid()  # loaded once in the parent
+    assert out["sum_np"] == float(arr.sum())
+    assert out["is_view"]
+    assert torch.equal(out["tensor"], t * 2)
+
+
+@needs_fork
+def test_process_plugin_restarts_crashed_worker(pool):
+    with pytest.raises(RuntimeError):
+        pool.infer({"crash": True})
+    assert pool.stats()["restarts"] == 1
+    out = pool.infer({"arr": np.zeros(4), "t": torch.zeros(1)})
+    assert out["sum_np"] == 0.0
+    assert pool.stats()["alive"] == 2
+
+
+@needs_fork
+def test_worker_that_died_while_idle_is_replaced_before_dispatch(pool):
+    victim = pool.stats()["pids"][0]
+    os.kill(victim, signal.SIGKILL)
+    deadline = time.time() + 5
+    while pool._workers[0].proc.is_alive() and time.time() < deadline:
+        time.sleep(0.01)
+    for _ in range(2):  # both workers serve a request; neither fails
+        assert pool.infer({"arr": np.zeros(4), "t": torch.zeros(1)})["sum_np"] == 0.0
+    assert pool.stats()["restarts"] == 1 and victim not in pool.stats()["pids"]
+
+
+@needs_fork
+def test_timed_out_reply_does_not_leak_shared_memory(pool):
+    pool.timeout = 0.2
+    before = set(os.listdir("/dev/shm"))
+    with pytest.raises(TimeoutError):
+        pool.infer({"sleep": 0.5})
+    assert set(os.listdir("/dev/shm")) - before == set()
+    assert pool.stats()["restarts"] == 1
+
+
+def test_spawned_workers_load_the_plugin_and_keep_error_types():
+    from app.plugins.tinynet.plugin import Plugin
+
+    folder = pathlib.Path(__file__).parents[1] / "app" / "plugins" / "tinynet"
+    p = make_process_plugin(Plugin(), folder, "tinynet", workers=1, timeout=60)
+    assert p.stats()["start_method"] == "spawn"
+    p.load()
+    try:
+        assert all(w.ready for w in p._workers)  # load() waited for the worker to load the plugin
+        assert len(p.infer_batch([{"inputs": np.zeros((2, 512), dtype=np.float32)}])[0]["labels"]) == 2
+        with pytest.raises(ValueError):
+            p.infer({"inputs": [1.0, 2.0]})
+    finally:
+        p.close()
+
+
+def test_load_raises_when_a_worker_cannot_load_the_plugin(tmp_path):
+    (tmp_path / "plugin.py").write_text(
+        "from app.plugins.base import AIPlugin\n\n\n"
+        "class Plugin(AIPlugin):\n"
+        "    def load(self):\n"
+        "        raise FileNotFoundError('weights.safetensors')\n\n"
+        "    def infer(self, payload):\n"
+        "        return payload\n",
+        encoding="utf-8",
+    )
+    p = make_process_plugin(EchoPlugin(), tmp_path, "broken", workers=2, timeout=10, load_timeout=60)
+    with pytest.raises(FileNotFoundError, match="weights.safetensors"):
+        p.load()
+    assert p.stats()["workers"] == 0
+
+
+@needs_fork
+def test_make_process_plugin_keeps_batching():
+    p = make_process_plugin(BatchPlugin(), pathlib.Path("."), "b", workers=1, start_method="fork")
+    assert isinstance(p, BatchedProcessPlugin)
+    p.load()
+    assert p.infer_batch([{"i": 1}, {"i": 2}]) == [{"i": 1}, {"i": 2}]
+    p.close()
+    assert not isinstance(make_process_plugin(EchoPlugin(), pathlib.Path("."), "e", 1), BatchedProcessPlugin)
+    assert issubclass(BatchedProcessPlugin, ProcessPlugin)
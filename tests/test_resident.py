@@ -0,0 +1,88 @@
+# tests/test_resident.py
+import torch
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.plugins.base import AIPlugin
+from app.plugins.resident import ResidentSet
+from app.utils.result_cache import get_result_cache
+
+
+class SizedPlugin(AIPlugin):
+    """Plugin whose model holds exactly `mb` MiB of float32 weights."""
+
+    unloaded = []
+
+    def __init__(self, mb: int) -> None:
+        self.mb = mb
+
+    def load(self) -> None:
+        self.model = torch.nn.Linear(self.mb * 1024 * 256, 1, bias=False)
+
+    def unload(self) -> None:
+        SizedPlugin.unloaded.append(self.name)
+        self.model = None
+
+    def infer(self, payload):
+        return {}
+
+
+def _build(name):
+    p = SizedPlugin(mb=1)
+    p.name = name
+    p.load()
+    return p
+
+
+def test_lazy_load_and_lru_eviction():
+    SizedPlugin.unloaded.clear()
+    rs = ResidentSet(_build, ram_budget_mb=2.5)
+    for n in ("a", "b"):
+        rs.acquire(n)
+        rs.release(n)
+    rs.acquire("a")  # "a" becomes most recently used
+    rs.release("a")
+    rs.acquire("c")
+    rs.release("c")
+
+    stats = rs.stats()
+    assert stats["lru_order"] == ["a", "c"]
+    assert SizedPlugin.unloaded == ["b"]
+    assert stats["timings"]["b"]["evictions"] == 1
+    assert stats["timings"]["a"]["loads"] == 1
+    assert stats["ram_mb"] <= 2.5
+    assert [e["event"] for e in stats["events"]].count("evict") == 1
+
+
+def test_in_use_plugins_are_not_evicted():
+    SizedPlugin.unloaded.clear()
+    rs = ResidentSet(_build, ram_budget_mb=1.5)
+    rs.acquire("busy")
+    rs.acquire("other")
+    assert set(rs.plugins) == {"busy", "other"}
+    rs.release("busy")
+    rs.release("other")
+    assert rs.unload("busy") and "busy" not in rs.plugins
+    assert not rs.unload("missing")
+
+
+def test_manifest_footprint_override():
+    rs = ResidentSet(_build, ram_budget_mb=100, manifest_of=lambda n: {"memory_mb": 60})
+    rs.acquire("x")
+    rs.release("x")
+    rs.acquire("y")
+    rs.release("y")
+    assert rs.stats()["lru_order"] == ["y"]
+
+
+def test_plugins_are_loaded_on_first_use(monkeypatch):
+    monkeypatch.setattr(main.settings, "PLUGINS_WARM", [])
+    get_result_cache().clear()
+    with TestClient(app) as client:
+        assert client.get("/plugins").json()["count"] >= 2
+        assert "tinynet" not in client.get("/plugins/stats").json()["resident"]["resident"]
+        assert client.post("/plugins/tinynet/predict", json={"inputs": [0.0] * 512}).status_code == 200
+        resident = client.get("/plugins/stats").json()["resident"]
+        assert "tinynet" in resident["resident"]
+        assert resident["timings"]["tinynet"]["last_load_sec"] >= 0
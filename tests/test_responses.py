@@ -0,0 +1,61 @@
+# tests/test_responses.py
+import dataclasses
+import datetime as dt
+import json
+
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+from app.core import responses
+from app.main import app
+
+
+@dataclasses.dataclass
+class Box:
+    x: int
+    when: dt.date
+
+
+VALUE = {
+    "arr": np.arange(6, dtype=np.float32).reshape(2, 3),
+    "strided": np.arange(10)[::2],
+    "t": torch.ones(2, 2)[:, 0],
+    "bf16": torch.ones(2, dtype=torch.bfloat16),
+    "scalar": np.int64(7),
+    "at": dt.datetime(2025, 1, 2, 3, 4, 5),
+    "box": Box(1, dt.date(2025, 1, 2)),
+    "s": {3},
+    "text": "ü",
+}
+EXPECTED = {
+    "arr": [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+    "strided": [0, 2, 4, 6, 8],
+    "t": [1.0, 1.0],
+    "bf16": [1.0, 1.0],
+    "scalar": 7,
+    "at": "2025-01-02T03:04:05",
+    "box": {"x": 1, "when": "2025-01-02"},
+    "s": [3],
+    "text": "ü",
+}
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_dumps_native_types(backend, monkeypatch):
+    if backend == "json":
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson not installed")
+    assert json.loads(responses.dumps(VALUE)) == EXPECTED
+
+
+def test_plugin_and_error_responses_use_fast_json():
+    client = TestClient(app)
+    r = client.post("/plugins/tinynet/predict", json={"inputs": [0.0] * 512})
+    assert r.status_code == 200
+    assert len(r.json()["result"]["logits"][0]) == 10
+
+    r = client.post("/plugins/tinynet/predict", json={"inputs": [1.0]})
+    assert r.status_code == 500 and r.json()["code"] == 500
@@ -0,0 +1,86 @@
+# tests/test_result_cache.py
+import time
+
+import numpy as np
+import torch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import tensor_codec
+from app.utils.result_cache import ResultCache, cache_policy, get_result_cache, stable_hash
+
+
+def test_stable_hash_ignores_key_order():
+    assert stable_hash("p", "t", {"a": 1, "b": [1, 2]}) == stable_hash("p", "t", {"b": [1, 2], "a": 1})
+    assert stable_hash("p", "t", {"a": 1}, "1.0") != stable_hash("p", "t", {"a": 1}, "2.0")
+
+
+def test_cache_policy_from_manifest():
+    assert cache_policy({}, "x") is None
+    assert cache_policy({"cache": {"tasks": ["a"]}}, "b") is None
+    assert cache_policy({"cache": {"tasks": ["a"], "ttl_sec": 9}}, "a") == 9.0
+    assert cache_policy({"cache": {"tasks": "*"}}, "anything") == 0.0
+
+
+def test_lru_and_ttl():
+    c = ResultCache(max_entries=2, ttl_sec=60)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == (True, 1)
+    c.put("c", 3)  # evicts "b", the least recently used
+    assert c.get("b") == (False, None)
+    c.put("short", 4, ttl_sec=0.01)
+    time.sleep(0.02)
+    assert c.get("short") == (False, None)
+    stats = c.stats()
+    assert stats["evictions"] >= 1 and stats["expired"] == 1 and stats["hits"] == 1
+
+
+def test_hits_are_independent_copies():
+    c = ResultCache()
+    result = {"labels": [1, 2]}
+    c.put("k", result)
+    result["labels"].append(3)  # the caller keeps using its own object
+    _, first = c.get("k")
+    first["labels"].clear()
+    assert c.get("k") == (True, {"labels": [1, 2]})
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ResultCache(disk_dir=tmp_path).put("k" * 64, {"x": [1, 2, 3]})
+    c2 = ResultCache(disk_dir=tmp_path)
+    assert c2.get("k" * 64) == (True, {"x": [1, 2, 3]})
+    assert c2.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_stores_tensors_without_pickle(tmp_path):
+    value = {"t": torch.arange(4.0), "a": np.ones((2, 2), dtype=np.int16), "s": np.float32(0.5), "l": [1, "x", None]}
+    ResultCache(disk_dir=tmp_path).put("k" * 64, value)
+    (path,) = tmp_path.glob("*/*")
+    tensors, _ = tensor_codec.decode_safetensors(path.read_bytes()[8:])  # after the expiry header
+    assert len(tensors) == 3
+
+    hit, got = ResultCache(disk_dir=tmp_path).get("k" * 64)
+    assert hit and torch.equal(got["t"], value["t"]) and got["l"] == [1, "x", None]
+    assert got["a"].dtype == np.int16 and np.array_equal(got["a"], value["a"])
+    assert isinstance(got["s"], np.float32) and got["s"] == 0.5
+    got["a"][0, 0] = 7  # a copy, not a view of the file buffer
+    assert ResultCache(disk_dir=tmp_path).get("k" * 64)[1]["a"][0, 0] == 1
+
+
+def test_values_without_a_safe_encoding_stay_in_memory(tmp_path):
+    cache = ResultCache(disk_dir=tmp_path)
+    cache.put("k" * 64, {"tags": {"a", "b"}})
+    assert cache.get("k" * 64) == (True, {"tags": {"a", "b"}})
+    assert not list(tmp_path.glob("*/*"))
+
+
+def test_route_serves_cached_result():
+    get_result_cache().clear()
+    client = TestClient(app)
+    body = {"inputs": [0.25] * 512}
+    r1 = client.post("/plugins/tinynet/predict", json=body)
+    r2 = client.post("/plugins/tinynet/predict", json=body)
+    assert r1.headers["x-cache"] == "MISS" and r2.headers["x-cache"] == "HIT"
+    assert r1.json() == r2.json()
+    assert "x-cache" not in client.post("/plugins/dummy/ping", json={}).headers
@@ -0,0 +1,63 @@
+# tests/test_runtime.py
+import os
+import tempfile
+
+import torch
+
+from app import runtime
+
+
+def test_benchmark_sweeps_and_suggests():
+    before = torch.get_num_threads()
+    report = runtime.benchmark(
+        workloads=("tinynet", "matmul"),
+        batch_sizes=(1, 4),
+        threads=[1],
+        warmup=1,
+        iters=2,
+        matmul_size=64,
+        device="cpu",
+    )
+    assert torch.get_num_threads() == before
+    assert len(report["runs"]) == 4
+    assert report["curves"]["tinynet"]["float32"]["1"][0][0] == 1
+    assert report["best"]["matmul"]["latency"]["batch_size"] == 1
+    assert report["suggested"]["threads"] == 1 and report["suggested"]["batch_size"] in (1, 4)
+
+
+def test_warmup_reports_elapsed():
+    assert runtime.warmup()["elapsed_sec"] >= 0
+
+
+def test_plan_threads_splits_cores_between_workers():
+    assert runtime.plan_threads(16, workers=4) == (4, 2)
+    assert runtime.plan_threads(2, workers=4) == (1, 1)
+    assert runtime.plan_threads(16, workers=4, threads=3, interop=1) == (3, 1)
+
+
+def test_configure_cpu_reports_layout():
+    before = torch.get_num_threads()
+    mask = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    try:
+        layout = runtime.configure_cpu(threads=1, workers=1, affinity=True)
+        assert layout["threads"] == 1 and torch.get_num_threads() == 1
+        assert runtime.cuda_info()["cpu"] == runtime.cpu_layout() == layout
+        if hasattr(os, "sched_getaffinity"):
+            assert layout["affinity"] == sorted(mask)[:1]
+    finally:
+        torch.set_num_threads(before)
+        if mask is not None:
+            os.sched_setaffinity(0, mask)
+
+
+def test_workers_claim_distinct_core_slots(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(runtime, "_slot_lock", [])
+    assert runtime._worker_index(3, index=4) == 1
+    # each claim is a separate lock, as in separate worker processes
+    claims = [runtime._claim_slot(2) for _ in range(3)]
+    assert claims == [0, 1, None]
+    runtime._slot_lock[0].close()  # worker 0 exits
+    assert runtime._claim_slot(2) == 0
+    for f in runtime._slot_lock:
+        f.close()
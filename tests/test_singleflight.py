@@ -0,0 +1,58 @@
+# tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_duplicates_share_one_call():
+    sf = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"v": 42}
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert results == [{"v": 42}] * 10
+    assert len(calls) == 1
+    assert sf.stats() == {"leaders": 1, "coalesced": 9, "errors": 0, "timeouts": 0, "in_flight": 0}
+
+
+def test_leader_failure_reaches_all_waiters_and_releases_key():
+    sf = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad")
+
+    async def main():
+        results = await asyncio.gather(*(sf.do("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        return await sf.do("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(main()) == "ok"
+    assert sf.stats()["errors"] == 1
+
+
+def test_leader_timeout_does_not_cancel_followers():
+    sf = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(sf.do("k", slow, timeout=0.01))
+        follower = asyncio.ensure_future(sf.do("k", slow))
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+    assert sf.stats()["timeouts"] == 1
@@ -0,0 +1,51 @@
+# tests/test_startup.py
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+
+
+def _wait_ready(client, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        r = client.get("/health")
+        if r.status_code == 200:
+            return r.json()
+        assert r.json()["status"] == "loading"
+        time.sleep(0.05)
+    raise AssertionError("plugins did not become ready")
+
+
+def test_health_reports_plugin_readiness_after_warm_start():
+    with TestClient(app) as client:
+        body = _wait_ready(client)
+        assert body["ready"] is True
+        assert body["plugins"]["tinynet"]["state"] == "ready"
+        assert body["plugins"]["dummy"]["state"] == "ready"
+        assert body["plugins"]["tinynet"]["load_sec"] >= 0
+        # Warm plugins serve the first request without paying for load()
+        resident = client.get("/plugins/stats").json()["resident"]
+        assert "tinynet" in resident["resident"]
+
+
+def test_warm_list_limits_startup_loading(monkeypatch):
+    monkeypatch.setattr(main.settings, "PLUGINS_WARM", ["dummy"])
+    with TestClient(app) as client:
+        body = _wait_ready(client)
+        assert body["plugins"]["dummy"]["state"] == "ready"
+        assert body["plugins"]["tinynet"]["state"] == "registered"
+
+
+def test_on_demand_loads_do_not_fail_readiness(monkeypatch):
+    from app.plugins import loader
+
+    monkeypatch.setattr(main.settings, "PLUGINS_WARM", ["dummy"])
+    with TestClient(app) as client:
+        _wait_ready(client)
+        loader._resident_set().mark("tinynet", "loading")  # as an on-demand load or reload after eviction does
+        r = client.get("/health")
+        assert r.status_code == 200
+        assert r.json()["ready"] is True and r.json()["warming"] == []
+        assert r.json()["plugins"]["tinynet"]["state"] == "loading"
@@ -0,0 +1,124 @@
+# tests/test_streaming.py
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.plugins.base import AIPlugin
+from app.plugins.executor import PluginExecutor
+from app.plugins.streaming import iterate
+
+
+class Counter(AIPlugin):
+    def __init__(self, n):
+        self.n = n
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def load(self):
+        pass
+
+    def infer(self, payload):
+        return {}
+
+    def stream(self, payload):
+        try:
+            for i in range(self.n):
+                self.produced += 1
+                yield {"i": i}
+        finally:
+            self.closed.set()
+
+
+def _events(text):
+    out = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_stream_sse():
+    client = TestClient(app)
+    r = client.post("/plugins/dummy/ping/stream", json={})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = _events(r.text)
+    tokens = [d["token"] for e, d in events if e == "chunk"]
+    assert " ".join(tokens) == "✅ Dummy service is working"
+    assert events[-1][0] == "done"
+    assert events[-1][1]["chunks"] == len(tokens)
+    assert events[-1][1]["ttft_ms"] is not None
+
+
+def test_stream_ndjson_and_fallback_for_non_streaming_plugin():
+    client = TestClient(app)
+    r = client.post(
+        "/plugins/tinynet/predict/stream", json={"inputs": [0.0] * 512}, headers={"accept": "application/x-ndjson"}
+    )
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["event"] for line in lines] == ["chunk", "done"]
+    assert len(lines[0]["data"]["logits"][0]) == 10
+
+    assert client.post("/plugins/nope/x/stream", json={}).status_code == 404
+
+
+def test_stream_backpressure_and_cancellation():
+    plugin = Counter(1000)
+    ex = PluginExecutor("t", max_workers=1, max_queue=0)
+
+    async def consume():
+        chunks = iterate(ex, plugin, {}, buffer=4)
+        got = [await chunks.__anext__() for _ in range(3)]
+        await asyncio.sleep(0.2)
+        produced = plugin.produced
+        await chunks.aclose()  # client went away
+        return got, produced
+
+    got, produced = asyncio.run(consume())
+    assert got == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert produced <= 3 + 4 + 1  # never more than `buffer` chunks ahead
+    assert plugin.closed.wait(5)
+    ex.shutdown()
+
+
+def test_stream_releases_plugin_when_client_is_gone_before_first_byte():
+    from app.plugins import loader
+
+    body = json.dumps({"x": 1}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/plugins/dummy/ping/stream",
+        "raw_path": b"/plugins/dummy/ping/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client disconnected")
+
+    async def main():
+        try:
+            await app(scope, receive, send)
+        except OSError:
+            pass
+
+    asyncio.run(main())
+    assert loader.resident_stats()["resident"]["dummy"]["in_use"] == 0
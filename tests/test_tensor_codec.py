@@ -0,0 +1,108 @@
+# tests/test_tensor_codec.py
+import io
+import json
+
+import numpy as np
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import tensor_codec as tc
+
+
+def test_raw_and_npy_roundtrip_zero_copy():
+    x = np.arange(24, dtype=np.float32).reshape(4, 6)
+    body, headers = tc.encode_raw(x)
+    assert headers == {tc.DTYPE_HEADER: "float32", tc.SHAPE_HEADER: "4,6"}
+    buf = bytearray(body)
+    y = tc.decode_raw(buf, headers[tc.DTYPE_HEADER], headers[tc.SHAPE_HEADER])
+    assert np.array_equal(x, y) and np.shares_memory(y, np.frombuffer(buf, dtype=np.uint8))
+
+    npy = tc.encode_npy(torch.from_numpy(x))
+    assert np.array_equal(np.load(io.BytesIO(npy)), x)
+    f = io.BytesIO()
+    np.save(f, np.asfortranarray(x.astype(">f8")))
+    assert np.array_equal(tc.decode_npy(f.getvalue()), x)
+
+    with pytest.raises(tc.TensorCodecError):
+        tc.decode_raw(b"\x00" * 10, "float32", "4")
+
+
+@pytest.mark.parametrize(
+    "dtype, shape",
+    [("float32", "2,x"), ("float32", "1.5"), ("U", ""), ("U", "2"), ("V8", ""), ("O", ""), ("S0", "")],
+)
+def test_malformed_raw_headers_are_codec_errors(dtype, shape):
+    with pytest.raises(tc.TensorCodecError):
+        tc.decode_raw(b"\x00" * 16, dtype, shape)
+
+
+def test_npy_with_non_numeric_dtype_is_rejected():
+    f = io.BytesIO()
+    np.save(f, np.array(["ab", "c"]))
+    with pytest.raises(tc.TensorCodecError):
+        tc.decode_npy(f.getvalue())
+
+
+@pytest.mark.parametrize("headers", [{tc.SHAPE_HEADER: "8,abc"}, {tc.DTYPE_HEADER: "U"}])
+def test_route_answers_bad_tensor_headers_with_400(headers):
+    r = TestClient(app).post(
+        "/plugins/tinynet/predict", content=b"\x00" * 64, headers={"content-type": tc.RAW, **headers}
+    )
+    assert r.status_code == 400
+
+
+def test_safetensors_roundtrip():
+    tensors = {"a": np.ones((2, 3), dtype=np.int64), "b": torch.full((4,), 1.5, dtype=torch.bfloat16)}
+    blob = tc.encode_safetensors(tensors, {"task": "predict", "k": 3})
+    out, meta = tc.decode_safetensors(bytearray(blob))
+    assert np.array_equal(out["a"], tensors["a"])
+    assert torch.equal(out["b"], tensors["b"])
+    assert meta == {"task": "predict", "k": "3"}
+
+    st = pytest.importorskip("safetensors.numpy")
+    loaded = st.load(tc.encode_safetensors({"x": np.eye(3, dtype=np.float32)}))
+    assert np.array_equal(loaded["x"], np.eye(3))
+
+
+def test_tinynet_binary_request_and_response():
+    client = TestClient(app)
+    x = np.random.rand(8, 512).astype(np.float32)
+    raw_headers = {
+        "content-type": tc.RAW,
+        tc.DTYPE_HEADER: "float32",
+        tc.SHAPE_HEADER: "8,512",
+    }
+    expected = np.array(client.post("/plugins/tinynet/predict", json={"inputs": x.tolist()}).json()["result"]["logits"])
+
+    r = client.post(
+        "/plugins/tinynet/predict?field=logits", content=x.tobytes(), headers={**raw_headers, "accept": tc.NPY}
+    )
+    assert r.status_code == 200 and r.headers["content-type"] == tc.NPY
+    assert np.allclose(np.load(io.BytesIO(r.content)), expected, atol=1e-5)
+
+    npy = io.BytesIO()
+    np.save(npy, x)
+    r = client.post(
+        "/plugins/tinynet/predict", content=npy.getvalue(), headers={"content-type": tc.NPY, "accept": tc.SAFETENSORS}
+    )
+    tensors, meta = tc.decode_safetensors(r.content)
+    assert tensors["logits"].shape == (8, 10) and tensors["labels"].shape == (8,)
+    assert meta["task"] == "predict"
+
+    # two tensor fields and no ?field= -> 406; malformed body -> 400
+    assert (
+        client.post(
+            "/plugins/tinynet/predict", content=x.tobytes(), headers={**raw_headers, "accept": tc.RAW}
+        ).status_code
+        == 406
+    )
+    bad = {**raw_headers, tc.SHAPE_HEADER: "9,512"}
+    assert client.post("/plugins/tinynet/predict", content=x.tobytes(), headers=bad).status_code == 400
+    assert (
+        client.post(
+            "/plugins/tinynet/predict", content=json.dumps([1]), headers={"content-type": "application/json"}
+        ).status_code
+        == 422
+    )
@@ -0,0 +1,45 @@
+# tests/test_unify.py
+import numpy as np
+import torch
+
+from app.utils.unify import SCHEMA_VERSION, to_jsonable, unify_response
+
+
+def test_to_jsonable_converts_arrays_and_scalars():
+    raw = {"a": np.float32(1.5), "b": [np.arange(3), torch.ones(2)], "c": (1, "x"), "d": {1, 2}, "e": object}
+    out = to_jsonable(raw)
+    assert out["a"] == 1.5 and type(out["a"]) is float
+    assert out["b"] == [[0, 1, 2], [1.0, 1.0]]
+    assert out["c"] == (1, "x") and sorted(out["d"]) == [1, 2]
+    assert isinstance(out["e"], str)
+    assert type(to_jsonable(np.float64(2.0))) is float
+
+
+def test_to_jsonable_copy_on_write_and_keep_arrays():
+    plain = {"x": [1, 2, {"y": "z"}], "n": None}
+    assert to_jsonable(plain) is plain
+
+    arr = np.zeros((2, 2))
+    raw = {"keep": {"same": [1]}, "arr": arr}
+    out = to_jsonable(raw, keep_arrays=True)
+    assert out is raw and out["arr"] is arr
+
+    out = to_jsonable(raw)
+    assert out is not raw and raw["arr"] is arr  # input untouched
+    assert out["keep"] is raw["keep"]  # unchanged subtree shared
+
+
+def test_unify_response_envelopes():
+    raw = {"status": "ok", "data": {"v": np.int64(3)}, "meta": {"m": 1}}
+    out = unify_response("p", "t", raw, request_id="rid")
+    assert out["provider"] == "p" and out["schema_version"] == SCHEMA_VERSION
+    assert out["data"] == {"v": 3} and out["meta"] == {"m": 1, "request_id": "rid"}
+    assert raw["meta"] == {"m": 1} and "provider" not in raw  # input not modified
+
+    out = unify_response("p", "t", {"logits": torch.zeros(2), "device": "cpu"}, keep_arrays=True)
+    assert out["status"] == "ok" and isinstance(out["data"]["logits"], torch.Tensor)
+    assert out["meta"] == {"device": "cpu"}
+
+    err = unify_response("p", "t", {"error": "boom"}, request_id="r")
+    assert err["status"] == "error" and err["error"]["message"] == "boom" and err["meta"] == {"request_id": "r"}
+    assert unify_response("p", "t", 5)["data"] == {"result": 5}
@@ -0,0 +1,84 @@
+# tests/test_warm_state.py
+import pytest
+import torch
+
+from app.core.config import get_settings
+from app.plugins import warm_state
+from app.plugins.tinynet.plugin import Plugin as TinyNetPlugin
+
+
+@pytest.fixture(autouse=True)
+def _enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "MODEL_CACHE_ROOT", tmp_path)
+    monkeypatch.setattr(get_settings(), "WARM_STATE_ENABLED", True)
+
+
+def _plugin(manifest):
+    plugin = TinyNetPlugin()
+    plugin.name = "tinynet"
+    plugin.manifest = manifest
+    return plugin
+
+
+@pytest.mark.parametrize("passes", [["torchscript"], ["quantize_dynamic"]])
+def test_restart_restores_the_optimized_model(passes, monkeypatch):
+    # keep every pass that is correct, so the restore path for it is exercised
+    monkeypatch.setattr("app.plugins.tinynet.plugin.optimize_model", _optimize_keeping_all)
+    manifest = {"version": "0.1.0", "optimize": passes}
+    first = _plugin(manifest)
+    assert warm_state.load_plugin(first, "tinynet") == "loaded"
+    path = warm_state.state_dir("tinynet", first)
+    assert path.is_dir()
+    if (path / "model.pt").exists():  # plain tensors, loadable without unpickling code
+        torch.load(path / "model.pt", weights_only=True)
+
+    second = _plugin(manifest)
+    second.load = lambda: (_ for _ in ()).throw(AssertionError("load() ran despite the snapshot"))
+    assert warm_state.load_plugin(second, "tinynet") == "restored"
+    assert type(second.model) is type(first.model)  # as optimized, whichever passes were kept
+    assert second.optimization == first.optimization
+    x = torch.randn(3, 512)
+    assert torch.allclose(second.model(x), first.model(x))
+
+
+def _optimize_keeping_all(model, example, passes):
+    from app.utils.optimize import optimize_model
+
+    return optimize_model(model, example, passes, min_speedup=0.0)
+
+
+def test_new_version_code_or_broken_snapshot_loads_from_scratch(tmp_path, monkeypatch):
+    old = {"version": "0.1.0", "optimize": False}
+    warm_state.load_plugin(_plugin(old), "tinynet")
+
+    new = {"version": "0.2.0", "optimize": False}
+    assert warm_state.load_plugin(_plugin(new), "tinynet") == "loaded"
+    assert [p.name for p in (tmp_path / "warm_state" / "tinynet").iterdir()] == [
+        warm_state.state_dir("tinynet", _plugin(new)).name
+    ]
+
+    (warm_state.state_dir("tinynet", _plugin(new)) / "state.json").write_text("{", encoding="utf-8")
+    assert warm_state.load_plugin(_plugin(new), "tinynet") == "loaded"
+    assert warm_state.load_plugin(_plugin(new), "tinynet") == "restored"
+
+    monkeypatch.setattr(warm_state, "_source_hash", lambda plugin: "edited plugin.py")
+    assert warm_state.load_plugin(_plugin(new), "tinynet") == "loaded"
+
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    default = type(get_settings()).model_fields["WARM_STATE_ENABLED"].default
+    assert default is False
+    monkeypatch.setattr(get_settings(), "WARM_STATE_ENABLED", default)
+    assert warm_state.load_plugin(_plugin({"optimize": False}), "tinynet") == "loaded"
+    assert not (tmp_path / "warm_state").exists()
+
+
+def test_plugins_built_by_the_loader_are_fingerprinted():
+    from app.plugins import loader
+
+    loader.discover()
+    plugin = loader.acquire("tinynet")  # imported from its folder, outside sys.modules
+    try:
+        assert warm_state.state_dir("tinynet", plugin).parent.name == "tinynet"
+    finally:
+        loader.release("tinynet")
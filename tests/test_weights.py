@@ -0,0 +1,29 @@
+# tests/test_weights.py
+import pytest
+import torch
+
+from app.toy_model import TinyNet, load_model
+from app.utils import weights
+
+
+def test_safetensors_are_mapped_copy_on_write(tmp_path):
+    sd = {"w": torch.randn(4, 3), "h": torch.randn(2).half(), "b": torch.tensor([True, False])}
+    path = tmp_path / "m.safetensors"
+    weights.save_safetensors(sd, path, metadata={"format": "pt"})
+
+    loaded = weights.load_state_dict(path)
+    assert all(torch.equal(loaded[k], sd[k]) and loaded[k].dtype == sd[k].dtype for k in sd)
+    loaded["w"].zero_()  # private mapping: the file is untouched
+    assert torch.equal(weights.load_state_dict(path)["w"], sd["w"])
+
+
+def test_load_model_resolves_weights_in_model_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(weights, "cache_dirs", lambda: [tmp_path])
+    ref = TinyNet().eval()
+    weights.save_safetensors(ref.state_dict(), tmp_path / "tinynet" / "model.safetensors")
+
+    model, dev = load_model("tinynet/model.safetensors")
+    x = torch.randn(2, 512)
+    assert torch.allclose(model(x.to(dev)).cpu(), ref(x))
+    with pytest.raises(FileNotFoundError):
+        weights.find_weights("missing.safetensors")